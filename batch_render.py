@@ -0,0 +1,196 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# matplotlib is imported on first use
+from plotting import lazy, mpl
+
+_figure = lazy("matplotlib.figure")
+
+# figure reused by every render inside one worker process, created by _init_worker()
+_WORKER = {}
+
+
+class FigureSpec:
+    """ Describes one kind of report figure. draw is called as draw(fig, axes, key, data) for every group,
+        with axes being the array returned by fig.subplots(nrows, ncols). draw has to be picklable
+        (a module-level function or an instance of a module-level class like BarPie) so workers can receive it.
+    """
+
+    def __init__(self, draw, nrows=1, ncols=1, figsize=(16, 8), dpi=100, fmt="png", savefig_kwargs=None):
+        if fmt not in ("png", "svg"):
+            raise ValueError("fmt must be 'png' or 'svg', got " + repr(fmt))
+        self.draw = draw
+        self.nrows = nrows
+        self.ncols = ncols
+        self.figsize = figsize
+        self.dpi = dpi
+        self.fmt = fmt
+        self.savefig_kwargs = savefig_kwargs or {}
+
+
+class BarPie:
+    """ The bar + donut layout of the "Sales per Region" and "Properties per Township" figures.
+        Use with FigureSpec(BarPie(...), nrows=1, ncols=2).
+    """
+
+    def __init__(self, label_col, value_col, title="{key}", xlabel=None, ylabel=None, colors=None):
+        self.label_col = label_col
+        self.value_col = value_col
+        self.title = title
+        self.xlabel = xlabel or label_col
+        self.ylabel = ylabel or value_col
+        self.colors = colors
+
+    def __call__(self, fig, axes, key, data):
+        ax1, ax2 = axes
+        fig.suptitle(self.title.format(key=key), fontsize=24)
+
+        #bar chart labelling
+        ax1.set_ylabel(self.ylabel, fontsize=12)
+        ax1.set_xlabel(self.xlabel, fontsize=18)
+
+        #pie chart labelling
+        ax2.set_ylabel(self.ylabel, fontsize=12)
+        ax2.set_xlabel(self.xlabel, fontsize=18)
+
+        fig.tight_layout(pad=2)
+
+        ax1.barh(data[self.label_col], data[self.value_col], edgecolor='black')
+        ax2.pie(data[self.value_col], labels=data[self.label_col], colors=self.colors,
+                wedgeprops={'width': 0.2}, startangle=90)
+
+
+def _setup(spec):
+    # Figure objects are created without pyplot, so rendering never touches a GUI backend
+    fig = _figure.Figure(figsize=spec.figsize, dpi=spec.dpi)
+    axes = fig.subplots(spec.nrows, spec.ncols, squeeze=False)
+    _WORKER["spec"] = spec
+    _WORKER["fig"] = fig
+    _WORKER["axes"] = axes.ravel() if axes.size > 1 else axes[0, 0]
+    # where each axes sits, a colorbar takes its space from its parent's
+    _WORKER["layout"] = [(ax, ax.get_subplotspec()) for ax in axes.flat]
+
+
+def _init_worker(spec):
+    # non-interactive backend in case draw() goes through pyplot itself
+    mpl.use("Agg")
+    _setup(spec)
+
+
+def _reset(fig, layout):
+    # clears the previous render while keeping the figure and its subplot axes alive
+    kept = [ax for ax, _ in layout]
+    for ax in list(fig.axes):
+        if not any(ax is k for k in kept):
+            # colorbars, insets and twins added by draw()
+            ax.remove()
+    for ax, subplotspec in layout:
+        ax.cla()
+        ax.set_subplotspec(subplotspec)
+    fig.suptitle("")
+    for artists in (fig.legends, fig.texts, fig.images, fig.lines, fig.patches, fig.artists):
+        artists.clear()
+
+
+def _render(task):
+    key, data, path = task
+    spec, fig, axes = _WORKER["spec"], _WORKER["fig"], _WORKER["axes"]
+    _reset(fig, _WORKER["layout"])
+    spec.draw(fig, axes, key, data)
+    fig.savefig(path, format=spec.fmt, dpi=spec.dpi, **spec.savefig_kwargs)
+    return path
+
+
+def file_name(key):
+    """ Turns a group key like ("Makati", "2024-01") into a safe file name like "Makati_2024-01"
+
+    Arguments:
+        key {object} -- group key, tuples are joined with "_"
+
+    Returns
+        String -- file name without extension
+    """
+
+    if not isinstance(key, tuple):
+        key = (key,)
+    name = "_".join(str(k) for k in key)
+    return re.sub(r"[^\w\-.]+", "_", name).strip("_") or "figure"
+
+
+def _unique_names(keys):
+    # file_name() of every key, with _2, _3, ... added to names another key already cleaned up to
+    names, used = [], set()
+    for key in keys:
+        base = name = file_name(key)
+        n = 1
+        while name in used:
+            n += 1
+            name = base + "_" + str(n)
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def render_batch(spec, groups, out_dir, workers=None, chunksize=None):
+    """ Renders one figure per group and writes it to out_dir as <group key>.<fmt>.
+        Work is spread over a process pool, each worker builds its figure once and reuses it for every
+        group it renders instead of calling plt.subplots() per image. Keys that clean up to the same file
+        name (like "c/d" and "c_d") get a numeric suffix in the order of groups: c_d.png, c_d_2.png.
+
+        render_batch(FigureSpec(BarPie("Township", "Property"), ncols=2), df.groupby(["Township", "Month"]), "out")
+
+    Arguments:
+        spec {FigureSpec} -- what to draw
+        groups {iterable} -- (key, DataFrame) pairs, e.g. df.groupby(...) or dict.items()
+        out_dir {String} -- output folder, created if missing
+        workers {int} -- number of processes, defaults to the number of cores. 1 renders in this process
+        chunksize {int} -- groups sent to a worker at a time, defaults to an even split into 4 chunks per worker
+
+    Returns
+        List -- paths of the written files, in the order of groups
+    """
+
+    if isinstance(groups, dict):
+        groups = groups.items()
+    os.makedirs(out_dir, exist_ok=True)
+    groups = list(groups)
+    names = _unique_names([key for key, _ in groups])
+    tasks = [(key, data, os.path.join(out_dir, name + "." + spec.fmt)) for (key, data), name in zip(groups, names)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        _setup(spec)
+        try:
+            return [_render(task) for task in tasks]
+        finally:
+            _WORKER.clear()
+
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,)) as pool:
+        return list(pool.map(_render, tasks, chunksize=chunksize))
+
+
+def throughput(spec, groups, out_dir, workers=None):
+    """ Renders the batch and reports how fast it went
+
+    Arguments:
+        spec {FigureSpec} -- what to draw
+        groups {iterable} -- (key, DataFrame) pairs
+        out_dir {String} -- output folder
+        workers {int} -- number of processes, defaults to the number of cores
+
+    Returns
+        Dictionary -- figures, seconds, figures_per_second and figures_per_second_per_core
+    """
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    n = len(render_batch(spec, groups, out_dir, workers=workers))
+    seconds = time.perf_counter() - start
+    return {"figures": n,
+            "seconds": seconds,
+            "figures_per_second": n / seconds,
+            "figures_per_second_per_core": n / seconds / workers}
@@ -0,0 +1,259 @@
+import heapq
+import time
+
+import numpy as np
+import pandas as pd
+
+from functions import Room
+from room_store import price_column
+
+# event kinds, in the order they are applied within a time step: a room released at t can be booked again at t
+RELEASE, PRICE, BOOK = 0, 1, 2
+KINDS = {"release": RELEASE, "price": PRICE, "book": BOOK}
+
+
+class BookingSimulator:
+    """ Discrete-event simulation of bookings over a Room inventory kept in arrays (price, open flag and
+        revenue per room) instead of Room objects. Booking a room closes it like Room.close_room() and
+        schedules its release, which opens it again like Room.open_room(), when the stay ends.
+
+        Time advances in integer steps (e.g. nights). Pending events wait in a heap of step times, each time
+        holding batches of events, and every step applies its releases, price changes and bookings to the
+        arrays at once, so the cost per event is a few array operations rather than a Python call.
+
+        sim = BookingSimulator.from_rooms(rooms, seed=1)
+        series = sim.run(365, arrivals=5000, mean_stay=3, price_changes=200)
+        series[["occupancy", "revenue"]].plot()
+
+        Runs with the same inventory, seed and calls produce the same results.
+    """
+
+    def __init__(self, prices, room_open=None, seed=0):
+        # prices are simulated as floats, when every one came in as an int, to_rooms() and save_rooms() give
+        # whole prices back as ints like Room(3400, True)
+        dtype = getattr(prices, "dtype", None)
+        if dtype is not None and dtype.kind in "iuf":
+            self.price = np.array(prices, dtype=np.float64)
+            self.int_prices = dtype.kind in "iu"
+        else:
+            # anything else is checked value by value, None or "3400" would otherwise become NaN or 3400.0
+            self.price, ints = price_column(list(prices))
+            self.int_prices = bool(ints.all())
+        if room_open is None:
+            room_open = np.ones(len(self.price), dtype=bool)
+        self.room_open = np.array(room_open, dtype=bool)
+        if self.room_open.shape != self.price.shape:
+            raise ValueError("prices and room_open must have the same length, got " + str(len(self.price)) +
+                             " and " + str(len(self.room_open)))
+        self.revenue = np.zeros(len(self.price))
+        # step at which each room's current booking ends, releases of earlier bookings leave the room alone
+        self._until = np.zeros(len(self.price), dtype=np.int64)
+        self.time = 0
+        self.rng = np.random.default_rng(seed)
+        # heap of step times with pending events, and the event batches of each of those times
+        self._heap = []
+        self._pending = {}
+
+    @classmethod
+    def from_rooms(cls, rooms, seed=0):
+        """ Simulator over a list of functions.Room
+
+        Arguments:
+            rooms {List} -- Room objects
+            seed {int} -- random seed
+
+        Returns
+            BookingSimulator
+        """
+
+        return cls([r.price for r in rooms], [r.room_open for r in rooms], seed=seed)
+
+    def to_rooms(self):
+        """ The current inventory as functions.Room objects
+
+        Returns
+            List -- one Room per room, with its current price and open flag. Prices are ints when the
+            simulator was given ints and the price is still whole
+        """
+
+        prices = self.price.tolist()
+        if self.int_prices:
+            # repricing can leave fractional prices, those stay floats
+            prices = [int(p) if p.is_integer() else p for p in prices]
+        return [Room(p, o) for p, o in zip(prices, self.room_open.tolist())]
+
+    def __len__(self):
+        return len(self.price)
+
+    def schedule(self, at, kind, rooms, values=None):
+        """ Adds a batch of events at a step time
+
+        Arguments:
+            at {int} -- step time, not before the current time
+            kind {String} -- "book" (values are stay lengths in steps, default 1), "release" (opens the
+                             rooms whatever their booking), or "price" (values are the new prices)
+            rooms {array-like} -- room positions
+            values {array-like or scalar} -- stay lengths or prices, per room or for all of them
+        """
+
+        if kind not in KINDS:
+            raise ValueError("kind must be one of " + str(list(KINDS)) + ", got " + repr(kind))
+        if at < self.time:
+            raise ValueError("can't schedule at " + str(at) + ", the simulation is at " + str(self.time))
+        rooms = np.asarray(rooms, dtype=np.int64).ravel()
+        if kind == "price" and values is None:
+            raise ValueError("price events need the new prices")
+        if kind == "release":
+            # -1 instead of the end of a booking: unconditional
+            values = -1
+        elif values is None:
+            values = 1
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64 if kind == "price" else np.int64), rooms.shape)
+        self._push(int(at), KINDS[kind], rooms, values)
+
+    def _push(self, at, kind, rooms, values):
+        batches = self._pending.get(at)
+        if batches is None:
+            batches = self._pending[at] = ([], [], [])
+            heapq.heappush(self._heap, at)
+        batches[kind].append((rooms, values))
+
+    def _take(self, at):
+        # the event batches of a step time, each kind concatenated in scheduling order
+        if not self._heap or self._heap[0] != at:
+            return None
+        heapq.heappop(self._heap)
+        merged = []
+        for batches in self._pending.pop(at):
+            if not batches:
+                merged.append(None)
+            elif len(batches) == 1:
+                merged.append(batches[0])
+            else:
+                merged.append((np.concatenate([r for r, _ in batches]), np.concatenate([v for _, v in batches])))
+        return merged
+
+    def _step(self, arrivals, mean_stay, price_changes, volatility):
+        rng = self.rng
+        n = len(self.price)
+        record = {"time": self.time, "releases": 0, "price_changes": 0, "requests": 0, "bookings": 0,
+                  "revenue": 0.0}
+        scheduled = self._take(self.time) or [None, None, None]
+
+        if scheduled[RELEASE] is not None:
+            rooms, ends = scheduled[RELEASE]
+            rooms = rooms[(ends < 0) | (self._until[rooms] == ends)]
+            self.room_open[rooms] = True
+            self._until[rooms] = self.time
+            record["releases"] = len(rooms)
+
+        rooms, prices = scheduled[PRICE] or (np.empty(0, dtype=np.int64), np.empty(0))
+        if price_changes:
+            # random repricings on top of the scheduled ones, a lognormal factor on the current price
+            count = rng.poisson(price_changes)
+            drawn = rng.integers(0, n, count)
+            rooms = np.concatenate((rooms, drawn))
+            prices = np.concatenate((prices, np.round(self.price[drawn] * rng.lognormal(0.0, volatility, count), 2)))
+        if len(rooms):
+            # the last change of a room in the step wins, as if applied one by one
+            self.price[rooms] = prices
+            record["price_changes"] = len(rooms)
+
+        rooms, stays = scheduled[BOOK] or (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        if arrivals:
+            # each request asks for a random room and a geometric number of steps
+            count = rng.poisson(arrivals)
+            rooms = np.concatenate((rooms, rng.integers(0, n, count)))
+            stays = np.concatenate((stays, rng.geometric(1.0 / mean_stay, count)))
+        record["requests"] = len(rooms)
+        if len(rooms):
+            # requests for a closed room are lost, and of several requests for one room the first wins
+            available = np.flatnonzero(self.room_open[rooms])
+            first = np.unique(rooms[available], return_index=True)[1]
+            won = available[np.sort(first)]
+            rooms, stays = rooms[won], np.maximum(stays[won], 1)
+            record["bookings"] = len(rooms)
+        if record["bookings"]:
+            self.room_open[rooms] = False
+            self._until[rooms] = self.time + stays
+            earned = self.price[rooms] * stays
+            self.revenue[rooms] += earned
+            record["revenue"] = float(earned.sum())
+            # one release batch per distinct stay end
+            ends = self.time + stays
+            order = np.argsort(ends, kind="stable")
+            ends, rooms = ends[order], rooms[order]
+            cuts = np.flatnonzero(np.diff(ends)) + 1
+            for lo, hi in zip(np.concatenate(([0], cuts)), np.concatenate((cuts, [len(ends)]))):
+                self._push(int(ends[lo]), RELEASE, rooms[lo:hi], ends[lo:hi])
+
+        record["open"] = int(np.count_nonzero(self.room_open))
+        record["booked"] = int(np.count_nonzero(self._until > self.time))
+        # what changed the inventory, lost requests (closed rooms, a second request for a room) are left out
+        record["events"] = record["releases"] + record["price_changes"] + record["bookings"]
+        return record
+
+    def run(self, steps, arrivals=0.0, mean_stay=3.0, price_changes=0.0, volatility=0.05):
+        """ Advances the simulation, with optional random demand and repricing on top of the scheduled events
+
+        Arguments:
+            steps {int} -- number of time steps to run
+            arrivals {float} -- mean booking requests per step (Poisson), each for a random room
+            mean_stay {float} -- mean stay length in steps (geometric, at least 1)
+            price_changes {float} -- mean random price changes per step (Poisson)
+            volatility {float} -- standard deviation of the log of a random price change factor
+
+        Returns
+            DataFrame -- one row per step (indexed by time): releases, price_changes, requests, bookings (won
+            requests), revenue (price times stay length of the step's bookings), open rooms, booked rooms,
+            occupancy (booked share of the inventory) and events (applied releases, price changes and
+            bookings, requests are counted on their own)
+        """
+
+        if mean_stay < 1:
+            raise ValueError("mean_stay must be at least 1, got " + str(mean_stay))
+        records = []
+        for _ in range(steps):
+            records.append(self._step(arrivals, mean_stay, price_changes, volatility))
+            self.time += 1
+        series = pd.DataFrame(records, columns=["time", "releases", "price_changes", "requests", "bookings",
+                                                "revenue", "open", "booked", "events"])
+        series.insert(series.columns.get_loc("booked") + 1, "occupancy",
+                      series["booked"] / len(self.price) if len(self.price) else 0.0)
+        return series.set_index("time")
+
+    def pending(self):
+        """ Number of scheduled events not yet applied
+
+        Returns
+            int
+        """
+
+        return sum(len(rooms) for batches in self._pending.values() for kind in batches for rooms, _ in kind)
+
+
+def benchmark(rooms=10 ** 6, steps=365, arrivals=200000, price_changes=50000, seed=0):
+    """ Events per second of a simulation over a random inventory
+
+    Arguments:
+        rooms {int} -- inventory size
+        steps {int} -- time steps
+        arrivals {float} -- booking requests per step
+        price_changes {float} -- random price changes per step
+        seed {int} -- random seed
+
+    Returns
+        Dictionary -- applied events (releases, price changes, bookings), booking requests, seconds, both
+        per second and the final occupancy
+    """
+
+    rng = np.random.default_rng(seed)
+    sim = BookingSimulator(np.round(rng.uniform(50, 500, rooms), 2), seed=seed)
+    start = time.perf_counter()
+    series = sim.run(steps, arrivals=arrivals, price_changes=price_changes)
+    seconds = time.perf_counter() - start
+    events = int(series["events"].sum())
+    requests = int(series["requests"].sum())
+    return {"rooms": rooms, "steps": steps, "events": events, "requests": requests, "seconds": seconds,
+            "events_per_s": events / seconds, "requests_per_s": requests / seconds,
+            "occupancy": float(series["occupancy"].iloc[-1])}
@@ -0,0 +1,118 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, reduce
+from itertools import islice
+from operator import or_
+
+VOWELS = "aeiouAEIOU"
+
+# words handled per task when reducing in parallel
+CHUNK_SIZE = 1 << 18
+
+
+@lru_cache(maxsize=None)
+def _table(exclude):
+    # str.translate table deleting every character in exclude, built once per exclude string
+    return str.maketrans("", "", exclude)
+
+
+def char_mask(words, exclude=VOWELS):
+    """ Bitmask of the characters used in words, minus those in exclude. Bit n is set when the character
+        with code point n appears. Masks of separate chunks combine with | (bitwise OR).
+
+    Arguments:
+        words {String or iterable} -- a word, or any iterable of words
+        exclude {String} -- characters to leave out, vowels by default
+
+    Returns
+        int -- character bitmask
+    """
+
+    text = words if isinstance(words, str) else "".join(words)
+    # dedupe first (a single C-level pass), so the translation only runs over the distinct characters
+    mask = 0
+    for c in "".join(set(text)).translate(_table(exclude)):
+        mask |= 1 << ord(c)
+    return mask
+
+
+def mask_to_string(mask):
+    """ Characters of a bitmask as a sorted string, the same order as "".join(sorted(set(...)))
+
+    Arguments:
+        mask {int} -- character bitmask from char_mask()
+
+    Returns
+        String -- characters in code point order
+    """
+
+    chars = []
+    while mask:
+        low = mask & -mask
+        chars.append(chr(low.bit_length() - 1))
+        mask ^= low
+    return "".join(chars)
+
+
+def _chunks(words, size):
+    it = iter(words)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _chunk_mask(args):
+    chunk, exclude = args
+    return char_mask(chunk, exclude)
+
+
+def unique_chars(words, exclude=VOWELS, workers=1, chunk_size=CHUNK_SIZE):
+    """ Sorted string of the distinct characters used across all words, minus those in exclude.
+        Each chunk of words is turned into a bitmask and the masks are merged with OR, optionally across
+        a process pool.
+
+    Arguments:
+        words {iterable} -- words to scan
+        exclude {String} -- characters to leave out, vowels by default
+        workers {int} -- number of processes, 1 runs in this process, None uses every core
+        chunk_size {int} -- words per chunk
+
+    Returns
+        String -- distinct characters in code point order
+    """
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        masks = (char_mask(chunk, exclude) for chunk in _chunks(words, chunk_size))
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        tasks = ((chunk, exclude) for chunk in _chunks(words, chunk_size))
+        with pool:
+            masks = list(pool.map(_chunk_mask, tasks))
+    return mask_to_string(reduce(or_, masks, 0))
+
+
+def get_consonants(words, workers=1, chunk_size=CHUNK_SIZE):
+    """ Same output as the Functions notebook's reduce(get_consonants, words): every non-vowel character
+        used in the words, sorted and without repeats. Runs in linear time instead of re-cleaning and
+        re-sorting the accumulated string at every step.
+
+        Like reduce(), a list with a single word returns that word unchanged and an empty list raises TypeError.
+
+    Arguments:
+        words {List} -- words to scan
+        workers {int} -- number of processes, see unique_chars()
+        chunk_size {int} -- words per chunk
+
+    Returns
+        String -- sorted distinct consonants
+    """
+
+    words = list(words) if not isinstance(words, (list, tuple)) else words
+    if len(words) == 0:
+        raise TypeError("reduce() of empty iterable with no initial value")
+    if len(words) == 1:
+        return words[0]
+    return unique_chars(words, VOWELS, workers, chunk_size)
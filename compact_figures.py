@@ -0,0 +1,235 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# plotly is imported on first use
+from plotting import go, pio
+
+# traces with at least this many points are drawn with WebGL (same cutoff plotly express uses)
+GL_THRESHOLD = 1000
+
+# text arrays with a smaller unique/total ratio than this are sent as (labels, codes) instead of full strings
+DEDUPE_RATIO = 0.5
+
+# runs after the plot is created: rebuilds each deduplicated text array from its labels and codes
+_EXPAND_TEXT_JS = """
+(function(gd) {
+    var types = {i1: Int8Array, u1: Uint8Array, i2: Int16Array, u2: Uint16Array, i4: Int32Array, u4: Uint32Array};
+    function codes(c) {
+        if (c && c.bdata !== undefined) {
+            var raw = atob(c.bdata), buf = new Uint8Array(raw.length);
+            for (var j = 0; j < raw.length; j++) buf[j] = raw.charCodeAt(j);
+            return new types[c.dtype](buf.buffer);
+        }
+        return c;
+    }
+    var text = [], traces = [];
+    gd.data.forEach(function(t, i) {
+        if (t.meta && t.meta.hover_labels) {
+            var labels = t.meta.hover_labels;
+            text.push(Array.prototype.map.call(codes(t.customdata), function(k) { return labels[k]; }));
+            traces.push(i);
+        }
+    });
+    if (traces.length) Plotly.restyle(gd, {text: text}, traces);
+})(document.getElementById('{plot_id}'));
+"""
+
+
+def compact_array(values, float32=False):
+    """ Converts a numeric column to the narrowest numpy array that holds it exactly, which plotly (>= 6)
+        serializes as a base64 typed buffer instead of JSON text. Non-numeric values are returned unchanged.
+
+    Arguments:
+        values {array-like} -- column, list or array of values
+        float32 {bool} -- also downcast floats to float32 (lossy beyond ~7 significant digits)
+
+    Returns
+        numpy.ndarray or the original values
+    """
+
+    if values is None or isinstance(values, (str, bytes)):
+        return values
+    arr = np.asarray(values)
+    if arr.dtype.kind == "b":
+        return arr
+    if arr.dtype.kind in "iu":
+        if len(arr) == 0:
+            return arr
+        lo, hi = arr.min(), arr.max()
+        for dtype in (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32):
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return arr.astype(dtype)
+        return arr
+    if arr.dtype.kind == "f":
+        return arr.astype(np.float32) if float32 else arr
+    return values
+
+
+def _n_points(values):
+    try:
+        return len(values)
+    except TypeError:
+        return 0
+
+
+def scatter(x=None, y=None, gl_threshold=GL_THRESHOLD, float32=False, **kwargs):
+    """ Builds a scatter/line trace like go.Scatter, but switches to go.Scattergl once the trace has
+        gl_threshold points or more, and stores x/y as compact typed arrays.
+
+    Arguments:
+        x {array-like} -- x values
+        y {array-like} -- y values
+        gl_threshold {int} -- point count at which WebGL is used, None to never switch
+        float32 {bool} -- downcast float columns to float32, see compact_array()
+        **kwargs -- any other go.Scatter attribute (mode, name, marker, line, text, ...)
+
+    Returns
+        go.Scatter or go.Scattergl
+    """
+
+    n = max(_n_points(x), _n_points(y))
+    trace = go.Scattergl if gl_threshold is not None and n >= gl_threshold else go.Scatter
+    return trace(x=compact_array(x, float32), y=compact_array(y, float32), **kwargs)
+
+
+def bar(x=None, y=None, float32=False, **kwargs):
+    """ Builds a go.Bar trace with x/y stored as compact typed arrays
+
+    Arguments:
+        x {array-like} -- x values (categories)
+        y {array-like} -- y values
+        float32 {bool} -- downcast float columns to float32, see compact_array()
+        **kwargs -- any other go.Bar attribute
+
+    Returns
+        go.Bar
+    """
+
+    return go.Bar(x=compact_array(x, float32), y=compact_array(y, float32), **kwargs)
+
+
+def dedupe_text(fig, min_ratio=DEDUPE_RATIO):
+    """ Returns a copy of the figure where repeated per-point text arrays (e.g. text=df.university_name)
+        are replaced by a list of unique labels in the trace's meta and integer codes in customdata.
+        The text is rebuilt in the browser by the script that to_html() attaches, so only use the result
+        through to_html()/export_batch(). Traces that already use customdata or meta are left as they are.
+
+    Arguments:
+        fig {go.Figure} -- figure to compact
+        min_ratio {float} -- only dedupe when unique labels / points is below this ratio
+
+    Returns
+        go.Figure -- compacted copy
+    """
+
+    fig = go.Figure(fig)
+    for trace in fig.data:
+        text = getattr(trace, "text", None)
+        if text is None or isinstance(text, str) or len(text) == 0:
+            continue
+        if trace.customdata is not None or trace.meta is not None:
+            continue
+
+        codes, labels = pd.factorize(pd.Series(list(text), dtype=object), use_na_sentinel=False)
+        if len(labels) > min_ratio * len(codes):
+            continue
+
+        trace.update(text=None,
+                     customdata=compact_array(codes),
+                     meta={"hover_labels": [None if pd.isna(label) else str(label) for label in labels]})
+    return fig
+
+
+def payload_size(fig):
+    """ Size of the figure's JSON payload in bytes, i.e. what gets embedded into the HTML
+
+    Arguments:
+        fig {go.Figure or dict} -- figure
+
+    Returns
+        int -- number of bytes
+    """
+
+    return len(pio.to_json(fig, validate=False).encode("utf-8"))
+
+
+def _prepare(fig, dedupe, kwargs):
+    # dedupes the figure's text and registers the script that expands it again in the browser
+    post_script = list(kwargs.pop("post_script", None) or [])
+    if dedupe:
+        fig = dedupe_text(fig)
+        post_script.insert(0, _EXPAND_TEXT_JS)
+    kwargs["post_script"] = post_script
+    return fig, kwargs
+
+
+def to_html(fig, include_plotlyjs="cdn", full_html=True, dedupe=True, **kwargs):
+    """ Same as pio.to_html but with repeated text deduplicated (see dedupe_text())
+
+    Arguments:
+        fig {go.Figure} -- figure to export
+        include_plotlyjs {bool or String} -- passed to pio.to_html, defaults to loading plotly.js from the CDN
+        full_html {bool} -- produce a full html document (True) or only a <div> (False)
+        dedupe {bool} -- deduplicate text arrays
+        **kwargs -- other pio.to_html arguments
+
+    Returns
+        String -- html
+    """
+
+    fig, kwargs = _prepare(fig, dedupe, kwargs)
+    return pio.to_html(fig, include_plotlyjs=include_plotlyjs, full_html=full_html, **kwargs)
+
+
+def export_batch(figs, out_dir, names=None, dedupe=True, **kwargs):
+    """ Writes one html file per figure into out_dir. All files load the same plotly.min.js, which is
+        copied into out_dir once, instead of each embedding their own ~4.5MB copy.
+
+    Arguments:
+        figs {List} -- figures to export
+        out_dir {String} -- output folder, created if missing
+        names {List} -- file names without extension, defaults to figure_0, figure_1, ...
+        dedupe {bool} -- deduplicate text arrays, see dedupe_text()
+        **kwargs -- other pio.write_html arguments
+
+    Returns
+        List -- paths of the written html files
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+    if names is None:
+        names = ["figure_" + str(i) for i in range(len(figs))]
+
+    paths = []
+    for fig, name in zip(figs, names):
+        path = os.path.join(out_dir, name + ".html")
+        fig, fig_kwargs = _prepare(fig, dedupe, dict(kwargs))
+        # 'directory' copies plotly.min.js into out_dir only if it isn't there yet
+        pio.write_html(fig, path, include_plotlyjs="directory", **fig_kwargs)
+        paths.append(path)
+    return paths
+
+
+def export_page(figs, path, dedupe=True, **kwargs):
+    """ Writes all figures into a single html page that embeds plotly.js only once
+
+    Arguments:
+        figs {List} -- figures to export
+        path {String} -- output html file
+        dedupe {bool} -- deduplicate text arrays, see dedupe_text()
+        **kwargs -- other pio.to_html arguments
+
+    Returns
+        String -- path of the written file
+    """
+
+    divs = [to_html(fig, include_plotlyjs=(i == 0), full_html=False, dedupe=dedupe, **dict(kwargs))
+            for i, fig in enumerate(figs)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html>\n<head><meta charset=\"utf-8\" /></head>\n<body>\n")
+        f.write("\n".join(divs))
+        f.write("\n</body>\n</html>\n")
+    return path
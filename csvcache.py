@@ -0,0 +1,179 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# frames kept in memory, keyed by (absolute path, mtime, size, read options), least recently used first
+_CACHE = OrderedDict()
+# bytes (DataFrame.memory_usage(deep=True)) the cached frames may take together, frames larger than this
+# are read but not kept
+CACHE_BYTES = 1 << 30
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "uncached": 0, "evictions": 0, "bytes": 0}
+# read_csv options that return a reader instead of a frame
+_STREAMING = ("chunksize", "iterator")
+# paths read_csv hands to urllib or fsspec (http://, s3://, file://, ...), never cached
+_URL = re.compile(r"[A-Za-z][A-Za-z0-9+.\-]+://")
+
+
+def _freeze(value):
+    # hashable form of a read_csv option, TypeError for options that can't be part of a key (callables,
+    # buffers, ...)
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return value
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", frozenset(_freeze(v) for v in value))
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(((_freeze(k), _freeze(v)) for k, v in value.items()), key=repr)))
+    if isinstance(value, (type, np.dtype, pd.api.extensions.ExtensionDtype)):
+        return ("dtype", str(value))
+    raise TypeError("can't key on " + repr(value))
+
+
+def _key(path, options):
+    # None when the call can't be cached
+    if not isinstance(path, (str, os.PathLike)) or any(o in options for o in _STREAMING):
+        return None
+    try:
+        frozen = tuple((name, _freeze(options[name])) for name in sorted(options))
+    except TypeError:
+        return None
+    path = os.fspath(path)
+    if isinstance(path, bytes):
+        path = os.fsdecode(path)
+    # only local files have an mtime and size to key on
+    if _URL.match(path) or not os.path.isfile(path):
+        return None
+    path = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size, frozen)
+
+
+# pandas 3 always copies on write, earlier versions only with the option turned on
+_LAZY_COPY = int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+
+def _handout(frame):
+    # callers never get the cached frame itself, a write through it would change what every later call reads
+    if _LAZY_COPY:
+        # a shallow copy shares the data until either side writes to it, so changes to the returned
+        # frame never reach the cached one
+        return frame.copy(deep=False)
+    return frame.copy()
+
+
+def _evict():
+    # drops least recently used frames until the budget holds, called with the lock held
+    while _CACHE and _STATS["bytes"] > CACHE_BYTES:
+        _, (_, size) = _CACHE.popitem(last=False)
+        _STATS["bytes"] -= size
+        _STATS["evictions"] += 1
+
+
+def read_csv(path, **read_csv_kwargs):
+    """ pd.read_csv() that remembers its result: reading the same file with the same options again returns
+        the frame from memory. The key includes the file's modification time and size, so a rewritten
+        file is read again. Calls that can't be cached (URLs and other non-local paths, buffers,
+        chunksize/iterator, callable options) go straight to pd.read_csv.
+
+        sample_df = read_csv("input/sample_data.csv")
+        sample_df = read_csv("input/sample_data.csv").iloc[:, 1:]     # no second parse
+
+    Arguments:
+        path {String or path} -- CSV file
+        **read_csv_kwargs -- passed to pd.read_csv and part of the cache key
+
+    Returns
+        DataFrame -- a copy-on-write copy of the cached frame (a full copy before pandas 3 unless
+        copy-on-write is turned on), safe to modify
+    """
+
+    key = _key(path, read_csv_kwargs)
+    if key is None:
+        with _LOCK:
+            _STATS["uncached"] += 1
+        return pd.read_csv(path, **read_csv_kwargs)
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is not None:
+            _CACHE.move_to_end(key)
+            _STATS["hits"] += 1
+            return _handout(entry[0])
+        _STATS["misses"] += 1
+        # older versions of the file can never be hit again
+        for stale in [k for k in _CACHE if k[0] == key[0] and k[1:3] != key[1:3]]:
+            _STATS["bytes"] -= _CACHE.pop(stale)[1]
+
+    # parsed outside the lock so other files can be served meanwhile
+    frame = pd.read_csv(path, **read_csv_kwargs)
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    if size <= CACHE_BYTES:
+        with _LOCK:
+            if key not in _CACHE:
+                _CACHE[key] = (frame, size)
+                _STATS["bytes"] += size
+                _evict()
+    return _handout(frame)
+
+
+def invalidate(path=None):
+    """ Forgets the cached frames of a file (every set of options), or of all files
+
+    Arguments:
+        path {String or path} -- file to forget, None for all
+
+    Returns
+        int -- number of frames removed
+    """
+
+    with _LOCK:
+        if path is None:
+            keys = list(_CACHE)
+        else:
+            path = os.path.abspath(os.fspath(path))
+            keys = [k for k in _CACHE if k[0] == path]
+        for key in keys:
+            _STATS["bytes"] -= _CACHE.pop(key)[1]
+        return len(keys)
+
+
+def cache_info():
+    """ Counters of the cache: hits, misses, uncached calls, evictions, plus the frames and bytes held
+
+    Returns
+        Dictionary
+    """
+
+    with _LOCK:
+        return dict(_STATS, frames=len(_CACHE), budget=CACHE_BYTES)
+
+
+def reset_stats():
+    """ Sets the hit, miss, uncached and eviction counters back to 0 """
+
+    with _LOCK:
+        for name in ("hits", "misses", "uncached", "evictions"):
+            _STATS[name] = 0
+
+
+def set_budget(nbytes):
+    """ Changes the byte budget, evicting least recently used frames right away if it shrank
+
+    Arguments:
+        nbytes {int} -- bytes the cached frames may take together
+    """
+
+    global CACHE_BYTES
+    if nbytes < 0:
+        raise ValueError("the cache budget can't be negative, got " + str(nbytes))
+    with _LOCK:
+        CACHE_BYTES = int(nbytes)
+        _evict()
@@ -0,0 +1,263 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# downsampled results kept in memory, keyed by (series fingerprint, n_out, method)
+_CACHE = OrderedDict()
+CACHE_SIZE = 128
+
+
+def _as_xy(x, y):
+    """ Converts x and y to float arrays of equal length and drops points that can't be drawn (NaN/inf/NaT)
+
+    Arguments:
+        x {array-like} -- x values, if None the positions 0..n-1 are used
+        y {array-like} -- y values
+
+    Returns
+        Tuple -- (x, y, x_out): x and y as 1D float64 numpy arrays, and the kept x values in their own
+        dtype, which the output is taken from so datetime64/timedelta64 axes keep their type and
+        tz-aware datetimes stay a tz-aware DatetimeIndex
+    """
+
+    y = np.asarray(y, dtype=np.float64).ravel()
+    if x is None:
+        x = x_out = np.arange(len(y), dtype=np.float64)
+    elif _tz_aware(x):
+        # numpy has no tz-aware datetimes, the points are placed by their UTC nanoseconds
+        x_out = pd.DatetimeIndex(x)
+        x = np.where(x_out.isna(), np.nan, x_out.asi8.astype(np.float64))
+    else:
+        x_out = np.asarray(x).ravel()
+        if x_out.dtype.kind in "mM":
+            # nanoseconds (or the unit of the dtype) as numbers, NaT becomes NaN
+            x = np.where(np.isnat(x_out), np.nan, x_out.view("i8").astype(np.float64))
+        else:
+            x = x_out = np.asarray(x_out, dtype=np.float64)
+
+    if len(x) != len(y):
+        raise ValueError("x and y must have the same length, got " + str(len(x)) + " and " + str(len(y)))
+
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        x, y, x_out = x[finite], y[finite], x_out[finite]
+    return x, y, x_out
+
+
+def _tz_aware(x):
+    return getattr(getattr(x, "dtype", None), "tz", None) is not None
+
+
+def _bucket_edges(n, n_buckets):
+    # evenly spaced integer edges splitting range(n) into n_buckets chunks
+    return np.linspace(0, n, n_buckets + 1).astype(np.int64)
+
+
+def lttb(x, y, n_out):
+    """ Largest-Triangle-Three-Buckets downsampling. Keeps the first and last point and, for every
+        bucket in between, the point forming the largest triangle with the previously kept point
+        and the average of the next bucket. Preserves the visual shape of a line plot.
+
+    Arguments:
+        x {array-like} -- x values, must be sorted ascending (None for 0..n-1)
+        y {array-like} -- y values
+        n_out {int} -- number of points to keep (at least 3)
+
+    Returns
+        Tuple -- (x, y) numpy arrays with at most n_out points
+    """
+
+    if n_out < 3:
+        raise ValueError("lttb keeps at least 3 points, got n_out=" + str(n_out))
+    x, y, x_out = _as_xy(x, y)
+    n = len(x)
+    if n_out >= n:
+        return x_out, y
+
+    # first and last points are kept on their own, the rest is split into n_out - 2 buckets
+    edges = _bucket_edges(n - 2, n_out - 2) + 1
+    starts, ends = edges[:-1], edges[1:]
+
+    # average point of every bucket, the last point acts as the "next bucket" of the final bucket
+    counts = ends - starts
+    avg_x = np.append(np.add.reduceat(x[1:-1], starts - 1) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[1:-1], starts - 1) / counts, y[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = starts[i], ends[i]
+        bx, by = x[lo:hi], y[lo:hi]
+        # twice the triangle area, the constant factor doesn't change the argmax
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+
+    return x_out[keep], y[keep]
+
+
+def minmax(x, y, n_out):
+    """ Min/max decimation. Keeps the first and last point, splits the points in between into
+        (n_out - 2) // 2 buckets and keeps the lowest and highest point of each, in their original order.
+        Fully vectorized and guarantees no peak is lost.
+
+    Arguments:
+        x {array-like} -- x values, must be sorted ascending (None for 0..n-1)
+        y {array-like} -- y values
+        n_out {int} -- maximum number of points to keep (at least 2)
+
+    Returns
+        Tuple -- (x, y) numpy arrays with at most n_out points
+    """
+
+    if n_out < 2:
+        raise ValueError("minmax keeps at least 2 points, got n_out=" + str(n_out))
+    x, y, x_out = _as_xy(x, y)
+    n = len(x)
+    if n_out >= n:
+        return x_out, y
+    n_buckets = (n_out - 2) // 2
+    if n_buckets < 1:
+        keep = np.array([0, n - 1])
+        return x_out[keep], y[keep]
+
+    # the buckets cover the points between the first and the last
+    inner = y[1:-1]
+    edges = _bucket_edges(n - 2, n_buckets)
+    starts = edges[:-1]
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+
+    def first_match(values):
+        # position of the first point in each bucket equal to that bucket's min/max
+        hits = np.flatnonzero(inner == values[bucket])
+        first = np.empty(len(hits), dtype=bool)
+        first[0] = True
+        np.not_equal(bucket[hits][1:], bucket[hits][:-1], out=first[1:])
+        return hits[first] + 1
+
+    lows = first_match(np.minimum.reduceat(inner, starts))
+    highs = first_match(np.maximum.reduceat(inner, starts))
+
+    keep = np.unique(np.concatenate((lows, highs, [0, n - 1])))
+    return x_out[keep], y[keep]
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+
+def target_points(width_px, method="lttb"):
+    """ Number of points that fully resolves a line drawn width_px pixels wide. LTTB needs one point
+        per pixel column, min/max decimation needs two (the low and the high of the column).
+
+    Arguments:
+        width_px {int} -- drawable width of the plot in pixels
+        method {String} -- "lttb" or "minmax"
+
+    Returns
+        int -- number of points to keep
+    """
+
+    width_px = max(int(width_px), 3)
+    return width_px * 2 if method == "minmax" else width_px
+
+
+def axes_width(ax):
+    """ Width of a matplotlib axes in device pixels, use with target_points()
+
+    Arguments:
+        ax {matplotlib.axes.Axes} -- axes the series will be drawn on
+
+    Returns
+        int -- width in pixels
+    """
+
+    return int(round(ax.get_window_extent().width))
+
+
+def fingerprint(x, y):
+    """ Content hash of a series, used as a cache key so repeated calls on the same data reuse the result
+
+    Arguments:
+        x {array-like} -- x values (None for 0..n-1)
+        y {array-like} -- y values
+
+    Returns
+        String -- hex digest
+    """
+
+    h = hashlib.blake2b(digest_size=16)
+    for arr in (x, y):
+        if arr is None:
+            h.update(b"none")
+            continue
+        if _tz_aware(arr):
+            # the zone goes into the hash with the dtype, the values as UTC nanoseconds
+            arr = pd.DatetimeIndex(arr)
+            h.update(str(arr.dtype).encode())
+            arr = arr.asi8
+        arr = np.ascontiguousarray(arr)
+        h.update(str(arr.dtype).encode() + str(arr.shape).encode())
+        if arr.dtype == object:
+            h.update(repr(arr.tolist()).encode())
+        else:
+            # datetimes and timedeltas can't be exported as a buffer, their integer view can
+            h.update((arr.view("i8") if arr.dtype.kind in "mM" else arr).data)
+    return h.hexdigest()
+
+
+def _frozen(arr, *inputs):
+    # read-only so a caller can't change a cached result, copied first if it is (a view of) an input.
+    # A pandas Index can't be written to anyway
+    if isinstance(arr, pd.Index):
+        return arr
+    if any(inp is not None and np.may_share_memory(arr, np.asarray(inp)) for inp in inputs):
+        arr = arr.copy()
+    arr.flags.writeable = False
+    return arr
+
+
+def downsample(x, y, n_out=None, method="lttb", width_px=1000, key=None):
+    """ Reduces a series to a pixel-appropriate number of points before plotting. Results are cached
+        per (series, resolution, method), so redrawing the same series at the same size is free.
+
+        plt.plot(*downsample(x, y))
+        go.Scatter(x=dx, y=dy, mode="lines")   # with dx, dy = downsample(x, y, width_px=1200)
+
+    Arguments:
+        x {array-like} -- x values, must be sorted ascending (None for 0..n-1)
+        y {array-like} -- y values
+        n_out {int} -- number of points to keep, defaults to target_points(width_px, method)
+        method {String} -- "lttb" (default) or "minmax"
+        width_px {int} -- plot width in pixels, used when n_out is not given
+        key {hashable} -- optional cache key for the series (e.g. a column name), skips hashing the data.
+                          Only pass this if the data under that key does not change
+
+    Returns
+        Tuple -- (x, y) read-only numpy arrays (they are shared through the cache), x keeps a datetime64
+        or timedelta64 dtype, tz-aware datetimes come back as a DatetimeIndex
+    """
+
+    if method not in METHODS:
+        raise ValueError("method must be one of " + str(list(METHODS)) + ", got " + repr(method))
+    if n_out is None:
+        n_out = target_points(width_px, method)
+
+    cache_key = (key if key is not None else fingerprint(x, y), int(n_out), method)
+    if cache_key in _CACHE:
+        _CACHE.move_to_end(cache_key)
+        return _CACHE[cache_key]
+
+    result = tuple(_frozen(arr, x, y) for arr in METHODS[method](x, y, n_out))
+    _CACHE[cache_key] = result
+    while len(_CACHE) > CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    """ Removes every cached downsampled series """
+
+    _CACHE.clear()
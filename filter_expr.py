@@ -0,0 +1,437 @@
+import abc
+import ast
+import operator
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
+# rows per block, small enough that a block's values and masks stay in the CPU cache
+BLOCK_ROWS = 1 << 16
+
+_NUMPY_OPS = {"==": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal,
+              ">": np.greater, ">=": np.greater_equal}
+_ARROW_OPS = {"==": "equal", "!=": "not_equal", "<": "less", "<=": "less_equal",
+              ">": "greater", ">=": "greater_equal"}
+_FLIPPED = {"==": "==", "!=": "!=", "<": ">", "<=": ">=", ">": "<", ">=": "<="}
+_AST_OPS = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+
+
+# expression tree
+
+class Expr(abc.ABC):
+    """ A boolean filter over the rows of a frame. Combine with & (and), | (or) and ~ (not). """
+
+    def __and__(self, other):
+        return _And(self, other)
+
+    def __or__(self, other):
+        return _Or(self, other)
+
+    def __invert__(self):
+        return _Not(self)
+
+    @abc.abstractmethod
+    def columns(self):
+        """ Names of the columns the expression reads """
+
+
+class _Compare(Expr):
+    def __init__(self, column, op, value=None):
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def columns(self):
+        return {self.column}
+
+    def __repr__(self):
+        return "(" + repr(self.column) + " " + self.op + " " + repr(self.value) + ")"
+
+
+class _BoolOp(Expr):
+    # what & and | have in common, the subclasses only differ in how the two sides are combined
+    symbol = None
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def columns(self):
+        return self.left.columns() | self.right.columns()
+
+    def __repr__(self):
+        return "(" + repr(self.left) + " " + self.symbol + " " + repr(self.right) + ")"
+
+
+class _And(_BoolOp):
+    symbol = "&"
+
+
+class _Or(_BoolOp):
+    symbol = "|"
+
+
+class _Not(Expr):
+    def __init__(self, child):
+        self.child = child
+
+    def columns(self):
+        return self.child.columns()
+
+    def __repr__(self):
+        return "~" + repr(self.child)
+
+
+class col:
+    """ Column reference for building filters in Python instead of a string:
+
+        (col("Permit Type") == 4) | (col("Permit Type Definition") == "demolitions")
+        col("Street Name").isin(["Ellis", "Market"]) & col("Estimated Cost").between(1000, 5000)
+    """
+
+    __hash__ = None
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, value):
+        return _Compare(self.name, "==", value)
+
+    def __ne__(self, value):
+        return _Compare(self.name, "!=", value)
+
+    def __lt__(self, value):
+        return _Compare(self.name, "<", value)
+
+    def __le__(self, value):
+        return _Compare(self.name, "<=", value)
+
+    def __gt__(self, value):
+        return _Compare(self.name, ">", value)
+
+    def __ge__(self, value):
+        return _Compare(self.name, ">=", value)
+
+    def isin(self, values):
+        return _Compare(self.name, "isin", list(values))
+
+    def between(self, low, high):
+        # inclusive on both ends, like Series.between
+        return _And(_Compare(self.name, ">=", low), _Compare(self.name, "<=", high))
+
+    def isna(self):
+        return _Compare(self.name, "isna")
+
+    def notna(self):
+        return _Not(_Compare(self.name, "isna"))
+
+
+# string parsing
+
+def _constant(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _constant(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [_constant(e) for e in node.elts]
+    raise ValueError("expected a constant, got " + ast.unparse(node))
+
+
+def _column(node, names):
+    # df["name"], col("name"), a bare name or a `backticked name`
+    if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant):
+        return node.slice.value
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "col" and len(node.args) == 1:
+        return _constant(node.args[0])
+    if isinstance(node, ast.Name):
+        return names.get(node.id, node.id)
+    return None
+
+
+def _convert(node, names):
+    if isinstance(node, ast.BoolOp):
+        combine = _And if isinstance(node.op, ast.And) else _Or
+        result = _convert(node.values[0], names)
+        for value in node.values[1:]:
+            result = combine(result, _convert(value, names))
+        return result
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+        combine = _And if isinstance(node.op, ast.BitAnd) else _Or
+        return combine(_convert(node.left, names), _convert(node.right, names))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.Invert)):
+        return _Not(_convert(node.operand, names))
+    if isinstance(node, ast.Compare):
+        result = None
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            part = _comparison(left, op, right, names)
+            result = part if result is None else _And(result, part)
+            left = right
+        return result
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        name = _column(node.func.value, names)
+        method = node.func.attr
+        args = [_constant(a) for a in node.args]
+        if name is not None and method in ("isin", "between", "isna", "notna", "isnull", "notnull"):
+            method = {"isnull": "isna", "notnull": "notna"}.get(method, method)
+            return getattr(col(name), method)(*args)
+    raise ValueError("unsupported filter expression: " + ast.unparse(node))
+
+
+def _comparison(left, op, right, names):
+    name = _column(left, names)
+    if isinstance(op, (ast.In, ast.NotIn)):
+        if name is None:
+            raise ValueError("expected a column on the left of 'in', got " + ast.unparse(left))
+        match = _Compare(name, "isin", _constant(right))
+        return match if isinstance(op, ast.In) else _Not(match)
+    if type(op) not in _AST_OPS:
+        raise ValueError("unsupported comparison " + type(op).__name__)
+    symbol = _AST_OPS[type(op)]
+    if name is not None:
+        return _Compare(name, symbol, _constant(right))
+    name = _column(right, names)
+    if name is None:
+        raise ValueError("comparisons need a column on one side: " + ast.unparse(left) + " " + symbol + " " + ast.unparse(right))
+    return _Compare(name, _FLIPPED[symbol], _constant(left))
+
+
+@lru_cache(maxsize=256)
+def parse(text):
+    """ Parses a filter written like the pandas expression or like DataFrame.query():
+
+        parse('(df["Permit Type"] == 4) | (df["Permit Type Definition"] == "demolitions")')
+        parse('`Permit Type` in [1, 4] and not `Street Name`.isna()')
+
+        Supports ==, !=, <, <=, >, >= (chained too), in / not in, &, |, ~, and, or, not, and the methods
+        isin, between, isna, notna. Python precedence applies, so a == 1 | b == 2 needs parentheses like in
+        pandas. Parsed filters are cached by text.
+
+    Arguments:
+        text {String} -- filter expression
+
+    Returns
+        Expr
+    """
+
+    names = {}
+
+    def placeholder(match):
+        key = "__column" + str(len(names)) + "__"
+        names[key] = match.group(1)
+        return key
+
+    source = re.sub(r"`([^`]+)`", placeholder, text)
+    return _convert(ast.parse(source.strip(), mode="eval").body, names)
+
+
+# columns
+
+def _is_arrow(series):
+    dtype = series.dtype
+    return pa is not None and (isinstance(dtype, pd.ArrowDtype) or getattr(dtype, "storage", None) == "pyarrow")
+
+
+def _has_na(values):
+    return any(pd.api.types.is_scalar(v) and pd.isna(v) for v in values)
+
+
+class _NumpyColumn:
+    # once fewer than 1 in dense rows of a block are still candidates, only those rows are gathered and
+    # compared. Gathering numbers costs about as much as comparing them, so it only pays off for few rows
+    dense = 32
+
+    def __init__(self, series):
+        self.values = series.to_numpy()
+
+    def compare(self, op, value, lo, hi, rows):
+        # mask over the block lo:hi, or over the block positions rows only
+        return self._apply(op, value, self.values[lo:hi] if rows is None else self.values[lo + rows])
+
+    def _apply(self, op, value, values):
+        if op == "isna":
+            return pd.isna(values)
+        if op == "isin":
+            mask = np.isin(values, [v for v in value if not (pd.api.types.is_scalar(v) and pd.isna(v))])
+            if _has_na(value):
+                mask |= pd.isna(values)
+            return mask
+        if values.dtype.kind in "iufcb" and isinstance(value, str):
+            # same as pandas: a number column equals no string
+            if op in ("==", "!="):
+                return np.full(len(values), op == "!=")
+            raise TypeError("Invalid comparison between dtype=" + str(values.dtype) + " and str")
+        return _NUMPY_OPS[op](values, value)
+
+
+class _ArrowColumn:
+    # string comparisons cost much more than gathering the strings
+    dense = 6
+
+    def __init__(self, series):
+        data = pa.array(series.array)
+        self.data = data if isinstance(data, pa.ChunkedArray) else pa.chunked_array([data])
+
+    def compare(self, op, value, lo, hi, rows):
+        if rows is None:
+            return self._apply(op, value, self.data.slice(lo, hi - lo))
+        return self._apply(op, value, self.data.take(pa.array(lo + rows)))
+
+    def _apply(self, op, value, data):
+        if op == "isna":
+            result = pc.is_null(data, nan_is_null=True)
+        elif op == "isin":
+            present = [v for v in value if not (pd.api.types.is_scalar(v) and pd.isna(v))]
+            try:
+                result = pc.is_in(data, value_set=pa.array(present).cast(data.type), skip_nulls=True)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                # values of another type can't match
+                result = pc.is_in(data, value_set=pa.array([], data.type))
+            if _has_na(value):
+                result = pc.or_(result, pc.is_null(data, nan_is_null=True))
+        else:
+            try:
+                result = getattr(pc, _ARROW_OPS[op])(data, pa.scalar(value, data.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError, TypeError):
+                if op in ("==", "!="):
+                    return np.full(len(data), op == "!=")
+                raise TypeError("Invalid comparison between dtype=" + str(data.type) + " and " + type(value).__name__)
+        # missing values compare unequal to everything, like in pandas
+        return result.fill_null(op == "!=").to_numpy(zero_copy_only=False)
+
+
+class _SeriesColumn:
+    # any other extension dtype (categorical, nullable integers, tz-aware datetimes...) goes through pandas
+    dense = 4
+
+    def __init__(self, series):
+        self.series = series
+
+    def compare(self, op, value, lo, hi, rows):
+        part = self.series.iloc[lo:hi] if rows is None else self.series.iloc[lo + rows]
+        if op == "isna":
+            result = part.isna()
+        elif op == "isin":
+            result = part.isin(value)
+        else:
+            result = getattr(operator, {"==": "eq", "!=": "ne", "<": "lt", "<=": "le", ">": "gt", ">=": "ge"}[op])(part, value)
+        return result.to_numpy(dtype=bool, na_value=op == "!=")
+
+
+def _prepare(df, names):
+    columns = {}
+    for name in names:
+        series = df[name]
+        if isinstance(series.array, pd.arrays.NumpyExtensionArray):
+            columns[name] = _NumpyColumn(series)
+        elif _is_arrow(series):
+            columns[name] = _ArrowColumn(series)
+        else:
+            columns[name] = _SeriesColumn(series)
+    return columns
+
+
+# evaluation
+
+def _compare(node, columns, lo, hi, candidates):
+    column = columns[node.column]
+    if candidates is None:
+        return column.compare(node.op, node.value, lo, hi, None)
+    count = np.count_nonzero(candidates)
+    if count * column.dense > hi - lo:
+        # most rows are still candidates: comparing the contiguous block is cheaper than gathering
+        return np.logical_and(column.compare(node.op, node.value, lo, hi, None), candidates)
+    mask = np.zeros(hi - lo, dtype=bool)
+    if count:
+        rows = np.flatnonzero(candidates)
+        mask[rows] = column.compare(node.op, node.value, lo, hi, rows)
+    return mask
+
+
+def _eval(node, columns, lo, hi, candidates):
+    """ Mask of the rows of the block lo:hi that satisfy node, among the candidates (a mask, None for every
+        row). Every step only looks at the rows still in question: the right side of an and only sees the
+        rows the left side kept, the right side of an or only the rows the left side didn't match, and a
+        side with no rows left isn't evaluated at all.
+    """
+
+    if isinstance(node, _Or):
+        left = _eval(node.left, columns, lo, hi, candidates)
+        rest = ~left if candidates is None else candidates & ~left
+        if not rest.any():
+            return left
+        return left | _eval(node.right, columns, lo, hi, rest)
+    if isinstance(node, _And):
+        left = _eval(node.left, columns, lo, hi, candidates)
+        if not left.any():
+            return left
+        return _eval(node.right, columns, lo, hi, left)
+    if isinstance(node, _Not):
+        matched = _eval(node.child, columns, lo, hi, candidates)
+        return ~matched if candidates is None else candidates & ~matched
+    return _compare(node, columns, lo, hi, candidates)
+
+
+def compile_filter(expr):
+    """ The Expr for a filter given as a string (see parse()) or already built with col() """
+
+    if isinstance(expr, str):
+        return parse(expr)
+    if not isinstance(expr, Expr):
+        raise TypeError("expected a filter string or expression, got " + type(expr).__name__)
+    return expr
+
+
+def positions(df, expr, workers=None, block_rows=BLOCK_ROWS):
+    """ Row positions matching a filter, the same rows as df.loc[mask] for the equivalent boolean mask,
+        computed block by block without building a full-length mask per comparison.
+
+        positions(df, '(df["Permit Type"] == 4) | (df["Permit Type Definition"] == "demolitions")')
+
+    Arguments:
+        df {DataFrame} -- frame to filter
+        expr {String or Expr} -- the filter
+        workers {int} -- threads evaluating blocks, defaults to the CPU count
+        block_rows {int} -- rows per block
+
+    Returns
+        numpy.ndarray -- sorted int64 row positions, use df.iloc[positions]
+    """
+
+    tree = compile_filter(expr)
+    columns = _prepare(df, tree.columns())
+    n = len(df)
+    blocks = [(lo, min(lo + block_rows, n)) for lo in range(0, n, block_rows)]
+
+    def run(block):
+        lo, hi = block
+        return np.flatnonzero(_eval(tree, columns, lo, hi, None)) + lo
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(blocks) <= 1:
+        parts = [run(b) for b in blocks]
+    else:
+        # numpy and Arrow release the GIL inside the comparisons, so blocks run side by side
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(run, blocks))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def select(df, expr, workers=None, block_rows=BLOCK_ROWS):
+    """ The rows of df matching a filter, same result as df.loc[mask]. See positions(). """
+
+    return df.iloc[positions(df, expr, workers, block_rows)]
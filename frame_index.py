@@ -0,0 +1,292 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+KINDS = ("hash", "sorted")
+
+
+def _token(series):
+    """ Identity of the memory behind a column. Because the index keeps a reference to each column it
+        indexed, pandas' copy-on-write gives the frame a new buffer on any in-place write, so a changed
+        token means the column may have changed.
+    """
+
+    values = series.array
+    if isinstance(values, pd.arrays.NumpyExtensionArray):
+        data = values.to_numpy()
+        return (data.__array_interface__["data"][0], len(data))
+    return (id(values), len(values))
+
+
+def _intersect(a, b):
+    # both sorted and unique, looks the smaller one up in the larger one
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return a
+    found = np.searchsorted(b, a)
+    found[found == len(b)] = 0
+    return a[b[found] == a]
+
+
+def _union(a, b, n):
+    if len(a) + len(b) > n // 16:
+        # dense results: a row mask is cheaper than merging the sorted arrays
+        mask = np.zeros(n, dtype=bool)
+        mask[a] = True
+        mask[b] = True
+        return np.flatnonzero(mask)
+    return np.union1d(a, b)
+
+
+class Rows:
+    """ Sorted row positions matched by an index lookup. Combine lookups with & (and), | (or) and ~ (not),
+        then get the frame rows with FrameIndex.select() or df.iloc[rows.positions].
+    """
+
+    __slots__ = ("positions", "n")
+
+    def __init__(self, positions, n):
+        self.positions = positions
+        self.n = n
+
+    def __and__(self, other):
+        return Rows(_intersect(self.positions, other.positions), self.n)
+
+    def __or__(self, other):
+        return Rows(_union(self.positions, other.positions, self.n), self.n)
+
+    def __invert__(self):
+        mask = np.ones(self.n, dtype=bool)
+        mask[self.positions] = False
+        return Rows(np.flatnonzero(mask), self.n)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __repr__(self):
+        return "Rows(" + str(len(self)) + " of " + str(self.n) + ")"
+
+
+def _hash_key(value, kind):
+    # pandas' hash lookups keep booleans apart from numbers, while == and Series.isin treat True as 1
+    if kind in "iuf" and isinstance(value, (bool, np.bool_)):
+        return int(value)
+    if kind == "b" and isinstance(value, (int, float, np.number)) and not isinstance(value, bool) and value in (0, 1):
+        return bool(value)
+    return value
+
+
+class _HashColumn:
+    # every distinct value mapped to the sorted positions of its rows
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series)
+        # missing values get code -1, shifted to their own bucket 0
+        codes = codes + 1
+        self.order = np.argsort(codes, kind="stable")
+        self.bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(uniques) + 1))))
+        self.uniques = pd.Index(uniques)
+
+    def _bucket(self, code):
+        return self.order[self.bounds[code]:self.bounds[code + 1]]
+
+    def eq(self, value):
+        if pd.isna(value):
+            return self.order[:0]
+        code = self.uniques.get_indexer([_hash_key(value, self.uniques.dtype.kind)])[0]
+        if code < 0:
+            return self.order[:0]
+        return self._bucket(code + 1)
+
+    def isin(self, values):
+        values = list(values)
+        kind = self.uniques.dtype.kind
+        # values that aren't in the column come back as -1, shifted to 0
+        codes = self.uniques.get_indexer([_hash_key(v, kind) for v in values]) + 1
+        codes = codes[codes > 0]
+        if any(pd.api.types.is_scalar(v) and pd.isna(v) for v in values):
+            # like Series.isin, missing values match each other
+            codes = np.append(codes, 0)
+        parts = [self._bucket(c) for c in np.unique(codes)]
+        if not parts:
+            return self.order[:0]
+        return np.sort(np.concatenate(parts))
+
+    def between(self, low, high):
+        raise TypeError("range lookups need a sorted index, build it with kind=\"sorted\"")
+
+
+class _SortedColumn:
+    # positions sorted by value, lookups are binary searches. Missing values sort last, only isin() matches them
+    def __init__(self, series):
+        values = series.to_numpy()
+        missing = pd.isna(values)
+        present = np.flatnonzero(~missing)
+        order = present[np.argsort(values[present], kind="stable")]
+        self.order = np.concatenate((order, np.flatnonzero(missing)))
+        self.values = values[order]
+
+    def _comparable(self, value):
+        # numpy would parse "4" as 4 when searching an int array, while df[column] == "4" matches nothing
+        return self.values.dtype.kind not in "iufcb" or isinstance(value, (int, float, complex, np.number, np.bool_))
+
+    def _span(self, lo, hi):
+        return np.sort(self.order[lo:hi])
+
+    def eq(self, value):
+        if pd.isna(value) or not self._comparable(value):
+            return self.order[:0]
+        try:
+            return self._span(np.searchsorted(self.values, value, "left"), np.searchsorted(self.values, value, "right"))
+        except TypeError:
+            # not comparable with the column's values, so equal to none of them
+            return self.order[:0]
+
+    def isin(self, values):
+        values = list(values)
+        parts = [self.eq(v) for v in set(values)]
+        if any(pd.api.types.is_scalar(v) and pd.isna(v) for v in values):
+            # like Series.isin, missing values match each other
+            parts.append(self.order[len(self.values):])
+        if not parts:
+            return self.order[:0]
+        return np.sort(np.concatenate(parts))
+
+    def between(self, low, high):
+        if not all(v is None or self._comparable(v) for v in (low, high)):
+            raise TypeError("can't compare " + str(self.values.dtype) + " values with " + repr((low, high)))
+        lo = 0 if low is None else np.searchsorted(self.values, low, "left")
+        hi = len(self.values) if high is None else np.searchsorted(self.values, high, "right")
+        return self._span(lo, max(lo, hi))
+
+
+class FrameIndex:
+    """ Opt-in lookup index over some columns of a DataFrame. Each column is indexed once, and equality,
+        IN-list and range lookups return row positions without scanning the columns again.
+
+        ix = FrameIndex(df, ["Permit Type", "Street Name", "Permit Type Definition"])
+        ix.select(ix.eq("Permit Type", 4))                                   # df.loc[df["Permit Type"] == 4]
+        ix.select(ix.eq("Permit Type", 4) & ix.eq("Street Name", "Ellis"))
+        ix.select(ix.eq("Permit Type", 4) | ix.eq("Permit Type Definition", "demolitions"))
+        ix.select(ix.isin("Permit Type", [1, 4]))
+
+        kind="hash" groups the rows of each distinct value, kind="sorted" keeps the rows sorted by value and
+        also answers between(). The frame can still be changed freely: every lookup checks that the column's
+        data is the one that was indexed (an O(1) check under pandas' copy-on-write) and re-indexes a column
+        the first time it is used after a change. Because the index holds on to the indexed data, the first
+        write after a lookup makes pandas copy that column's block once.
+    """
+
+    def __init__(self, df, columns, kind="hash"):
+        kinds = kind if isinstance(kind, dict) else {c: kind for c in columns}
+        for column, k in kinds.items():
+            if k not in KINDS:
+                raise ValueError("kind must be one of " + str(list(KINDS)) + ", got " + repr(k) + " for " + repr(column))
+        self.df = df
+        self.kinds = {c: kinds.get(c, "hash") for c in columns}
+        self._columns = {}
+        self.builds = 0
+        for column in self.kinds:
+            self._build(column)
+
+    def _build(self, column):
+        series = self.df[column]
+        structure = _HashColumn(series) if self.kinds[column] == "hash" else _SortedColumn(series)
+        # the series itself is kept: it holds the indexed buffer, which makes pandas copy instead of writing in place
+        self._columns[column] = (series, _token(series), structure)
+        self.builds += 1
+
+    def _column(self, column):
+        if column not in self._columns:
+            raise KeyError(repr(column) + " is not indexed, indexed columns are " + str(list(self.kinds)))
+        series, token, structure = self._columns[column]
+        current = self.df[column]
+        if _token(current) != token:
+            if len(current) == len(series) and current.array.equals(series.array):
+                # new buffer, same values (e.g. another column in the same block was written)
+                self._columns[column] = (current, _token(current), structure)
+            else:
+                self._build(column)
+                structure = self._columns[column][2]
+        return structure
+
+    def _rows(self, positions):
+        return Rows(positions, len(self.df))
+
+    def eq(self, column, value):
+        """ Rows where column == value """
+
+        return self._rows(self._column(column).eq(value))
+
+    def isin(self, column, values):
+        """ Rows where column is one of values, same as df[column].isin(values) """
+
+        return self._rows(self._column(column).isin(values))
+
+    def between(self, column, low=None, high=None):
+        """ Rows where low <= column <= high (None leaves a side open), sorted indexes only """
+
+        return self._rows(self._column(column).between(low, high))
+
+    def where(self, conditions):
+        """ Rows matching every condition, e.g. where({"Permit Type": 4, "Street Name": "Ellis"}). A list,
+            set or tuple as the value is an IN-list.
+        """
+
+        rows = None
+        for column, value in conditions.items():
+            if isinstance(value, (list, set, tuple)):
+                match = self.isin(column, value)
+            else:
+                match = self.eq(column, value)
+            rows = match if rows is None else rows & match
+        return rows if rows is not None else self._rows(np.arange(len(self.df)))
+
+    def select(self, rows):
+        """ The frame rows at the given positions
+
+        Arguments:
+            rows {Rows} -- result of a lookup
+
+        Returns
+            DataFrame
+        """
+
+        return self.df.iloc[rows.positions]
+
+
+def benchmark(df, queries, columns, repeat=20):
+    """ Compares boolean-mask filtering with FrameIndex lookups
+
+    Arguments:
+        df {DataFrame} -- frame to filter
+        queries {Dictionary} -- name -> (mask_function(df), index_function(ix)) returning the mask and the Rows
+        columns {List} -- columns to index
+        repeat {int} -- runs per query, the median is reported
+
+    Returns
+        DataFrame -- per query: rows matched, mask and index latency in milliseconds, speedup, plus the build time
+    """
+
+    start = time.perf_counter()
+    ix = FrameIndex(df, columns)
+    build = time.perf_counter() - start
+
+    records = []
+    for name, (mask_query, index_query) in queries.items():
+        mask_times, index_times = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            expected = df.loc[mask_query(df)]
+            mask_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            result = ix.select(index_query(ix))
+            index_times.append(time.perf_counter() - start)
+        if not result.index.equals(expected.index):
+            raise AssertionError("index lookup and mask disagree for " + repr(name))
+        mask_ms = np.median(mask_times) * 1000
+        index_ms = np.median(index_times) * 1000
+        records.append({"query": name, "rows": len(result), "mask_ms": mask_ms, "index_ms": index_ms,
+                        "speedup": mask_ms / index_ms, "build_ms": build * 1000})
+    return pd.DataFrame(records)
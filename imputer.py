@@ -0,0 +1,313 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+STRATEGIES = ("mean", "median", "mode", "constant", "group_mean")
+
+
+def _plain(value):
+    # numpy scalars to Python ones so the statistics can be written as JSON
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _add_counts(a, b):
+    # value -> count Series, summed per value. concat + groupby works for mixed-type object values too
+    if a is None:
+        return b
+    return pd.concat([a, b]).groupby(level=0, sort=False).sum()
+
+
+class Imputer:
+    """ Fills missing values of many columns at once, each with its own policy. Every statistic is
+        collected in a single pass over the data, which can be a whole frame or chunks streamed from
+        read_csv(chunksize=...), and the fills are applied in a second pass with transform().
+
+        imp = Imputer({"Number of Existing Stories": "mean",
+                       "Street Number Suffix": ("constant", "None"),
+                       "Estimated Cost": ("group_mean", "Permit Type"),
+                       "Zipcode": "mode"},
+                      decimals={"Number of Existing Stories": 0})
+        imp.fit(pd.read_csv(path, chunksize=100000))
+        bld_df = imp.transform(bld_df)
+        imp.save("imputer.json")      # Imputer.load("imputer.json").transform(next_batch)
+
+        Policies: "mean", "median", "mode" (the smallest of the most frequent values, like
+        Series.mode()[0]), ("constant", value), and ("group_mean", key), the mean of the column over the
+        rows with the same key value. Rows whose key has no mean (a missing key, a key never seen or a
+        group with no values) get the column's overall mean instead.
+
+        The median and mode keep a count per distinct value, so they are exact but grow with the number of
+        distinct values. Statistics only count present values, like pandas' aggregations.
+    """
+
+    def __init__(self, policy, decimals=None):
+        self.policy = {}
+        for column, spec in policy.items():
+            strategy, arg = (spec, None) if isinstance(spec, str) else tuple(spec)
+            if strategy not in STRATEGIES:
+                raise ValueError("unknown strategy " + repr(strategy) + " for " + repr(column) +
+                                 ", expected one of " + str(list(STRATEGIES)))
+            if strategy in ("mean", "median", "mode") and arg is not None:
+                raise ValueError(repr(strategy) + " takes no argument, got " + repr(spec) + " for " + repr(column))
+            self.policy[column] = (strategy, arg)
+        # digits means are rounded to, per column (0 gives an int like round(avg) in the notebook)
+        self.decimals = dict(decimals or {})
+        self._reset()
+
+    def _reset(self):
+        self.rows = 0
+        self._sum = {}
+        self._count = {}
+        self._values = {}
+        self._group_sum = {}
+        self._group_count = {}
+        self._fills = None
+
+    def _columns(self, *strategies):
+        return [c for c, (s, _) in self.policy.items() if s in strategies]
+
+    def partial_fit(self, chunk):
+        """ Adds a chunk of rows to the statistics
+
+        Arguments:
+            chunk {DataFrame} -- rows with (at least) the imputed columns and group keys
+
+        Returns
+            Imputer -- self
+        """
+
+        self.rows += len(chunk)
+        # group means fall back on the overall mean, so those columns need it too
+        means = self._columns("mean", "group_mean")
+        if means:
+            sums = chunk[means].sum()
+            counts = chunk[means].count()
+            for column in means:
+                self._sum[column] = self._sum.get(column, 0.0) + float(sums[column])
+                self._count[column] = self._count.get(column, 0) + int(counts[column])
+
+        for column in self._columns("median", "mode"):
+            self._values[column] = _add_counts(self._values.get(column), chunk[column].value_counts())
+
+        keys = {}
+        for column, (strategy, key) in self.policy.items():
+            if strategy == "group_mean":
+                keys.setdefault(key, []).append(column)
+        for key, columns in keys.items():
+            # one grouping per key, however many columns are averaged by it
+            grouped = chunk.groupby(key, sort=False)[columns]
+            sums, counts = grouped.sum(), grouped.count()
+            if key in self._group_sum:
+                sums = self._group_sum[key].add(sums, fill_value=0)
+                counts = self._group_count[key].add(counts, fill_value=0)
+            self._group_sum[key], self._group_count[key] = sums, counts
+
+        self._fills = None
+        return self
+
+    def fit(self, data):
+        """ Computes the statistics from scratch
+
+        Arguments:
+            data {DataFrame or iterable} -- frame or chunks of a frame, each read once
+
+        Returns
+            Imputer -- self
+        """
+
+        self._reset()
+        for chunk in [data] if isinstance(data, pd.DataFrame) else data:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other):
+        """ Adds the statistics of another Imputer with the same policy (e.g. fitted by another worker)
+
+        Arguments:
+            other {Imputer} -- partial result to merge in
+
+        Returns
+            Imputer -- self
+        """
+
+        if other.policy != self.policy:
+            raise ValueError("can only merge Imputers with the same policy")
+        self.rows += other.rows
+        for column in other._sum:
+            self._sum[column] = self._sum.get(column, 0.0) + other._sum[column]
+            self._count[column] = self._count.get(column, 0) + other._count[column]
+        for column, counts in other._values.items():
+            self._values[column] = _add_counts(self._values.get(column), counts)
+        for key in other._group_sum:
+            if key in self._group_sum:
+                self._group_sum[key] = self._group_sum[key].add(other._group_sum[key], fill_value=0)
+                self._group_count[key] = self._group_count[key].add(other._group_count[key], fill_value=0)
+            else:
+                self._group_sum[key] = other._group_sum[key].copy()
+                self._group_count[key] = other._group_count[key].copy()
+        self._fills = None
+        return self
+
+    def _round(self, column, value):
+        digits = self.decimals.get(column)
+        if digits is None or value is None or (isinstance(value, float) and math.isnan(value)):
+            return value
+        return round(value) if digits == 0 else round(value, digits)
+
+    def _mean(self, column):
+        count = self._count.get(column, 0)
+        return self._sum[column] / count if count else float("nan")
+
+    def _median(self, column):
+        counts = self._values.get(column)
+        if counts is None or not len(counts):
+            return float("nan")
+        counts = counts.sort_index()
+        cum = np.cumsum(counts.to_numpy())
+        n = int(cum[-1])
+        # middle value, or the average of the two middle values
+        lower = counts.index[np.searchsorted(cum, (n - 1) // 2, side="right")]
+        upper = counts.index[np.searchsorted(cum, n // 2, side="right")]
+        return (lower + upper) / 2
+
+    def _mode(self, column):
+        counts = self._values.get(column)
+        if counts is None or not len(counts):
+            return float("nan")
+        best = counts.index[counts.to_numpy() == counts.max()]
+        try:
+            return sorted(best)[0]
+        except TypeError:
+            # values of different types can't be sorted, the first one seen wins
+            return best[0]
+
+    def statistics(self):
+        """ The fill value of every column: a scalar, or for group means a (key, Series of means by key
+            value, overall mean) tuple. NaN means there was nothing to compute it from.
+
+        Returns
+            Dictionary -- column -> fill
+        """
+
+        if self._fills is not None:
+            return self._fills
+        fills = {}
+        for column, (strategy, arg) in self.policy.items():
+            if strategy == "constant":
+                fills[column] = arg
+            elif strategy == "mode":
+                fills[column] = _plain(self._mode(column))
+            elif strategy == "median":
+                fills[column] = _plain(self._median(column))
+            elif strategy == "mean":
+                fills[column] = self._round(column, self._mean(column))
+            else:
+                counts = self._group_count[arg][column] if arg in self._group_count else pd.Series(dtype=float)
+                sums = self._group_sum[arg][column] if arg in self._group_sum else pd.Series(dtype=float)
+                means = (sums / counts)[counts > 0]
+                if self.decimals.get(column) is not None:
+                    means = means.map(lambda v: self._round(column, v))
+                fills[column] = (arg, means, self._round(column, self._mean(column)))
+        self._fills = fills
+        return fills
+
+    def transform(self, df):
+        """ Fills the missing values of a frame, or of each chunk of an iterable of frames
+
+        Arguments:
+            df {DataFrame or iterable} -- frame, or chunks to fill one by one
+
+        Returns
+            DataFrame, or a generator of DataFrames for chunks. Columns without missing values are
+            left untouched (shared with the input under copy-on-write)
+        """
+
+        if not isinstance(df, pd.DataFrame):
+            return (self.transform(chunk) for chunk in df)
+        fills = self.statistics()
+        scalars = {}
+        groups = {}
+        for column, fill in fills.items():
+            if column not in df.columns:
+                continue
+            if isinstance(fill, tuple):
+                groups[column] = fill
+            elif not (pd.api.types.is_scalar(fill) and pd.isna(fill)):
+                scalars[column] = fill
+        missing = df[list(scalars) + list(groups)].isna().any() if scalars or groups else pd.Series(dtype=bool)
+        scalars = {c: v for c, v in scalars.items() if missing[c]}
+        out = df.fillna(scalars) if scalars else df
+        for column, (key, means, overall) in groups.items():
+            if not missing[column]:
+                continue
+            if out is df:
+                out = df.copy(deep=False)
+            filled = df[column].fillna(df[key].map(means))
+            out[column] = filled if pd.isna(overall) else filled.fillna(overall)
+        return out
+
+    def fit_transform(self, df):
+        """ fit() then transform() on the same frame """
+
+        return self.fit(df).transform(df)
+
+    # persistence
+
+    def to_dict(self):
+        """ The policy and the fitted statistics as plain JSON types, see from_dict() """
+
+        def pairs(series):
+            return [[_plain(k), _plain(v)] for k, v in series.items()]
+
+        return {"policy": {c: [s, _plain(a)] for c, (s, a) in self.policy.items()},
+                "decimals": self.decimals,
+                "rows": self.rows,
+                "sum": self._sum,
+                "count": self._count,
+                "values": {c: pairs(v) for c, v in self._values.items()},
+                "groups": [{"key": _plain(k),
+                            "sum": {c: pairs(self._group_sum[k][c]) for c in self._group_sum[k]},
+                            "count": {c: pairs(self._group_count[k][c]) for c in self._group_count[k]}}
+                           for k in self._group_sum]}
+
+    @classmethod
+    def from_dict(cls, state):
+        """ Rebuilds an Imputer from to_dict(), ready to transform new batches or to keep fitting
+
+        Arguments:
+            state {Dictionary} -- output of to_dict()
+
+        Returns
+            Imputer
+        """
+
+        def series(pairs):
+            return pd.Series([v for _, v in pairs], index=[k for k, _ in pairs], dtype=float if pairs else None)
+
+        imp = cls({c: tuple(spec) for c, spec in state["policy"].items()}, state["decimals"])
+        imp.rows = state["rows"]
+        imp._sum = dict(state["sum"])
+        imp._count = dict(state["count"])
+        imp._values = {c: series(p).astype(np.int64) for c, p in state["values"].items()}
+        for group in state["groups"]:
+            key = group["key"]
+            imp._group_sum[key] = pd.DataFrame({c: series(p) for c, p in group["sum"].items()})
+            imp._group_count[key] = pd.DataFrame({c: series(p) for c, p in group["count"].items()})
+        return imp
+
+    def save(self, path):
+        """ Writes the policy and statistics to a JSON file. Values, constants and group keys must be
+            numbers, strings, booleans or None.
+        """
+
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        """ Reads an Imputer written by save() """
+
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,222 @@
+import array
+import operator
+import sys
+from itertools import chain
+
+import numpy as np
+
+# values formatted per step by Matrix.format()
+FORMAT_BLOCK = 1 << 20
+
+
+class Matrix:
+    """ 2D grid stored in one flat typed buffer (an array.array or the memory of a numpy array) instead of
+        a list of lists. Slicing gives views that share the buffer, so edits through a view show up in
+        the original.
+
+        m = Matrix.from_lists([[1, 2, 3], [4, 5, 6]])
+        m[0, 2]            # same as list_2d[0][2]
+        m.row(1)           # memoryview of the second row
+        m[:, 1:]           # Matrix view of the last two columns
+        m.write(sys.stdout)
+    """
+
+    __slots__ = ("_buf", "rows", "cols", "_offset", "_rstride", "_cstride")
+
+    def __init__(self, rows, cols, typecode="d", buffer=None, offset=0, strides=None):
+        if buffer is None:
+            buffer = array.array(typecode, bytes(array.array(typecode).itemsize * rows * cols))
+        buf = memoryview(buffer)
+        if buf.ndim != 1:
+            buf = buf.cast("B").cast(buf.format)
+        self._buf = buf
+        self.rows = rows
+        self.cols = cols
+        self._offset = offset
+        self._rstride, self._cstride = strides if strides is not None else (cols, 1)
+        if rows and cols and self._index(rows - 1, cols - 1) >= len(buf):
+            raise ValueError("buffer too small for a " + str(rows) + "x" + str(cols) + " matrix")
+
+    @classmethod
+    def from_lists(cls, nested, typecode=None):
+        """ Builds a Matrix from a list of equal-length lists, copying the values once into a flat buffer
+
+        Arguments:
+            nested {List} -- list of rows
+            typecode {String} -- array typecode, defaults to "q" (int64) if every value is an int (Python or
+                                numpy), else "d" (float)
+
+        Returns
+            Matrix
+        """
+
+        rows = len(nested)
+        cols = len(nested[0]) if rows else 0
+        if any(len(r) != cols for r in nested):
+            raise ValueError("all rows must have the same length")
+        if typecode is None:
+            ints = all(isinstance(x, (int, np.integer)) for x in chain.from_iterable(nested))
+            typecode = "q" if ints else "d"
+        return cls(rows, cols, buffer=array.array(typecode, chain.from_iterable(nested)))
+
+    @classmethod
+    def from_numpy(cls, arr):
+        """ Wraps a 2D numpy array without copying. The Matrix and the array share memory.
+
+        Arguments:
+            arr {numpy.ndarray} -- 2D array, any strides
+
+        Returns
+            Matrix
+        """
+
+        if arr.ndim != 2:
+            raise ValueError("expected a 2D array, got " + str(arr.ndim) + " dimensions")
+        itemsize = arr.itemsize
+        if any(s % itemsize or s < 0 for s in arr.strides):
+            raise ValueError("array strides must be positive multiples of the item size")
+        rstride, cstride = arr.strides[0] // itemsize, arr.strides[1] // itemsize
+        # flat view over the whole memory span the array covers
+        span = (arr.shape[0] - 1) * rstride + (arr.shape[1] - 1) * cstride + 1 if arr.size else 0
+        flat = np.lib.stride_tricks.as_strided(arr, shape=(span,), strides=(itemsize,))
+        return cls(arr.shape[0], arr.shape[1], buffer=flat, strides=(rstride, cstride))
+
+    def _index(self, i, j):
+        return self._offset + i * self._rstride + j * self._cstride
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    @property
+    def typecode(self):
+        return self._buf.format
+
+    def __len__(self):
+        return self.rows
+
+    def _normalize(self, key, size):
+        if isinstance(key, slice):
+            return key.indices(size)
+        # numpy integers index like ints, anything else (floats, strings) is a TypeError like for lists
+        key = operator.index(key)
+        if key < 0:
+            key += size
+        if not 0 <= key < size:
+            raise IndexError("index out of range")
+        return key
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        i, j = key
+        i = self._normalize(i, self.rows)
+        j = self._normalize(j, self.cols)
+        if isinstance(i, int) and isinstance(j, int):
+            return self._buf[self._index(i, j)]
+        return self._view(i, j)
+
+    def __setitem__(self, key, value):
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        i, j = key
+        i = self._normalize(i, self.rows)
+        j = self._normalize(j, self.cols)
+        if isinstance(i, int) and isinstance(j, int):
+            self._buf[self._index(i, j)] = value
+            return
+        view = self._view(i, j).to_numpy()
+        value = value.to_numpy() if isinstance(value, Matrix) else np.asarray(value)
+        if value.ndim == 1 and view.shape[1] == 1 and view.shape[0] == len(value):
+            # a flat sequence assigned to a column, e.g. m[:, 0] = [1, 2, 3]
+            value = value[:, None]
+        view[...] = value
+
+    def _view(self, i, j):
+        # i and j are each an int or a (start, stop, step) tuple from slice.indices()
+        r0, r1, rstep = (i, i + 1, 1) if isinstance(i, int) else i
+        c0, c1, cstep = (j, j + 1, 1) if isinstance(j, int) else j
+        rows = len(range(r0, r1, rstep))
+        cols = len(range(c0, c1, cstep))
+        return Matrix(rows, cols, buffer=self._buf, offset=self._index(r0, c0) if rows and cols else 0,
+                      strides=(self._rstride * rstep, self._cstride * cstep))
+
+    def row(self, i):
+        """ Row i as a memoryview into the buffer (no copy), iterable and assignable like a list """
+
+        i = self._normalize(i, self.rows)
+        return self._line(self._index(i, 0), self.cols, self._cstride)
+
+    def col(self, j):
+        """ Column j as a memoryview into the buffer (no copy) """
+
+        j = self._normalize(j, self.cols)
+        return self._line(self._index(0, j), self.rows, self._rstride)
+
+    def _line(self, start, n, stride):
+        # n items from start, stride apart. Reversed views (m[:, ::-1]) have a negative stride, their stop
+        # falls before the buffer start when the line ends at item 0, and a negative stop would wrap around
+        if not n:
+            return self._buf[0:0]
+        stop = start + n * stride
+        return self._buf[start:stop if stop >= 0 else None:stride]
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self.row(i)
+
+    def to_numpy(self):
+        """ The matrix as a numpy array sharing the same memory (no copy)
+
+        Returns
+            numpy.ndarray -- rows x cols array
+        """
+
+        base = np.asarray(self._buf)
+        itemsize = base.itemsize
+        return np.lib.stride_tricks.as_strided(base[self._offset:], shape=(self.rows, self.cols),
+                                               strides=(self._rstride * itemsize, self._cstride * itemsize))
+
+    def tolist(self):
+        """ The matrix as a list of lists (a copy) """
+
+        return self.to_numpy().tolist()
+
+    def format(self, sep=" "):
+        """ The grid as text, one line per row with values separated by sep
+
+        Returns
+            String
+        """
+
+        if not self.rows or not self.cols:
+            return ""
+        # one %-format per block of rows is much cheaper than a str() call and a join per value
+        field = "%d" if self.typecode in "bBhHiIlLqQ" else "%s"
+        sep = sep.replace("%", "%%")
+        line = sep.join([field] * self.cols)
+        arr = self.to_numpy()
+        block = max(1, FORMAT_BLOCK // self.cols)
+        parts = []
+        for start in range(0, self.rows, block):
+            values = arr[start:start + block]
+            parts.append("\n".join([line] * len(values)) % tuple(values.ravel().tolist()))
+        return "\n".join(parts)
+
+    def write(self, stream=None, sep=" "):
+        """ Writes the whole grid to a stream in one write call, replacing the nested print/join loop
+
+        Arguments:
+            stream {file-like} -- text stream, defaults to sys.stdout
+            sep {String} -- separator between values
+        """
+
+        stream = stream or sys.stdout
+        text = self.format(sep)
+        stream.write(text + "\n" if text else text)
+
+    def __repr__(self):
+        return "Matrix(" + str(self.rows) + "x" + str(self.cols) + ", typecode=" + repr(self.typecode) + ")"
+
+    def __str__(self):
+        return self.format()
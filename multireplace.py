@@ -0,0 +1,240 @@
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# compiled Replacers kept in memory, keyed by the mapping's items, so a dictionary is compiled only once
+_CACHE = OrderedDict()
+CACHE_SIZE = 32
+# values joined into one string per scan when replacing a whole column
+JOIN_BLOCK = 1 << 16
+# characters tried, in order, to join a column's values, the first one no pattern or replacement contains is used
+_JOINERS = ("\x00", "\x1f", "\x1e", "\ufffe")
+
+
+def _trie(patterns):
+    root = {}
+    for pattern in patterns:
+        node = root
+        for c in pattern:
+            node = node.setdefault(c, {})
+        # end-of-pattern mark
+        node[""] = None
+    return root
+
+
+def _emit(node):
+    """ Regular expression matching the patterns stored below a trie node. Chains of single children are
+        written as one literal, and children come before the end mark, so from any position the regex
+        engine follows the one trie path that matches the text and backs off to the deepest pattern end on
+        it: the longest pattern starting there.
+    """
+
+    branches = []
+    for c in sorted(k for k in node if k):
+        run = [c]
+        child = node[c]
+        while len(child) == 1 and "" not in child:
+            (c, child), = child.items()
+            run.append(c)
+        branches.append(re.escape("".join(run)) + _emit(child))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+class Replacer:
+    """ Applies a whole dictionary of substring substitutions in one left-to-right scan of the text, instead
+        of one str.replace() pass per pattern. Where patterns overlap, the leftmost match wins and among
+        matches starting at the same position the longest one, and replaced text is never scanned again.
+
+        The patterns are stored in a trie (the goto structure of an Aho-Corasick automaton) compiled into a
+        single regular expression, so the scan itself runs inside the re module's C matcher.
+
+        r = replacer({"or": "XX", " ": "..."})
+        r.replace(message1)
+    """
+
+    def __init__(self, mapping):
+        mapping = dict(mapping)
+        for pattern, value in mapping.items():
+            if not isinstance(pattern, str) or not isinstance(value, str):
+                raise TypeError("patterns and replacements must be strings, got " + repr(pattern) + ": " + repr(value))
+            if not pattern:
+                raise ValueError("patterns can't be empty")
+        self.mapping = mapping
+        self.regex = re.compile(_emit(_trie(mapping))) if mapping else None
+        self._lookup = lambda match: mapping[match[0]]
+        used = "".join(mapping) + "".join(mapping.values())
+        self._joiner = next((j for j in _JOINERS if j not in used), None)
+
+    def replace(self, text):
+        """ Replaces every pattern in one string
+
+        Arguments:
+            text {String} -- text to scan
+
+        Returns
+            String -- text with the substitutions applied
+        """
+
+        if self.regex is None:
+            return text
+        return self.regex.sub(self._lookup, text)
+
+    def replace_all(self, strings):
+        """ Replaces every pattern in a list of strings. Blocks of values are joined with a character no
+            pattern contains and scanned as one string, so the per-value call overhead is paid per block.
+
+        Arguments:
+            strings {List} -- strings to scan
+
+        Returns
+            List -- the replaced strings, in the same order
+        """
+
+        joiner = self._joiner
+        if self.regex is None:
+            return list(strings)
+        if joiner is None:
+            return [self.replace(s) for s in strings]
+        out = []
+        for start in range(0, len(strings), JOIN_BLOCK):
+            block = strings[start:start + JOIN_BLOCK]
+            joined = joiner.join(block)
+            if joined.count(joiner) != len(block) - 1:
+                # some value contains the joiner itself, those values can't be told apart after the scan
+                out.extend(self.replace(s) for s in block)
+            else:
+                out.extend(self.replace(joined).split(joiner))
+        return out
+
+
+def replacer(mapping):
+    """ Compiled Replacer for a mapping, reused from the cache when the same patterns were compiled before
+
+    Arguments:
+        mapping {Dictionary} -- pattern -> replacement
+
+    Returns
+        Replacer
+    """
+
+    key = frozenset(mapping.items())
+    if key in _CACHE:
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+    result = Replacer(mapping)
+    _CACHE[key] = result
+    while len(_CACHE) > CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    """ Removes every compiled Replacer """
+
+    _CACHE.clear()
+
+
+def _wrap(result, like, keep_dtype):
+    # hands the result back in the same kind of container the input came in
+    # results that don't keep the dtype come back as object arrays, infer_objects() gives an int column of
+    # ints its int64 back
+    if isinstance(like, pd.Series):
+        if keep_dtype:
+            return pd.Series(result, index=like.index, name=like.name, dtype=like.dtype)
+        return pd.Series(result, index=like.index, name=like.name).infer_objects()
+    if isinstance(like, pd.Index):
+        if keep_dtype:
+            return pd.Index(result, name=like.name, dtype=like.dtype)
+        return pd.Index(result, name=like.name).infer_objects()
+    if isinstance(like, np.ndarray):
+        if not keep_dtype:
+            return pd.Series(result, dtype=object).infer_objects().to_numpy()
+        if like.dtype.kind == "U":
+            # fixed-width strings: the width is inferred again, so longer replacements aren't cut off
+            return np.array(list(result), dtype=str)
+        return np.array(result, dtype=like.dtype)
+    return list(result)
+
+
+def _keeps_dtype(values, mapping):
+    # whether whole-value replacements still fit the column's dtype, other columns let pandas infer a new one
+    dtype = getattr(values, "dtype", None)
+    if dtype == object:
+        return True
+    return pd.api.types.is_string_dtype(dtype) and all(isinstance(v, str) for v in mapping.values())
+
+
+def _replace_whole(values, mapping):
+    # each distinct value is looked up once, however many times it appears
+    codes, uniques = pd.factorize(values)
+    new = np.empty(len(uniques), dtype=object)
+    new[:] = [mapping.get(u, u) for u in uniques]
+    result = new[codes]
+    missing = codes < 0
+    if missing.any():
+        original = np.asarray(values, dtype=object)
+        result[missing] = original[missing]
+    return result
+
+
+def _replace_categories(values, mapping):
+    # replaces the categories rather than the values, categories that end up equal are merged
+    cat = values.array if isinstance(values, (pd.Series, pd.Index)) else values
+    old = cat.categories
+    new = pd.Index([mapping.get(c, c) for c in old]).infer_objects()
+    if new.is_unique:
+        result = cat.rename_categories(new)
+    else:
+        merged = new.unique()
+        remap = np.append(merged.get_indexer(new), -1)
+        result = pd.Categorical.from_codes(remap[cat.codes], categories=merged, ordered=cat.ordered)
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    if isinstance(values, pd.Index):
+        return pd.CategoricalIndex(result, name=values.name)
+    return result
+
+
+def replace(values, mapping, whole=False):
+    """ Applies a dictionary of substitutions to a string or a column of strings in one pass.
+
+        replace(message1, {"or": "XX"})                          # message1.replace("or", "XX")
+        replace(con_df["continent"], {"asia": "Asia", ...}, whole=True)    # con_df["continent"].replace({...})
+
+    Arguments:
+        values {String or array-like} -- a string, list, numpy array, pandas Series or Index
+        mapping {Dictionary} -- pattern -> replacement
+        whole {bool} -- replace only values equal to a pattern (like DataFrame.replace) instead of every
+                        occurrence inside the values (like str.replace). Categorical columns get their
+                        categories replaced and stay categorical
+
+    Returns
+        Same kind of container as values. Missing and non-string values are left as they are
+    """
+
+    if isinstance(values, str):
+        if whole:
+            return mapping.get(values, values)
+        return replacer(mapping).replace(values)
+
+    if whole and isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        return _replace_categories(values, mapping)
+    if whole:
+        return _wrap(_replace_whole(values, mapping), values, _keeps_dtype(values, mapping))
+
+    items = values.tolist() if hasattr(values, "tolist") else list(values)
+    positions = [i for i, v in enumerate(items) if isinstance(v, str)]
+    if len(positions) == len(items):
+        items = replacer(mapping).replace_all(items)
+    else:
+        replaced = replacer(mapping).replace_all([items[i] for i in positions])
+        for i, s in zip(positions, replaced):
+            items[i] = s
+    return _wrap(items, values, True)
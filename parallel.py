@@ -0,0 +1,171 @@
+import os
+import pickle
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import reduce
+
+# below this many items everything runs serially, a pool costs more than it saves
+SERIAL_THRESHOLD = 10000
+
+# items timed in-process to estimate the cost of one call before picking a chunk size
+PROBE_SIZE = 64
+
+# chunks are sized so one takes about this long, long enough to hide the per-task overhead
+TARGET_CHUNK_SECONDS = 0.05
+
+# estimated serial runtime under which the pool is skipped even for long inputs
+MIN_PARALLEL_SECONDS = 0.2
+
+_MISSING = object()
+
+
+def _picklable(func):
+    try:
+        pickle.dumps(func)
+        return True
+    except Exception:
+        return False
+
+
+def _make_pool(executor, func, workers):
+    # returns (pool, owned): owned pools are shut down by the caller
+    if isinstance(executor, Executor):
+        return executor, False
+    if executor == "auto":
+        # lambdas and locally defined functions can't be sent to other processes
+        executor = "process" if _picklable(func) else "thread"
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=workers), True
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=workers), True
+    raise ValueError("executor must be 'auto', 'process', 'thread' or an Executor, got " + repr(executor))
+
+
+def _map_chunk(func, chunk):
+    return [func(*args) for args in chunk]
+
+
+def _filter_chunk(func, chunk):
+    if func is None:
+        return [x for x in chunk if x]
+    return [x for x in chunk if func(x)]
+
+
+def _reduce_chunk(func, chunk):
+    return reduce(func, chunk)
+
+
+def _run(kind, func, items, workers, executor, chunk_size, threshold):
+    """ Runs kind (_map_chunk, _filter_chunk or _reduce_chunk) over items in ordered chunks.
+        The first PROBE_SIZE items are always processed in this process, their timing decides whether
+        a pool is worth it and, if chunk_size isn't given, how many items go into each task.
+
+    Returns
+        List -- one result per chunk, in input order
+    """
+
+    n = len(items)
+    workers = workers or os.cpu_count() or 1
+    if n < threshold or workers == 1:
+        return [kind(func, items)] if n else []
+
+    probe = items[:PROBE_SIZE]
+    start = time.perf_counter()
+    results = [kind(func, probe)]
+    per_item = (time.perf_counter() - start) / len(probe)
+    rest = items[len(probe):]
+    if not rest:
+        # the probe covered everything (an empty chunk can't be reduced)
+        return results
+
+    if per_item * len(rest) < MIN_PARALLEL_SECONDS:
+        return results + [kind(func, rest)]
+
+    if chunk_size is None:
+        chunk_size = int(TARGET_CHUNK_SECONDS / max(per_item, 1e-9))
+        # at least a few chunks per worker so the load evens out
+        chunk_size = max(1, min(chunk_size, -(-len(rest) // (workers * 4))))
+
+    chunks = [rest[i:i + chunk_size] for i in range(0, len(rest), chunk_size)]
+    pool, owned = _make_pool(executor, func, workers)
+    try:
+        futures = [pool.submit(kind, func, chunk) for chunk in chunks]
+        return results + [f.result() for f in futures]
+    finally:
+        if owned:
+            pool.shutdown()
+
+
+def pmap(func, *iterables, workers=None, executor="auto", chunk_size=None, threshold=SERIAL_THRESHOLD):
+    """ Parallel list(map(func, *iterables)). Stops at the shortest iterable like map, and keeps the
+        input order.
+
+        pmap(add_com, words, range(1, 6))
+
+    Arguments:
+        func {function} -- function applied to each item (or to one item of each iterable)
+        *iterables -- one or more iterables
+        workers {int} -- number of workers, defaults to the number of cores
+        executor {String or Executor} -- "process", "thread", "auto" (processes unless func can't be pickled,
+                                         e.g. a lambda) or an existing Executor to reuse
+        chunk_size {int} -- items per task, picked from a timing probe when None
+        threshold {int} -- inputs shorter than this run serially
+
+    Returns
+        List -- results in input order
+    """
+
+    if not iterables:
+        raise TypeError("pmap() must have at least two arguments.")
+    items = list(zip(*iterables))
+    return [x for part in _run(_map_chunk, func, items, workers, executor, chunk_size, threshold) for x in part]
+
+
+def pfilter(func, iterable, workers=None, executor="auto", chunk_size=None, threshold=SERIAL_THRESHOLD):
+    """ Parallel list(filter(func, iterable)), keeps the input order. func=None keeps truthy items.
+
+        pfilter(is_even, words)
+
+    Arguments:
+        func {function} -- predicate, None for truthiness
+        iterable {iterable} -- items to filter
+        workers {int} -- see pmap()
+        executor {String or Executor} -- see pmap()
+        chunk_size {int} -- see pmap()
+        threshold {int} -- see pmap()
+
+    Returns
+        List -- items for which func returned True
+    """
+
+    items = list(iterable)
+    return [x for part in _run(_filter_chunk, func, items, workers, executor, chunk_size, threshold) for x in part]
+
+
+def preduce(func, iterable, initial=_MISSING, workers=None, executor="auto", chunk_size=None,
+            threshold=SERIAL_THRESHOLD):
+    """ Parallel reduce(func, iterable, initial). Each chunk is reduced on its own and the chunk results are
+        then reduced in order, so func has to be associative (func(func(a, b), c) == func(a, func(b, c)),
+        true for +, max, string concatenation, set union...) but does not need to be commutative.
+
+        preduce(lambda w1, w2: w1 + " " + w2, words)
+
+    Arguments:
+        func {function} -- function of two arguments
+        iterable {iterable} -- items to reduce
+        initial {object} -- placed before the first item, as in reduce()
+        workers {int} -- see pmap()
+        executor {String or Executor} -- see pmap()
+        chunk_size {int} -- see pmap()
+        threshold {int} -- see pmap()
+
+    Returns
+        object -- the reduced value
+    """
+
+    items = list(iterable)
+    if initial is not _MISSING:
+        items.insert(0, initial)
+    if not items:
+        raise TypeError("reduce() of empty iterable with no initial value")
+    return reduce(func, _run(_reduce_chunk, func, items, workers, executor, chunk_size, threshold))
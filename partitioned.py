@@ -0,0 +1,351 @@
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# file next to the partition directories with their values, files, row counts and column statistics
+MANIFEST = "_manifest.json"
+OPS = ("==", "<", "<=", ">", ">=", "in", "between")
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _column_stats(table):
+    # column -> [min, max, nulls] over one file, min/max are None for a column with no values
+    stats = {}
+    for name in table.column_names:
+        if name.startswith("__index_level_"):
+            continue
+        column = table[name]
+        try:
+            low, high = pc.min_max(column).values()
+            low, high = low.as_py(), high.as_py()
+        except (pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            low = high = None
+        if isinstance(low, float) and np.isnan(low) or not isinstance(low, (int, float, str)):
+            # no usable range (no values, or a type JSON can't hold): this column never prunes
+            low = high = None
+        stats[name] = [low, high, column.null_count]
+    return stats
+
+
+def _merge_stats(a, b):
+    merged = {}
+    for name in b:
+        low_a, high_a, nulls_a = a.get(name, [None, None, 0])
+        low_b, high_b, nulls_b = b[name]
+        try:
+            low = low_b if low_a is None else low_a if low_b is None else min(low_a, low_b)
+            high = high_b if high_a is None else high_a if high_b is None else max(high_a, high_b)
+        except TypeError:
+            low = high = None
+        merged[name] = [low, high, nulls_a + nulls_b]
+    return merged
+
+
+def _may_match(op, value, stats, rows):
+    """ Whether a column with the given [min, max, nulls] statistics can have a row matching op value """
+
+    low, high, nulls = stats
+    if nulls == rows:
+        # nothing but missing values, which never match
+        return False
+    if low is None:
+        return True
+    try:
+        if op == "==":
+            return low <= value <= high
+        if op == "in":
+            return any(low <= v <= high for v in value if not pd.isna(v))
+        if op == "between":
+            return value[0] <= high and value[1] >= low
+        if op == "<":
+            return low < value
+        if op == "<=":
+            return low <= value
+        if op == ">":
+            return high > value
+        return high >= value
+    except TypeError:
+        # not comparable with the stored values (a str against numbers), let the reader decide
+        return True
+
+
+def _expression(column, op, value):
+    field = pc.field(column)
+    if op == "in":
+        return field.isin([v for v in value if not pd.isna(v)])
+    if op == "between":
+        return (field >= value[0]) & (field <= value[1])
+    return {"==": field == value, "<": field < value, "<=": field <= value,
+            ">": field > value, ">=": field >= value}[op]
+
+
+class PartitionedStore:
+    """ A DataFrame stored as Parquet files in one directory per value of a partition column (Hive layout,
+        root/year=2014/part-....parquet), with a manifest of every partition's row count and per-column
+        min/max. Reads only open the partitions that can match:
+
+        store = PartitionedStore("times", partition="year")
+        store.append(pd.read_csv("input/timesData.csv"))
+        store.read(2014)                                     # times_df[times_df.year == 2014]
+        store.read([2011, 2012], columns=["student_staff_ratio"])
+        store.read(where=[("teaching", ">", 90)])            # skips years where max(teaching) <= 90
+        store.append(times_2017)                             # adds year=2017/, the other years are untouched
+
+        Each file keeps the partition column and the frame's index, so reads give back the same rows, index
+        and dtypes as filtering the original frame. Missing values never match a condition, like in pandas.
+    """
+
+    def __init__(self, root, partition="year"):
+        if pa is None:
+            raise ImportError("PartitionedStore needs pyarrow")
+        self.root = root
+        path = os.path.join(root, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.manifest = json.load(f)
+            if self.manifest["partition"] != partition:
+                raise ValueError(root + " is partitioned by " + repr(self.manifest["partition"]) +
+                                 ", not " + repr(partition))
+        else:
+            self.manifest = {"partition": partition, "columns": None, "dtypes": None, "partitions": {}}
+        self.partition = partition
+
+    def _save_manifest(self):
+        # written to a temporary file and renamed, so a crash never leaves a half-written manifest
+        path = os.path.join(self.root, MANIFEST)
+        tmp = path + "." + uuid.uuid4().hex
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, path)
+
+    def _directory(self, value):
+        return os.path.join(self.root, self.partition + "=" + str(value))
+
+    def append(self, df, mode="append"):
+        """ Writes the rows of a frame to their partitions. Only the partitions present in df are touched.
+
+        Arguments:
+            df {DataFrame} -- rows with the same columns as the store (any partition values)
+            mode {String} -- "append" adds a file to existing partitions, "replace" rewrites the partitions
+                             present in df, "error" refuses to write to an existing partition
+
+        Returns
+            List -- the partition values written
+        """
+
+        if mode not in ("append", "replace", "error"):
+            raise ValueError("mode must be \"append\", \"replace\" or \"error\", got " + repr(mode))
+        columns = [str(c) for c in df.columns]
+        if self.partition not in columns:
+            raise KeyError("no partition column " + repr(self.partition))
+        if self.manifest["columns"] is None:
+            self.manifest["columns"] = columns
+            self.manifest["dtypes"] = [str(t) for t in df.dtypes]
+        elif columns != self.manifest["columns"]:
+            raise ValueError("columns " + str(columns) + " don't match the store's " + str(self.manifest["columns"]))
+        else:
+            df = self._conform(df)
+        if df[self.partition].isna().any():
+            raise ValueError("partition column " + repr(self.partition) + " has missing values")
+
+        partitions = self.manifest["partitions"]
+        written = []
+        for value, rows in df.groupby(self.partition, sort=True):
+            value = _plain(value)
+            key = str(value)
+            if key in partitions and mode == "error":
+                raise ValueError("partition " + self.partition + "=" + key + " already exists")
+            directory = self._directory(value)
+            if key in partitions and mode == "replace":
+                shutil.rmtree(directory, ignore_errors=True)
+                del partitions[key]
+            os.makedirs(directory, exist_ok=True)
+            table = pa.Table.from_pandas(rows, preserve_index=True)
+            name = "part-" + uuid.uuid4().hex + ".parquet"
+            pq.write_table(table, os.path.join(directory, name))
+            entry = partitions.setdefault(key, {"value": value, "files": [], "rows": 0, "stats": {}})
+            entry["files"].append(name)
+            entry["rows"] += len(rows)
+            entry["stats"] = _merge_stats(entry["stats"], _column_stats(table))
+            written.append(value)
+        self._save_manifest()
+        return written
+
+    def _conform(self, df):
+        # every file of the store gets the dtypes of the first append, e.g. a chunk of read_csv where a text
+        # column happens to be empty comes back as float and is cast back to str
+        changed = {}
+        for column, dtype in zip(df.columns, self.manifest["dtypes"]):
+            if str(df[column].dtype) != dtype:
+                try:
+                    changed[column] = df[column].astype(dtype)
+                except (ValueError, TypeError):
+                    raise ValueError("column " + repr(column) + " is " + str(df[column].dtype) + " but the store has " +
+                                     dtype + " (pass dtype= to read_csv to fix the dtypes)")
+        return df.assign(**changed) if changed else df
+
+    def partitions(self):
+        """ The stored partition values, sorted """
+
+        return sorted(p["value"] for p in self.manifest["partitions"].values())
+
+    def stats(self):
+        """ Row count and per-column min, max and missing count of every partition
+
+        Returns
+            DataFrame -- indexed by (partition value, column)
+        """
+
+        records = []
+        for entry in sorted(self.manifest["partitions"].values(), key=lambda p: p["value"]):
+            for column, (low, high, nulls) in entry["stats"].items():
+                records.append({self.partition: entry["value"], "column": column, "rows": entry["rows"],
+                                "min": low, "max": high, "nulls": nulls})
+        return pd.DataFrame(records).set_index([self.partition, "column"]) if records else pd.DataFrame()
+
+    def prune(self, values=None, where=None):
+        """ The partitions a read needs: those with one of the given values whose statistics don't rule out
+            every condition
+
+        Arguments:
+            values {value or List} -- partition value(s), None for all
+            where {List} -- (column, op, value) conditions, all must hold. op is one of
+                            ==, <, <=, >, >=, in, between (value is a (low, high) pair, inclusive)
+
+        Returns
+            List -- manifest entries, sorted by partition value
+        """
+
+        if values is not None and not isinstance(values, (list, tuple, set)):
+            values = [values]
+        wanted = None if values is None else {str(_plain(v)) for v in values}
+        for column, op, _ in where or ():
+            if op not in OPS:
+                raise ValueError("unsupported operator " + repr(op) + ", expected one of " + str(list(OPS)))
+        entries = []
+        for key, entry in self.manifest["partitions"].items():
+            if wanted is not None and key not in wanted:
+                continue
+            if all(_may_match(op, value, entry["stats"].get(column, [None, None, 0]), entry["rows"])
+                   for column, op, value in where or ()):
+                entries.append(entry)
+        return sorted(entries, key=lambda p: p["value"])
+
+    def read(self, values=None, columns=None, where=None):
+        """ Reads the rows of some partitions, opening no other file
+
+        Arguments:
+            values {value or List} -- partition value(s) to read, None for all, e.g. read(2014)
+            columns {List} -- columns to read, None for all
+            where {List} -- conditions, see prune(). Partitions are skipped on their statistics, the
+                            remaining rows are filtered while reading
+
+        Returns
+            DataFrame -- same rows, index and dtypes as the equivalent boolean filter on the whole frame
+        """
+
+        # prune() checks the operators before any expression is built
+        entries = self.prune(values, where)
+        filters = None
+        if where:
+            filters = _expression(*where[0])
+            for condition in where[1:]:
+                filters = filters & _expression(*condition)
+        frames = []
+        for entry in entries:
+            directory = self._directory(entry["value"])
+            for name in entry["files"]:
+                table = pq.read_table(os.path.join(directory, name), columns=columns, filters=filters,
+                                      use_pandas_metadata=True)
+                frames.append(table.to_pandas())
+        if not frames:
+            return self._empty(columns)
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    def _empty(self, columns):
+        entries = list(self.manifest["partitions"].values())
+        if not entries:
+            return pd.DataFrame(columns=columns or [])
+        first = entries[0]
+        path = os.path.join(self._directory(first["value"]), first["files"][0])
+        return pq.read_table(path, columns=columns, use_pandas_metadata=True).slice(0, 0).to_pandas()
+
+
+def from_csv(path, root, partition="year", chunksize=None, **read_csv_kwargs):
+    """ Builds (or adds to) a PartitionedStore from a CSV file
+
+    Arguments:
+        path {String} -- CSV file
+        root {String} -- store directory
+        partition {String} -- partition column
+        chunksize {int} -- rows read at a time, None reads the whole file (one file per partition)
+        **read_csv_kwargs -- passed to pd.read_csv
+
+    Returns
+        PartitionedStore
+    """
+
+    store = PartitionedStore(root, partition)
+    if chunksize is None:
+        store.append(pd.read_csv(path, **read_csv_kwargs))
+        return store
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+        store.append(chunk)
+    return store
+
+
+def benchmark(df, root, value, partition="year", repeat=5):
+    """ Compares a boolean filter on the whole frame read from CSV with reading one partition
+
+    Arguments:
+        df {DataFrame} -- frame to store
+        root {String} -- directory for the store (replaced)
+        value -- partition value to select
+        partition {String} -- partition column
+        repeat {int} -- runs per path, the fastest is reported
+
+    Returns
+        Dictionary -- seconds for each path, rows selected and bytes on disk
+    """
+
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    csv = os.path.join(root, "data.csv")
+    df.to_csv(csv, index=False)
+    store = PartitionedStore(os.path.join(root, "store"), partition)
+    store.append(df)
+
+    def best(func):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    def scan():
+        frame = pd.read_csv(csv)
+        return frame[frame[partition] == value]
+
+    csv_s, expected = best(scan)
+    store_s, result = best(lambda: PartitionedStore(os.path.join(root, "store"), partition).read(value))
+    memory_s, _ = best(lambda: df[df[partition] == value])
+    pd.testing.assert_frame_equal(result, expected)
+    size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(store.root) for f in files)
+    return {"rows": len(df), "selected": len(result), "csv_filter_s": csv_s, "partition_read_s": store_s,
+            "in_memory_filter_s": memory_s, "csv_bytes": os.path.getsize(csv), "store_bytes": size}
@@ -0,0 +1,137 @@
+from functools import reduce as _reduce
+from itertools import islice
+
+_MISSING = object()
+
+_MAP = "map"
+_FILTER = "filter"
+_BATCH = "batch"
+
+
+def _compose(f, g):
+    return lambda x: g(f(x))
+
+
+def _fuse(stages):
+    """ Merges runs of consecutive maps into one function, so map().map() costs a single call per item """
+
+    fused = []
+    for kind, arg in stages:
+        if kind == _MAP and fused and fused[-1][0] == _MAP:
+            fused[-1] = (_MAP, _compose(fused[-1][1], arg))
+        else:
+            fused.append((kind, arg))
+    return fused
+
+
+def _run_segment(source, stages):
+    # one generator loop for a whole run of map/filter stages, no intermediate lists or generators
+    if len(stages) == 1 and stages[0][0] == _MAP:
+        yield from map(stages[0][1], source)
+        return
+    if len(stages) == 1:
+        yield from filter(stages[0][1], source)
+        return
+    for x in source:
+        for kind, func in stages:
+            if kind == _MAP:
+                x = func(x)
+            elif not func(x):
+                break
+        else:
+            yield x
+
+
+def _batches(source, size):
+    it = iter(source)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Pipeline:
+    """ Lazy chain of map/filter steps over an iterable. Nothing runs until a terminal operation
+        (to_list, reduce, count, first, sum, for_each or iterating over it) is called, and then every item
+        passes through all the steps in one loop, so no intermediate list is ever built and memory use
+        does not grow with the input.
+
+        Pipeline(numbers).map(int).filter(is_even).to_list()
+        # same as list(filter(is_even, list(map(lambda n: int(n), numbers))))
+
+        Each call returns a new Pipeline, the original is left unchanged. If the source is an iterator
+        (a generator, a file, map()...) it can only be consumed once.
+    """
+
+    def __init__(self, iterable, stages=()):
+        self.source = iterable
+        self.stages = tuple(stages)
+
+    def _then(self, kind, arg):
+        return Pipeline(self.source, self.stages + ((kind, arg),))
+
+    def map(self, func):
+        """ Applies func to every item """
+        return self._then(_MAP, func)
+
+    def filter(self, func=None):
+        """ Keeps the items for which func returns True (truthy items if func is None) """
+        return self._then(_FILTER, bool if func is None else func)
+
+    def batch(self, size):
+        """ Groups items into lists of size items (the last one may be shorter), following steps get whole batches """
+        if size < 1:
+            raise ValueError("batch size must be at least 1, got " + str(size))
+        return self._then(_BATCH, size)
+
+    def __iter__(self):
+        it = self.source
+        segment = []
+        for kind, arg in self.stages:
+            if kind == _BATCH:
+                if segment:
+                    it = _run_segment(it, _fuse(segment))
+                    segment = []
+                it = _batches(it, arg)
+            else:
+                segment.append((kind, arg))
+        if segment:
+            it = _run_segment(it, _fuse(segment))
+        return iter(it)
+
+    # terminal operations
+
+    def to_list(self):
+        """ Runs the pipeline and returns every item as a list """
+        return list(self)
+
+    def reduce(self, func, initial=_MISSING):
+        """ Runs the pipeline and combines the items with func, same as functools.reduce """
+        if initial is _MISSING:
+            return _reduce(func, self)
+        return _reduce(func, self, initial)
+
+    def sum(self, start=0):
+        """ Runs the pipeline and returns the sum of the items """
+        return sum(self, start)
+
+    def count(self):
+        """ Runs the pipeline and returns the number of items that came out """
+        n = 0
+        for _ in self:
+            n += 1
+        return n
+
+    def first(self, default=_MISSING):
+        """ Runs the pipeline only until the first item comes out and returns it """
+        for x in self:
+            return x
+        if default is _MISSING:
+            raise ValueError("pipeline produced no items")
+        return default
+
+    def for_each(self, func):
+        """ Runs the pipeline and calls func on every item, for side effects like printing or writing """
+        for x in self:
+            func(x)
@@ -0,0 +1,134 @@
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# names the visualization notebook gives its plotting imports
+BACKENDS = {"mpl": "matplotlib",
+            "plt": "matplotlib.pyplot",
+            "mpimg": "matplotlib.image",
+            "px": "plotly.express",
+            "go": "plotly.graph_objects",
+            "pio": "plotly.io"}
+# module -> seconds its first use spent importing it, in load order
+_LOADED = {}
+# reentrant, importing one backend may use another lazily
+_LOCK = threading.RLock()
+
+
+class LazyModule:
+    """ Stands in for a module and imports it the first time one of its attributes is used, so
+
+        from plotting import plt, px
+        plt.plot(x, y)          # matplotlib.pyplot is imported here
+
+        costs nothing for a job that never plots. After the first use every attribute comes straight from
+        the real module.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            name = self.__dict__["_name"]
+            with _LOCK:
+                already = name in sys.modules
+                start = time.perf_counter()
+                module = importlib.import_module(name)
+                if name not in _LOADED:
+                    # a module someone else imported first cost nothing here
+                    _LOADED[name] = 0.0 if already else time.perf_counter() - start
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return "<lazy module " + repr(self.__dict__["_name"]) + " (" + state + ")>"
+
+
+def lazy(name):
+    """ A LazyModule for any module, e.g. lazy("matplotlib.figure")
+
+    Arguments:
+        name {String} -- dotted module name
+
+    Returns
+        LazyModule
+    """
+
+    return LazyModule(name)
+
+
+mpl = lazy("matplotlib")
+plt = lazy("matplotlib.pyplot")
+mpimg = lazy("matplotlib.image")
+px = lazy("plotly.express")
+go = lazy("plotly.graph_objects")
+pio = lazy("plotly.io")
+
+
+def is_loaded(module):
+    """ Whether a backend has been imported, by the facade or by anyone else
+
+    Arguments:
+        module {String or LazyModule} -- alias from BACKENDS ("plt"), dotted name or LazyModule
+
+    Returns
+        bool
+    """
+
+    if isinstance(module, LazyModule):
+        module = module.__dict__["_name"]
+    return BACKENDS.get(module, module) in sys.modules
+
+
+def import_report():
+    """ The backends imported through the facade so far and the seconds each first use spent importing
+        it (0.0 when it had already been imported elsewhere)
+
+    Returns
+        Dictionary -- module -> seconds, in load order
+    """
+
+    with _LOCK:
+        return dict(_LOADED)
+
+
+def _cold_import(name):
+    # seconds a fresh interpreter spends on "import name", with the facade's directory on the path so
+    # "import plotting" works from anywhere
+    code = ("import sys, time; sys.path.insert(0, " + repr(os.path.dirname(os.path.abspath(__file__))) +
+            "); start = time.perf_counter(); import " + name +
+            "; print(time.perf_counter() - start)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(out.split()[-1])
+
+
+def startup_report(modules=("pandas", "plotting") + tuple(BACKENDS.values()), repeat=3):
+    """ Cold import time of each module, every one measured in a fresh interpreter, e.g. to check that a
+        data-only job importing plotting starts as fast as one importing pandas alone. For a breakdown by
+        module run python -X importtime -c "import ..." instead.
+
+    Arguments:
+        modules {iterable} -- dotted module names
+        repeat {int} -- fresh interpreters per module, the fastest is reported
+
+    Returns
+        Dictionary -- module -> seconds
+    """
+
+    return {name: min(_cold_import(name) for _ in range(repeat)) for name in modules}
@@ -0,0 +1,246 @@
+import mmap
+import numbers
+import os
+import pickle
+import struct
+import time
+
+import numpy as np
+
+from functions import Room
+
+# file layout: a header, then one fixed-width record per room, little-endian
+MAGIC = b"ROOMSTOR"
+VERSION = 2
+# magic, version, flags (unused, 0), record size, room count
+_HEADER = struct.Struct("<8sHHIQ")
+# packed records: 8-byte price and a 1-byte set of flags
+_RECORD = np.dtype([("price", "<f8"), ("flags", "u1")])
+# record flag bits: the room is open, and its price was an int, so it comes back as one like Room(3400, True)
+_OPEN = 1
+_INT_PRICE = 2
+# ints up to this size are stored exactly in the float64 price
+_EXACT = 2 ** 53
+
+
+def price_column(prices):
+    """ Room prices as a float64 array, checking that every one is a number (ints stay exact up to 2**53)
+
+    Arguments:
+        prices {List} -- ints and floats, Python or numpy
+
+    Returns
+        Tuple -- (float64 prices, bool array marking the ones that were ints)
+    """
+
+    types = set(map(type, prices))
+    if types <= {float}:
+        return np.array(prices, dtype=np.float64), np.zeros(len(prices), dtype=bool)
+    if types <= {int}:
+        return np.array(prices, dtype=np.float64), np.ones(len(prices), dtype=bool)
+    values = np.empty(len(prices), dtype=np.float64)
+    ints = np.empty(len(prices), dtype=bool)
+    for i, p in enumerate(prices):
+        if isinstance(p, (bool, np.bool_)) or not isinstance(p, numbers.Real):
+            raise TypeError("room prices must be numbers, got " + repr(p) + " for room " + str(i))
+        values[i] = p
+        ints[i] = isinstance(p, numbers.Integral)
+    return values, ints
+
+
+def _columns(rooms):
+    # (float64 prices, int price mask, open flags) of Room objects, or of anything holding them as arrays
+    # like BookingSimulator
+    if hasattr(rooms, "price") and hasattr(rooms, "room_open") and not isinstance(rooms, Room):
+        prices = np.asarray(rooms.price)
+        if prices.dtype.kind in "iu":
+            values, ints = prices.astype(np.float64), np.ones(len(prices), dtype=bool)
+        elif prices.dtype.kind == "f":
+            values = prices.astype(np.float64)
+            # a simulator keeps int prices as floats and says so with int_prices
+            if getattr(rooms, "int_prices", False):
+                ints = values == np.round(values)
+            else:
+                ints = np.zeros(len(values), dtype=bool)
+        else:
+            values, ints = price_column(prices.tolist())
+        return values, ints, np.asarray(rooms.room_open, dtype=bool)
+    rooms = rooms if isinstance(rooms, (list, tuple)) else list(rooms)
+    values, ints = price_column([r.price for r in rooms])
+    return values, ints, np.fromiter((r.room_open for r in rooms), dtype=bool, count=len(rooms))
+
+
+def save_rooms(path, rooms):
+    """ Writes rooms to a binary file: a 24-byte header and 9 bytes per room, read back with load_rooms()
+        or opened lazily with RoomFile. Int and float prices can be mixed, each room's price comes back
+        with the type it was saved with
+
+    Arguments:
+        path {String} -- file to write
+        rooms {List or object} -- Room objects, or an object with price and room_open arrays (e.g. a
+                                  BookingSimulator)
+
+    Returns
+        int -- number of rooms written
+    """
+
+    prices, ints, room_open = _columns(rooms)
+    if len(prices) != len(room_open):
+        raise ValueError("got " + str(len(prices)) + " prices and " + str(len(room_open)) + " open flags")
+    if ints.any() and np.abs(prices[ints]).max() > _EXACT:
+        raise ValueError("int prices must be at most 2**53 in size to be stored exactly")
+    records = np.empty(len(prices), dtype=_RECORD)
+    records["price"] = prices
+    records["flags"] = room_open * np.uint8(_OPEN) | ints * np.uint8(_INT_PRICE)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, _RECORD.itemsize, len(records)))
+        f.write(memoryview(records).cast("B"))
+    return len(records)
+
+
+class RoomFile:
+    """ A file written by save_rooms(), memory-mapped read-only. Opening only reads the header; prices are
+        a numpy view straight into the mapping (float64, ints included), so pages are read when they are
+        used and Room objects are only made for the rooms asked for.
+
+        with RoomFile("rooms.bin") as rooms:
+            rooms.prices[rooms.room_open].mean()    # array work, no Room objects
+            room = rooms[42]                        # Room(price, room_open)
+            first = rooms[:1000]                    # list of Room
+
+        Arrays taken from prices and flags point into the mapping and keep it open until they are gone.
+        room_open and int_prices are decoded from flags each time they are read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(str(path) + " is too short to be a room file")
+            magic, version, _, record_size, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(str(path) + " is not a room file")
+            if version != VERSION:
+                raise ValueError(str(path) + " has version " + str(version) + ", only " + str(VERSION) +
+                                 " can be read")
+            if record_size != _RECORD.itemsize or size < _HEADER.size + count * record_size:
+                raise ValueError(str(path) + " is truncated or corrupt")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._records = np.frombuffer(self._mmap, dtype=_RECORD, count=count, offset=_HEADER.size)
+        self.prices = self._records["price"]
+        self.flags = self._records["flags"]
+
+    @property
+    def room_open(self):
+        return (self.flags & _OPEN) != 0
+
+    @property
+    def int_prices(self):
+        return (self.flags & _INT_PRICE) != 0
+
+    def close(self):
+        self._records = self.prices = self.flags = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # arrays taken from prices or flags are still alive, the mapping goes away with them
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return _rooms(self.prices[i], self.flags[i])
+        price, flags = self.prices[i].item(), int(self.flags[i])
+        return Room(int(price) if flags & _INT_PRICE else price, bool(flags & _OPEN))
+
+    def __iter__(self):
+        return iter(self.to_rooms())
+
+    def to_rooms(self):
+        """ Every room as a Room object
+
+        Returns
+            List
+        """
+
+        return _rooms(self.prices, self.flags)
+
+
+def _rooms(prices, flags):
+    ints = (flags & _INT_PRICE) != 0
+    room_open = ((flags & _OPEN) != 0).tolist()
+    if not ints.any():
+        return [Room(p, o) for p, o in zip(prices.tolist(), room_open)]
+    if ints.all():
+        return [Room(p, o) for p, o in zip(prices.astype(np.int64).tolist(), room_open)]
+    return [Room(int(p) if i else p, o) for p, i, o in zip(prices.tolist(), ints.tolist(), room_open)]
+
+
+def load_rooms(path):
+    """ Reads a file written by save_rooms() into Room objects
+
+    Arguments:
+        path {String} -- file to read
+
+    Returns
+        List -- Room objects in the order they were saved
+    """
+
+    with RoomFile(path) as rooms:
+        return rooms.to_rooms()
+
+
+def benchmark(n=10 ** 6, path="rooms.bin", seed=0):
+    """ Times save_rooms/load_rooms/RoomFile against pickle on n random rooms, and compares file sizes
+
+    Arguments:
+        n {int} -- rooms
+        path {String} -- scratch file, the pickle goes next to it, both are removed afterwards
+        seed {int} -- random seed
+
+    Returns
+        Dictionary -- seconds and bytes for each format
+    """
+
+    rng = np.random.default_rng(seed)
+    rooms = [Room(p, o) for p, o in zip(np.round(rng.uniform(50, 500, n), 2).tolist(), (rng.random(n) < 0.7).tolist())]
+    pickle_path = path + ".pkl"
+    record = {"rooms": n}
+    try:
+        start = time.perf_counter()
+        save_rooms(path, rooms)
+        record["save_s"] = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = load_rooms(path)
+        record["load_s"] = time.perf_counter() - start
+        start = time.perf_counter()
+        with RoomFile(path) as lazy:
+            record["open_s"] = time.perf_counter() - start
+            lazy[n // 2]
+        record["bytes"] = os.path.getsize(path)
+
+        start = time.perf_counter()
+        with open(pickle_path, "wb") as f:
+            pickle.dump(rooms, f, protocol=pickle.HIGHEST_PROTOCOL)
+        record["pickle_save_s"] = time.perf_counter() - start
+        start = time.perf_counter()
+        with open(pickle_path, "rb") as f:
+            pickle.load(f)
+        record["pickle_load_s"] = time.perf_counter() - start
+        record["pickle_bytes"] = os.path.getsize(pickle_path)
+    finally:
+        for p in (path, pickle_path):
+            if os.path.exists(p):
+                os.remove(p)
+    if any(a.__dict__ != b.__dict__ for a, b in zip(rooms, loaded)):
+        raise AssertionError("rooms did not round-trip")
+    return record
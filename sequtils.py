@@ -0,0 +1,134 @@
+import numpy as np
+
+# elements moved per step, the only temporary memory used by the buffer operations
+BLOCK = 1 << 16
+
+
+def _as_array(seq):
+    """ Zero-copy writable numpy view of a numpy array, array.array, bytearray or memoryview,
+        or None when seq doesn't expose a buffer (lists and other Python sequences)
+
+    Arguments:
+        seq {object} -- sequence to view
+
+    Returns
+        numpy.ndarray or None
+    """
+
+    if isinstance(seq, np.ndarray):
+        arr = seq
+    else:
+        try:
+            view = memoryview(seq)
+        except TypeError:
+            return None
+        if view.readonly:
+            raise TypeError("cannot modify a read-only buffer in place")
+        arr = np.asarray(view)
+    if arr.ndim != 1:
+        raise ValueError("expected a 1D sequence, got " + str(arr.ndim) + " dimensions")
+    return arr
+
+
+def _reverse_array(arr, lo, hi):
+    # swaps mirrored blocks from both ends towards the middle, never holding more than one block aside
+    while hi - lo > 1:
+        n = min(BLOCK, (hi - lo) // 2)
+        tmp = arr[lo:lo + n].copy()
+        arr[lo:lo + n] = arr[hi - n:hi][::-1]
+        arr[hi - n:hi] = tmp[::-1]
+        lo += n
+        hi -= n
+
+
+def _reverse_list(seq, lo, hi):
+    hi -= 1
+    while lo < hi:
+        seq[lo], seq[hi] = seq[hi], seq[lo]
+        lo += 1
+        hi -= 1
+
+
+def reverse(seq, start=0, stop=None):
+    """ Reverses seq[start:stop] in place, the buffer-level version of the notebook's while-loop swap
+        of numbers[i] and numbers[ln - (i + 1)]. numpy arrays, array.array, bytearray and writable memoryviews
+        are reversed through a zero-copy view in blocks. Other mutable sequences are swapped item by item
+        (lists use list.reverse when the whole list is reversed).
+
+    Arguments:
+        seq {sequence} -- mutable sequence to reverse
+        start {int} -- first position of the range
+        stop {int} -- end of the range (exclusive), defaults to the end
+
+    Returns
+        sequence -- seq itself
+    """
+
+    n = len(seq)
+    start, stop, _ = slice(start, stop).indices(n)
+    arr = _as_array(seq)
+    if arr is not None:
+        _reverse_array(arr, start, stop)
+    elif isinstance(seq, list) and start == 0 and stop == n:
+        seq.reverse()
+    else:
+        _reverse_list(seq, start, stop)
+    return seq
+
+
+def rotate(seq, k):
+    """ Rotates seq in place by k positions to the right (negative k rotates left), same direction as
+        collections.deque.rotate and np.roll. Done as three in-place reversals, so no copy is made.
+
+    Arguments:
+        seq {sequence} -- mutable sequence to rotate
+        k {int} -- number of positions
+
+    Returns
+        sequence -- seq itself
+    """
+
+    n = len(seq)
+    if n == 0:
+        return seq
+    k %= n
+    if k == 0:
+        return seq
+    reverse(seq)
+    reverse(seq, 0, k)
+    reverse(seq, k, n)
+    return seq
+
+
+def swap_ranges(seq, i, j, length):
+    """ Swaps seq[i:i + length] with seq[j:j + length] in place. The two ranges must not overlap.
+
+    Arguments:
+        seq {sequence} -- mutable sequence
+        i {int} -- start of the first range
+        j {int} -- start of the second range
+        length {int} -- number of items in each range
+
+    Returns
+        sequence -- seq itself
+    """
+
+    n = len(seq)
+    if length < 0 or min(i, j) < 0 or max(i, j) + length > n:
+        raise IndexError("ranges out of bounds")
+    if abs(i - j) < length:
+        raise ValueError("ranges overlap")
+
+    arr = _as_array(seq)
+    if arr is not None:
+        for offset in range(0, length, BLOCK):
+            m = min(BLOCK, length - offset)
+            a, b = i + offset, j + offset
+            tmp = arr[a:a + m].copy()
+            arr[a:a + m] = arr[b:b + m]
+            arr[b:b + m] = tmp
+    else:
+        for offset in range(length):
+            a, b = i + offset, j + offset
+            seq[a], seq[b] = seq[b], seq[a]
+    return seq
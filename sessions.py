@@ -0,0 +1,247 @@
+import asyncio
+import inspect
+import itertools
+import os
+import stat
+import sys
+import time
+
+PROMPT = "type 'exit' to close the program: "
+
+
+class Session:
+    """ State of one connected user. Handlers can keep anything they need in session.state, and end the
+        session by setting session.active to False (the same flag the notebook loop uses).
+    """
+
+    __slots__ = ("id", "active", "messages", "started", "state")
+
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.id = next(Session._ids)
+        self.active = True
+        self.messages = 0
+        self.started = time.monotonic()
+        self.state = {}
+
+
+def echo(session, msg):
+    """ The notebook's loop body: "exit" closes the session, anything else is printed back
+
+    Arguments:
+        session {Session} -- the user's session
+        msg {String} -- the line the user typed, without the newline
+
+    Returns
+        String -- text to send back
+    """
+
+    if msg == "exit":
+        session.active = False
+        return "Closing program..."
+    return msg
+
+
+async def run_session(reader, writer, handler=echo, prompt=PROMPT):
+    """ Runs the prompt/response loop for one user over a pair of asyncio streams, the non-blocking
+        version of `while active: msg = input(prompt) ...`. Ends when the handler sets session.active to
+        False or the other side closes the stream.
+
+    Arguments:
+        reader {asyncio.StreamReader} -- incoming lines
+        writer {asyncio.StreamWriter} -- outgoing prompts and replies
+        handler {function} -- handler(session, msg) returning the reply (or None for no reply), may be async
+        prompt {String} -- written before every read, like input(prompt)
+
+    Returns
+        Session -- the finished session
+    """
+
+    session = Session()
+    try:
+        while session.active:
+            writer.write(prompt.encode())
+            await writer.drain()
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # a line longer than the reader's limit (64 KiB by default), the connection is closed
+                break
+            if not line:
+                break
+            # a client sending invalid UTF-8 gets replacement characters rather than a dropped session
+            msg = line.decode(errors="replace").rstrip("\n").rstrip("\r")
+            session.messages += 1
+
+            reply = handler(session, msg)
+            if inspect.isawaitable(reply):
+                reply = await reply
+            if reply is not None:
+                writer.write((str(reply) + "\n").encode())
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+    return session
+
+
+async def serve(path=None, host="127.0.0.1", port=0, handler=echo, prompt=PROMPT, backlog=1024):
+    """ Starts a server where every connection gets its own session. Uses a Unix socket when path is
+        given, otherwise a TCP socket on localhost.
+
+        server = await serve("/tmp/prompt.sock")
+        async with server:
+            await server.serve_forever()
+
+    Arguments:
+        path {String} -- Unix socket path
+        host {String} -- TCP host when no path is given
+        port {int} -- TCP port, 0 picks a free one (see server.sockets[0].getsockname())
+        handler {function} -- see run_session()
+        prompt {String} -- see run_session()
+        backlog {int} -- connections that can wait to be accepted, raise it for bursts of new sessions
+
+    Returns
+        asyncio.Server
+    """
+
+    async def on_connect(reader, writer):
+        await run_session(reader, writer, handler, prompt)
+
+    if path is not None:
+        if os.path.lexists(path):
+            # a socket left behind by an earlier server is replaced, anything else at the path is kept
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise FileExistsError("can't serve on " + repr(path) + ", it exists and is not a socket")
+            os.remove(path)
+        return await asyncio.start_unix_server(on_connect, path, backlog=backlog)
+    return await asyncio.start_server(on_connect, host, port, backlog=backlog)
+
+
+async def serve_stdio(handler=echo, prompt=PROMPT):
+    """ Runs a single session over this process's stdin/stdout pipes, e.g. when started by another
+        program through subprocess pipes
+
+    Arguments:
+        handler {function} -- see run_session()
+        prompt {String} -- see run_session()
+
+    Returns
+        Session -- the finished session
+    """
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    # the pipe transports close the file they are given when the session ends, so they get duplicates of
+    # stdin/stdout and the process's own streams stay usable afterwards
+    if _is_pipe(sys.stdin):
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), _dup(sys.stdin, "rb"))
+    else:
+        # regular files and /dev/null can't be watched by the event loop, read them from a thread instead
+        loop.run_in_executor(None, _feed, loop, reader, sys.stdin.buffer)
+
+    if _is_pipe(sys.stdout):
+        # a StreamReaderProtocol (rather than a bare flow-control protocol) so writer.wait_closed() works
+        sys.stdout.flush()
+        transport, protocol = await loop.connect_write_pipe(
+            lambda: asyncio.StreamReaderProtocol(asyncio.StreamReader()), _dup(sys.stdout, "wb"))
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    else:
+        writer = _FileWriter(sys.stdout.buffer)
+    return await run_session(reader, writer, handler, prompt)
+
+
+def _dup(stream, mode):
+    return os.fdopen(os.dup(stream.fileno()), mode, buffering=0)
+
+
+def _is_pipe(stream):
+    mode = os.fstat(stream.fileno()).st_mode
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+
+def _feed(loop, reader, stream):
+    while True:
+        data = stream.read1(1 << 16)
+        if not data:
+            loop.call_soon_threadsafe(reader.feed_eof)
+            return
+        loop.call_soon_threadsafe(reader.feed_data, data)
+
+
+class _FileWriter:
+    """ Minimal StreamWriter stand-in for when stdout is redirected to a regular file """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, data):
+        self.stream.write(data)
+
+    async def drain(self):
+        self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+    async def wait_closed(self):
+        pass
+
+
+async def _client(connect, messages, prompt, latencies):
+    reader, writer = await connect()
+    prompt = prompt.encode()
+    await reader.readexactly(len(prompt))
+    for i in range(messages):
+        start = time.perf_counter()
+        writer.write(b"message " + str(i).encode() + b"\n")
+        await reader.readline()
+        await reader.readexactly(len(prompt))
+        latencies.append(time.perf_counter() - start)
+    writer.write(b"exit\n")
+    await reader.readline()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load_test(path=None, host="127.0.0.1", port=None, sessions=100, messages=100, prompt=PROMPT):
+    """ Local load generator: opens `sessions` concurrent connections to a running server and has each one
+        send `messages` lines and wait for every reply before sending the next, then "exit".
+
+    Arguments:
+        path {String} -- Unix socket path of the server
+        host {String} -- TCP host when no path is given
+        port {int} -- TCP port when no path is given
+        sessions {int} -- number of concurrent sessions
+        messages {int} -- messages per session
+        prompt {String} -- the server's prompt
+
+    Returns
+        Dictionary -- sessions, messages, seconds, messages_per_second and latency percentiles in milliseconds
+    """
+
+    if path is not None:
+        connect = lambda: asyncio.open_unix_connection(path)
+    else:
+        connect = lambda: asyncio.open_connection(host, port)
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(connect, messages, prompt, latencies) for _ in range(sessions)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else float("nan")
+    return {"sessions": sessions,
+            "messages": len(latencies),
+            "seconds": seconds,
+            "messages_per_second": len(latencies) / seconds,
+            "latency_p50_ms": pct(0.50),
+            "latency_p99_ms": pct(0.99),
+            "latency_max_ms": latencies[-1] * 1000 if latencies else float("nan")}
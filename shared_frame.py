@@ -0,0 +1,331 @@
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+# column offsets inside the block are rounded up to this, so every column starts cache-line aligned
+ALIGN = 64
+# numpy kinds that are shared as they are: booleans, integers, floats, complex, datetimes, timedeltas
+_SHARED_KINDS = "biufcmM"
+# blocks this process published, and blocks it attached to, by name
+_OWNED = {}
+_ATTACHED = {}
+# removed blocks this process still has frames from, closed by detach() once they are gone
+_LINGERING = []
+
+
+def _shareable(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in _SHARED_KINDS
+
+
+class FrameHandle:
+    """ What a worker needs to rebuild a shared frame: the block name and where each column sits in it.
+        Small and picklable, pass it to workers instead of the frame and call attach(handle) there.
+    """
+
+    def __init__(self, name, size, columns, layout, index):
+        self.name = name
+        self.size = size
+        self.columns = columns
+        # one entry per column position: (offset, dtype string, length, None or (categories, ordered)) for
+        # shared columns, the column's values for columns that can't live in shared memory (strings,
+        # objects, extension types), which are pickled with the handle
+        self.layout = layout
+        # ("range", start, stop, step, name), ("shared", entry, name, freq) or ("pickled", index)
+        self.index = index
+
+    def __repr__(self):
+        shared = sum(isinstance(entry, tuple) for entry in self.layout)
+        return ("<FrameHandle " + self.name + ": " + str(shared) + " shared, " + str(len(self.layout) - shared) +
+                " pickled columns, " + str(self.size) + " bytes>")
+
+    def attach(self):
+        return attach(self)
+
+
+def _plan(values, offset):
+    # (entry, next offset) for an array placed at offset
+    offset = -(-offset // ALIGN) * ALIGN
+    return (offset, values.dtype.str, len(values)), offset + values.nbytes
+
+
+def _release(shm):
+    # closes and removes a block, run by SharedFrame.close(), garbage collection or interpreter exit
+    _OWNED.pop(shm.name, None)
+    try:
+        shm.close()
+    except BufferError:
+        # this process still has frames from attach(), kept so the mapping isn't closed under them
+        _LINGERING.append(shm)
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class SharedFrame:
+    """ Publishes a DataFrame's numeric, boolean, datetime and categorical columns into one
+        multiprocessing.shared_memory block, so worker processes get them as zero-copy numpy-backed views
+        instead of a pickled copy each. Categorical columns are shared as their codes, with the categories
+        in the handle. Other columns (strings, objects, extension dtypes) are pickled along with the handle,
+        leave them out with columns= when they aren't needed.
+
+        with SharedFrame(df) as shared:
+            results = list(pool.map(task, [shared.handle] * 8))
+
+        def task(handle):
+            df = attach(handle)      # read-only views, df.copy() before writing to it
+            ...
+
+        The block is removed by close() or the end of the with block, when the SharedFrame is garbage
+        collected, or at interpreter exit, and by multiprocessing's resource tracker if the process dies.
+        Workers that still have it attached keep their mapping until they detach.
+    """
+
+    def __init__(self, df, columns=None):
+        if columns is not None:
+            df = df[list(columns)]
+        layout, plan = [], []
+        offset = 0
+        for i in range(df.shape[1]):
+            series = df.iloc[:, i]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.array.codes
+                entry, offset = _plan(codes, offset)
+                layout.append(entry + ((series.cat.categories, series.cat.ordered),))
+                plan.append((entry[0], codes))
+            elif _shareable(series.dtype):
+                values = series.to_numpy()
+                entry, offset = _plan(values, offset)
+                layout.append(entry + (None,))
+                plan.append((entry[0], values))
+            else:
+                layout.append(series.array)
+        if isinstance(df.index, pd.RangeIndex):
+            index = ("range", df.index.start, df.index.stop, df.index.step, df.index.name)
+        elif _shareable(df.index.dtype):
+            values = df.index.to_numpy()
+            entry, offset = _plan(values, offset)
+            # a date_range index keeps its frequency
+            index = ("shared", entry, df.index.name, getattr(df.index, "freq", None))
+            plan.append((entry[0], values))
+        else:
+            index = ("pickled", df.index)
+
+        # a zero-size block can't be created
+        self._shm = SharedMemory(create=True, size=max(offset, 1))
+        _OWNED[self._shm.name] = self._shm
+        self._finalizer = weakref.finalize(self, _release, self._shm)
+        for start, values in plan:
+            target = np.frombuffer(self._shm.buf, dtype=values.dtype, count=len(values), offset=start)
+            target[:] = values
+            del target
+        self.handle = FrameHandle(self._shm.name, offset, df.columns, layout, index)
+
+    @property
+    def name(self):
+        return self.handle.name
+
+    @property
+    def closed(self):
+        return not self._finalizer.alive
+
+    def close(self):
+        """ Removes the block. Workers' existing views stay valid, new attach() calls fail """
+
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _view(shm, entry):
+    offset, dtype, length = entry[:3]
+    values = np.frombuffer(shm.buf, dtype=np.dtype(dtype), count=length, offset=offset)
+    # the block is shared by every worker, a write would show up in all of them
+    values.flags.writeable = False
+    return values
+
+
+def attach(handle):
+    """ The DataFrame behind a handle, with shared columns as read-only zero-copy views of the block.
+        A process attaches to each block once, later calls reuse the mapping.
+
+    Arguments:
+        handle {FrameHandle} -- SharedFrame.handle from the publishing process
+
+    Returns
+        DataFrame -- same columns and index as the published frame
+    """
+
+    shm = _OWNED.get(handle.name) or _ATTACHED.get(handle.name)
+    if shm is None:
+        shm = SharedMemory(name=handle.name)
+        if multiprocessing.parent_process() is None:
+            # Python < 3.13 registers attached blocks with this process' resource tracker, which would
+            # remove the block when this process exits. Workers started by multiprocessing share the
+            # publisher's tracker and must leave the registration alone.
+            resource_tracker.unregister(shm._name, "shared_memory")
+        _ATTACHED[handle.name] = shm
+    data = {}
+    for i, entry in enumerate(handle.layout):
+        if not isinstance(entry, tuple):
+            data[i] = entry
+            continue
+        values = _view(shm, entry)
+        if entry[3] is not None:
+            categories, ordered = entry[3]
+            values = pd.Categorical.from_codes(values, categories=categories, ordered=ordered, validate=False)
+        data[i] = values
+    kind = handle.index[0]
+    if kind == "range":
+        index = pd.RangeIndex(*handle.index[1:4], name=handle.index[4])
+    elif kind == "shared":
+        index = pd.Index(_view(shm, handle.index[1]), name=handle.index[2], copy=False)
+        if handle.index[3] is not None:
+            index = pd.DatetimeIndex(index, freq=handle.index[3]) if index.dtype.kind == "M" else \
+                pd.TimedeltaIndex(index, freq=handle.index[3])
+    else:
+        index = handle.index[1]
+    df = pd.DataFrame(data, index=index, copy=False)
+    # built by position, so duplicate labels survive
+    df.columns = handle.columns
+    return df
+
+
+def detach(handle=None):
+    """ Unmaps attached blocks in this process. A block stays mapped while frames from attach() use it
+
+    Arguments:
+        handle {FrameHandle} -- block to unmap, None for all
+
+    Returns
+        int -- number of blocks unmapped
+    """
+
+    names = list(_ATTACHED) if handle is None else [handle.name]
+    done = 0
+    for name in names:
+        shm = _ATTACHED.get(name)
+        if shm is None:
+            continue
+        try:
+            shm.close()
+        except BufferError:
+            continue
+        del _ATTACHED[name]
+        done += 1
+    for shm in list(_LINGERING):
+        if handle is None or shm.name == handle.name:
+            try:
+                shm.close()
+            except BufferError:
+                continue
+            _LINGERING.remove(shm)
+            done += 1
+    return done
+
+
+def _private_shared():
+    # (private, shared) resident bytes of this process, from /proc/self/smaps_rollup (Linux), else None
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+    kb = {k: int(v.split()[0]) * 1024 for k, v in fields.items() if v.strip().endswith("kB")}
+    return kb["Private_Clean"] + kb["Private_Dirty"], kb["Shared_Clean"] + kb["Shared_Dirty"]
+
+
+def _baseline(seconds):
+    # memory of a worker before any frame arrives, slept on so every worker of the pool takes one
+    time.sleep(seconds)
+    return os.getpid(), _private_shared()
+
+
+def _scan(df):
+    # the work each worker does in the benchmark: touches every shared value once
+    return float(sum(df[c].to_numpy().sum() for c in df.columns if df[c].dtype.kind in "if") +
+                 sum(int(df[c].array.codes.sum()) for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)))
+
+
+def _shared_task(handle):
+    start = time.perf_counter()
+    df = attach(handle)
+    attached = time.perf_counter() - start
+    total = _scan(df)
+    del df
+    return os.getpid(), attached, total, _private_shared()
+
+
+def _pickled_task(df):
+    return os.getpid(), 0.0, _scan(df), _private_shared()
+
+
+def _fan_out(pool, task, arg, workers, baseline):
+    start = time.perf_counter()
+    results = list(pool.map(task, [arg] * workers))
+    seconds = time.perf_counter() - start
+    memory = [r[3] for r in results]
+    if any(m is None for m in memory) or any(r[0] not in baseline for r in results):
+        private = None
+    else:
+        private = sum(max(0, m[0] - baseline[r[0]][0]) for r, m in zip(results, memory))
+    return seconds, [r[1] for r in results], [r[2] for r in results], private
+
+
+def benchmark(rows=125 * 10 ** 6, numeric=9, categorical=1, workers=8, pickled=True, seed=0, mp_context="spawn"):
+    """ Hands a random frame to every worker of a process pool through SharedFrame and, optionally, by
+        pickling it, and reports times and the private memory the copies add in the workers. The defaults
+        make a 10 GB frame of 8-byte numeric columns plus int8-coded categoricals.
+
+    Arguments:
+        rows {int} -- rows of the frame
+        numeric {int} -- float64 columns
+        categorical {int} -- categorical columns (100 categories)
+        workers {int} -- worker processes, each one gets the whole frame
+        pickled {bool} -- also time the pickled handoff (needs memory for a copy per worker)
+        seed {int} -- random seed
+        mp_context {String} -- multiprocessing start method, "spawn" keeps fork from sharing the frame
+
+    Returns
+        Dictionary -- frame_bytes, publish_s, shared_s (fan-out wall time), attach_s (slowest worker),
+        shared_private_bytes and, with pickled, pickled_s and pickled_private_bytes (summed over workers)
+    """
+
+    rng = np.random.default_rng(seed)
+    data = {"x" + str(i): rng.random(rows) for i in range(numeric)}
+    labels = pd.Index(["c" + str(i) for i in range(100)])
+    for i in range(categorical):
+        data["c" + str(i)] = pd.Categorical.from_codes(rng.integers(0, 100, rows).astype(np.int8), labels)
+    df = pd.DataFrame(data, copy=False)
+    del data
+    record = {"rows": rows, "workers": workers, "frame_bytes": int(df.memory_usage(index=False).sum())}
+
+    context = multiprocessing.get_context(mp_context) if mp_context else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # start every worker and take its memory before any frame arrives
+        baseline = dict(pool.map(_baseline, [0.5] * workers))
+        start = time.perf_counter()
+        with SharedFrame(df) as shared:
+            record["publish_s"] = time.perf_counter() - start
+            seconds, attach_s, totals, private = _fan_out(pool, _shared_task, shared.handle, workers, baseline)
+        record["shared_s"] = seconds
+        record["attach_s"] = max(attach_s)
+        record["shared_private_bytes"] = private
+        if pickled:
+            seconds, _, pickled_totals, private = _fan_out(pool, _pickled_task, df, workers, baseline)
+            if not np.allclose(totals, pickled_totals):
+                raise AssertionError("shared and pickled frames disagree")
+            record["pickled_s"] = seconds
+            record["pickled_private_bytes"] = private
+    return record
@@ -0,0 +1,504 @@
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# rows read from a CSV and inserted per executemany() call
+CHUNK_ROWS = 100000
+AGGREGATES = {"sum": "COALESCE(SUM({0}), 0)", "mean": "AVG({0})", "count": "COUNT({0})", "size": "COUNT(*)",
+              "min": "MIN({0})", "max": "MAX({0})"}
+# where a result column's values come from, to give it back the dtype pandas would
+_AGGREGATE_DTYPES = {"mean": "float64", "count": "int64", "size": "int64"}
+# table remembering the pandas dtype of every stored column
+_META = "_frame_columns"
+# RIGHT and FULL OUTER JOIN arrived in SQLite 3.39, older versions get them rewritten with LEFT JOIN
+NATIVE_OUTER_JOIN = sqlite3.sqlite_version_info >= (3, 39)
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _widen(old, new):
+    # dtype of a column whose chunks came back with different dtypes
+    if old == new:
+        return old
+    if {old, new} <= {"int64", "float64", "bool"}:
+        return "float64"
+    return "object"
+
+
+def _values(series):
+    # plain Python values for sqlite3, missing values become NULL
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return [None if pd.isna(v) else v.isoformat() for v in series]
+    values = series.tolist()
+    if series.dtype.kind not in "iub" and series.hasnans:
+        return [None if pd.api.types.is_scalar(v) and pd.isna(v) else v for v in values]
+    return values
+
+
+def _restore(df, dtypes):
+    # gives query results back the dtypes pandas would have produced for the same operation
+    for column, dtype in dtypes.items():
+        values = df[column]
+        if dtype == "int64":
+            df[column] = values.astype(dtype) if not values.isna().any() else values.astype("float64")
+        elif dtype == "bool":
+            # like pandas, a bool column with missing values (from an outer side) becomes object True/False/NaN
+            if values.isna().any():
+                df[column] = pd.Series([np.nan if pd.isna(v) else bool(v) for v in values], index=df.index,
+                                       dtype=object)
+            else:
+                df[column] = values.astype(dtype)
+        elif dtype == "float64":
+            df[column] = values.astype("float64")
+        elif dtype.startswith("datetime64"):
+            df[column] = pd.to_datetime(values).astype(dtype)
+        elif dtype == "str":
+            df[column] = values.astype("str")
+        else:
+            df[column] = values.where(values.notna(), np.nan)
+    return df
+
+
+class _Pool:
+    """ A fixed number of connections to one database, handed out one caller at a time """
+
+    def __init__(self, connect, size):
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._free = threading.Semaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        self._free.acquire()
+        try:
+            try:
+                con = self._idle.get_nowait()
+            except queue.Empty:
+                con = self._connect()
+                with self._lock:
+                    self._all.append(con)
+            try:
+                yield con
+            finally:
+                self._idle.put(con)
+        finally:
+            self._free.release()
+
+    def close(self):
+        with self._lock:
+            for con in self._all:
+                con.close()
+            self._all = []
+        self._idle = queue.LifoQueue()
+
+
+class SQLStore:
+    """ Tables kept in an embedded SQLite database (a file, no server), queried with SQL instead of pandas
+        so the data doesn't need to fit in memory. Frames and CSVs are loaded with bulk inserts, groupby()
+        and merge() run as GROUP BY and JOIN queries, and the results come back as the same DataFrames the
+        pandas calls give (same rows, order, columns, index and dtypes).
+
+        store = SQLStore("properties.db")
+        store.load_csv("sample", "input/sample_data.csv", index_col=0)
+        store.groupby("sample", ["Township", "Product Type"], {"PPSQM": "mean"})
+        # == sample_df.groupby(["Township", "Product Type"]).agg({"PPSQM": "mean"})
+        store.merge("sample", "buyers", on="Buyer ID", how="left")
+        # == pd.merge(sample_df, buyers_df, on="Buyer ID", how="left")
+
+        Queries go through a pool of connections, so threads can query the store side by side. Without a
+        path the database lives in memory, shared by the pool's connections. An index on the group keys
+        followed by the aggregated columns (create_index()) lets SQLite answer a groupby from the index alone.
+    """
+
+    def __init__(self, path=None, pool_size=4):
+        if path is None:
+            uri, self.path = "file:" + uuid.uuid4().hex + "?mode=memory&cache=shared", None
+        else:
+            uri, self.path = "file:" + str(path), path
+
+        def connect():
+            con = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+            if path is not None:
+                con.execute("PRAGMA journal_mode=WAL")
+            return con
+
+        self._pool = _Pool(connect, pool_size)
+        # an in-memory database disappears with its last connection, this one keeps it alive
+        self._keep = connect()
+        self._keep.execute("CREATE TABLE IF NOT EXISTS " + _META + " (tbl TEXT, position INTEGER, name TEXT, dtype TEXT)")
+
+    def close(self):
+        self._pool.close()
+        self._keep.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def connection(self):
+        """ A pooled sqlite3 connection, as a context manager: with store.connection() as con: ... """
+
+        return self._pool.connection()
+
+    def query(self, sql, params=()):
+        """ Runs a SELECT and returns the rows as a DataFrame """
+
+        with self.connection() as con:
+            return pd.read_sql_query(sql, con, params=params)
+
+    # loading
+
+    def dtypes(self, table):
+        """ The pandas dtype of every column of a stored table, in column order """
+
+        with self.connection() as con:
+            rows = con.execute("SELECT name, dtype FROM " + _META + " WHERE tbl = ? ORDER BY position", (table,)).fetchall()
+        if not rows:
+            raise KeyError("no table " + repr(table))
+        return dict(rows)
+
+    def load_frames(self, table, frames, if_exists="replace"):
+        """ Stores a DataFrame, or chunks of one, as a table. Each chunk is written with one executemany()
+            inside a single transaction.
+
+        Arguments:
+            table {String} -- table name
+            frames {DataFrame or iterable} -- frame or chunks of a frame with the same columns
+            if_exists {String} -- "replace" the table or "append" to it
+
+        Returns
+            int -- rows inserted
+        """
+
+        if if_exists not in ("replace", "append"):
+            raise ValueError("if_exists must be \"replace\" or \"append\", got " + repr(if_exists))
+        frames = [frames] if isinstance(frames, pd.DataFrame) else frames
+        rows = 0
+        with self.connection() as con:
+            con.execute("PRAGMA synchronous=OFF")
+            con.execute("BEGIN")
+            try:
+                if if_exists == "replace":
+                    con.execute("DROP TABLE IF EXISTS " + _quote(table))
+                    con.execute("DELETE FROM " + _META + " WHERE tbl = ?", (table,))
+                dtypes = dict(con.execute("SELECT name, dtype FROM " + _META + " WHERE tbl = ? ORDER BY position",
+                                          (table,)).fetchall())
+                for frame in frames:
+                    if not dtypes:
+                        dtypes = {c: str(frame[c].dtype) for c in frame.columns}
+                        con.execute("CREATE TABLE " + _quote(table) + " (" +
+                                    ", ".join(_quote(c) + " " + _sql_type(frame[c].dtype) for c in frame.columns) + ")")
+                    elif list(frame.columns) != list(dtypes):
+                        raise ValueError("columns " + str(list(frame.columns)) + " don't match table " + repr(table) +
+                                         " " + str(list(dtypes)))
+                    for column in frame.columns:
+                        if frame[column].notna().any():
+                            dtypes[column] = _widen(dtypes[column], str(frame[column].dtype))
+                    placeholders = ", ".join("?" * len(frame.columns))
+                    con.executemany("INSERT INTO " + _quote(table) + " VALUES (" + placeholders + ")",
+                                    zip(*[_values(frame[c]) for c in frame.columns]))
+                    rows += len(frame)
+                con.execute("DELETE FROM " + _META + " WHERE tbl = ?", (table,))
+                con.executemany("INSERT INTO " + _META + " VALUES (?, ?, ?, ?)",
+                                [(table, i, c, d) for i, (c, d) in enumerate(dtypes.items())])
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            finally:
+                con.execute("PRAGMA synchronous=FULL")
+        return rows
+
+    def load_csv(self, table, path, chunksize=CHUNK_ROWS, if_exists="replace", **read_csv_kwargs):
+        """ Stores a CSV file as a table, read in chunks so it never has to fit in memory
+
+        Arguments:
+            table {String} -- table name
+            path {String} -- CSV file
+            chunksize {int} -- rows per chunk
+            if_exists {String} -- see load_frames()
+            **read_csv_kwargs -- passed to pd.read_csv (index_col=0 drops a saved index column, usecols, ...)
+
+        Returns
+            int -- rows inserted
+        """
+
+        index_col = read_csv_kwargs.pop("index_col", None)
+        chunks = pd.read_csv(path, chunksize=chunksize, index_col=index_col, **read_csv_kwargs)
+        return self.load_frames(table, (c.reset_index(drop=True) for c in chunks), if_exists)
+
+    def create_index(self, table, columns):
+        """ Indexes columns of a table, which speeds up joins and filters on them """
+
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        name = "ix_" + table + "_" + "_".join(map(str, columns))
+        with self.connection() as con:
+            con.execute("CREATE INDEX IF NOT EXISTS " + _quote(name) + " ON " + _quote(table) +
+                        " (" + ", ".join(map(_quote, columns)) + ")")
+
+    # queries
+
+    def groupby(self, table, by, agg, as_index=True):
+        """ GROUP BY query matching df.groupby(by).agg(agg): groups sorted by key, rows with a missing key
+            left out.
+
+        Arguments:
+            table {String} -- table name
+            by {String or List} -- key column(s)
+            agg {Dictionary} -- column -> "sum", "mean", "count", "size", "min" or "max", or a list of them
+            as_index {bool} -- keys as the index (like pandas' default) or as columns
+
+        Returns
+            DataFrame -- with (column, function) column pairs when a column has a list of functions
+        """
+
+        keys = [by] if isinstance(by, str) else list(by)
+        dtypes = self.dtypes(table)
+        multi = any(not isinstance(f, str) for f in agg.values())
+        select, names, out_dtypes = [], [], {}
+        for column, funcs in agg.items():
+            for func in [funcs] if isinstance(funcs, str) else funcs:
+                if func not in AGGREGATES:
+                    raise ValueError("unsupported aggregate " + repr(func) + ", expected one of " + str(list(AGGREGATES)))
+                name = (column, func) if multi else column
+                select.append(AGGREGATES[func].format(_quote(column)))
+                names.append(name)
+                out_dtypes[name] = _AGGREGATE_DTYPES.get(func, dtypes[column])
+        sql = ("SELECT " + ", ".join([_quote(k) for k in keys] + select) +
+               " FROM " + _quote(table) +
+               " WHERE " + " AND ".join(_quote(k) + " IS NOT NULL" for k in keys) +
+               " GROUP BY " + ", ".join(map(_quote, keys)) +
+               " ORDER BY " + ", ".join(map(_quote, keys)))
+        with self.connection() as con:
+            rows = con.execute(sql).fetchall()
+        result = pd.DataFrame(rows, columns=range(len(keys) + len(names)))
+        # restored by position, a key that is aggregated too (by="v", agg={"v": "max"}) has its name twice
+        _restore(result, dict(enumerate([dtypes[k] for k in keys] + [out_dtypes[n] for n in names])))
+        columns = [(k, "") for k in keys] + names if multi else keys + names
+        if as_index:
+            result = result.set_index(list(range(len(keys))))
+            result.index.names = keys
+            columns = columns[len(keys):]
+        else:
+            # like pandas, a key that is aggregated too only appears as its aggregate
+            kept = [i for i, k in enumerate(keys) if k not in agg] + list(range(len(keys), len(columns)))
+            result = result[kept]
+            columns = [columns[i] for i in kept]
+        result.columns = pd.MultiIndex.from_tuples(columns) if multi else columns
+        return result
+
+    def merge(self, left, right, on=None, left_on=None, right_on=None, how="inner", suffixes=("_x", "_y"), into=None):
+        """ JOIN query matching pd.merge() on two stored tables: same columns, suffixes, row order and
+            dtypes. Like pandas, missing keys match each other and an outer merge puts them last. With into,
+            the result is written to a new table instead of being read back, so merged tables larger than
+            memory can be grouped next.
+
+        Arguments:
+            left {String} -- left table
+            right {String} -- right table
+            on {String or List} -- key column(s) present in both tables
+            left_on {String or List} -- key column(s) of the left table, with right_on
+            right_on {String or List} -- key column(s) of the right table
+            how {String} -- "inner", "left", "right" or "outer"
+            suffixes {Tuple} -- added to the other columns both tables have
+            into {String} -- table to store the result in (replacing it)
+
+        Returns
+            DataFrame, or the number of rows stored when into is given
+        """
+
+        if how not in ("inner", "left", "right", "outer"):
+            raise ValueError("how must be one of inner, left, right, outer, got " + repr(how))
+        listed = lambda keys: [keys] if isinstance(keys, str) else list(keys)
+        if on is not None:
+            left_keys = right_keys = listed(on)
+        elif left_on is not None and right_on is not None:
+            left_keys, right_keys = listed(left_on), listed(right_on)
+        else:
+            # like pandas, join on the columns the tables have in common
+            ldt, rdt = self.dtypes(left), self.dtypes(right)
+            left_keys = right_keys = [c for c in ldt if c in rdt]
+        if len(left_keys) != len(right_keys) or not left_keys:
+            raise ValueError("need the same number of left and right keys, got " + str(left_keys) + " and " + str(right_keys))
+        ldt, rdt = self.dtypes(left), self.dtypes(right)
+        # a key with the same name on both sides comes out once, filled from whichever side has the row
+        shared = {l for l, r in zip(left_keys, right_keys) if l == r}
+        overlap = (set(ldt) & set(rdt)) - shared
+
+        select, names, out_dtypes = [], [], {}
+        nullable_left = how in ("right", "outer")
+        nullable_right = how in ("left", "outer")
+        for column, dtype in ldt.items():
+            if column in shared:
+                expr = "COALESCE(l." + _quote(column) + ", r." + _quote(column) + ")" if nullable_left else "l." + _quote(column)
+                if pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_float_dtype(rdt[column]):
+                    dtype = "float64"
+            else:
+                expr = "l." + _quote(column)
+            name = column + suffixes[0] if column in overlap else column
+            select.append(expr)
+            names.append(name)
+            out_dtypes[name] = dtype
+        for column, dtype in rdt.items():
+            if column in shared:
+                continue
+            name = column + suffixes[1] if column in overlap else column
+            select.append("r." + _quote(column))
+            names.append(name)
+            out_dtypes[name] = dtype
+
+        # IS rather than =, so missing keys match each other like in pandas
+        condition = " AND ".join("l." + _quote(l) + " IS r." + _quote(r) for l, r in zip(left_keys, right_keys))
+        if how == "outer":
+            # pandas sorts an outer join by key
+            # missing keys last, SQLite would sort NULL first
+            keys = ["COALESCE(l." + _quote(l) + ", r." + _quote(r) + ")" for l, r in zip(left_keys, right_keys)]
+            order = [o for key in keys for o in (key + " IS NULL", key)]
+            order += ["l.rowid", "r.rowid"]
+        elif how == "right":
+            order = ["r.rowid", "l.rowid"]
+        else:
+            order = ["l.rowid", "r.rowid"]
+        tables = {"l": _quote(left) + " AS l", "r": _quote(right) + " AS r"}
+        if how == "outer" and not NATIVE_OUTER_JOIN:
+            # the left join plus the right rows nothing matched, every select and order expression is
+            # carried out of the union by position
+            exprs = select + order
+            part = "SELECT " + ", ".join(e + " AS c" + str(i) for i, e in enumerate(exprs))
+            sql = ("SELECT " + ", ".join("c" + str(i) + " AS " + _quote(n) for i, n in enumerate(names)) +
+                   " FROM (" + part + " FROM " + tables["l"] + " LEFT JOIN " + tables["r"] + " ON " + condition +
+                   " UNION ALL " + part + " FROM " + tables["r"] + " LEFT JOIN " + tables["l"] + " ON " +
+                   condition + " WHERE l.rowid IS NULL) ORDER BY " +
+                   ", ".join("c" + str(i) for i in range(len(select), len(exprs))))
+        else:
+            if how == "right":
+                # a right join is the left join with the tables swapped, the aliases keep every expression valid
+                join = tables["r"] + " LEFT JOIN " + tables["l"]
+            else:
+                kind = {"inner": "JOIN", "left": "LEFT JOIN", "outer": "FULL OUTER JOIN"}[how]
+                join = tables["l"] + " " + kind + " " + tables["r"]
+            sql = ("SELECT " + ", ".join(e + " AS " + _quote(n) for e, n in zip(select, names)) +
+                   " FROM " + join + " ON " + condition + " ORDER BY " + ", ".join(order))
+        if into is not None:
+            return self._store_query(into, sql, out_dtypes)
+        with self.connection() as con:
+            rows = con.execute(sql).fetchall()
+        result = pd.DataFrame(rows, columns=range(len(names)))
+        result.columns = names
+        return _restore(result, out_dtypes)
+
+    def _store_query(self, table, sql, dtypes):
+        with self.connection() as con:
+            con.execute("BEGIN")
+            try:
+                con.execute("DROP TABLE IF EXISTS " + _quote(table))
+                con.execute("CREATE TABLE " + _quote(table) + " AS " + sql)
+                for column, dtype in dtypes.items():
+                    # like pandas, integer columns with missing values (from an outer side) become floats.
+                    # Bool columns keep their dtype here, reading them back gives object True/False/NaN
+                    if dtype == "int64" and con.execute("SELECT 1 FROM " + _quote(table) + " WHERE " +
+                                                                  _quote(column) + " IS NULL LIMIT 1").fetchone():
+                        dtypes[column] = "float64"
+                con.execute("DELETE FROM " + _META + " WHERE tbl = ?", (table,))
+                con.executemany("INSERT INTO " + _META + " VALUES (?, ?, ?, ?)",
+                                [(table, i, c, d) for i, (c, d) in enumerate(dtypes.items())])
+                rows = con.execute("SELECT COUNT(*) FROM " + _quote(table)).fetchone()[0]
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+        return rows
+
+    def read(self, table):
+        """ A whole stored table as a DataFrame """
+
+        dtypes = self.dtypes(table)
+        with self.connection() as con:
+            rows = con.execute("SELECT * FROM " + _quote(table) + " ORDER BY rowid").fetchall()
+        result = pd.DataFrame(rows, columns=range(len(dtypes)))
+        result.columns = list(dtypes)
+        return _restore(result, dtypes)
+
+
+def benchmark(sizes, groupby_keys=("Township", "Product Type"), seed=0, path=None):
+    """ Times the pandas path against SQLStore on synthetic sample_data-style property tables of growing
+        size: loading, the groupby mean (without and with a covering index) and a left merge with a buyers
+        table
+
+    Arguments:
+        sizes {List} -- numbers of property rows
+        groupby_keys {Tuple} -- columns to group by
+        seed {int} -- random seed
+        path {String} -- database file, in memory when None
+
+    Returns
+        DataFrame -- per size: seconds for each step on each path and the store's database size in bytes
+    """
+
+    rng = np.random.default_rng(seed)
+    townships = ["Uptown Bonifacio", "Eastwood City", "Rockwell Center", "McKinley Hill", "Alabang", "Ortigas"]
+    types = ["Studio", "1 BR", "2 BR", "3 BR", "Penthouse"]
+    records = []
+    for n in sizes:
+        buyers = max(1, n // 10)
+        properties = pd.DataFrame({"Property": ["Property " + str(i) for i in range(n)],
+                                   "Buyer ID": rng.integers(0, buyers, n),
+                                   "PPSQM": rng.normal(250000, 80000, n).round(),
+                                   "Product Type": rng.choice(types, n),
+                                   "Township": rng.choice(townships, n)})
+        properties["Property"] = properties["Property"].astype("str")
+        buyers_df = pd.DataFrame({"Buyer ID": np.arange(0, buyers, 2), "Buyer": rng.choice(["A", "B", "C"], (buyers + 1) // 2)})
+        record = {"rows": n}
+
+        start = time.perf_counter()
+        expected_group = properties.groupby(list(groupby_keys)).agg({"PPSQM": "mean"})
+        record["pandas_groupby_s"] = time.perf_counter() - start
+        start = time.perf_counter()
+        expected_merge = pd.merge(properties, buyers_df, on="Buyer ID", how="left")
+        record["pandas_merge_s"] = time.perf_counter() - start
+
+        with SQLStore(path) as store:
+            start = time.perf_counter()
+            store.load_frames("properties", (properties.iloc[i:i + CHUNK_ROWS] for i in range(0, n, CHUNK_ROWS)))
+            store.load_frames("buyers", buyers_df)
+            store.create_index("buyers", "Buyer ID")
+            record["store_load_s"] = time.perf_counter() - start
+            start = time.perf_counter()
+            group = store.groupby("properties", list(groupby_keys), {"PPSQM": "mean"})
+            record["store_groupby_s"] = time.perf_counter() - start
+            start = time.perf_counter()
+            store.create_index("properties", list(groupby_keys) + ["PPSQM"])
+            record["store_index_s"] = time.perf_counter() - start
+            start = time.perf_counter()
+            store.groupby("properties", list(groupby_keys), {"PPSQM": "mean"})
+            record["store_groupby_indexed_s"] = time.perf_counter() - start
+            start = time.perf_counter()
+            merged = store.merge("properties", "buyers", on="Buyer ID", how="left")
+            record["store_merge_s"] = time.perf_counter() - start
+            with store.connection() as con:
+                pages = con.execute("PRAGMA page_count").fetchone()[0] * con.execute("PRAGMA page_size").fetchone()[0]
+            record["store_bytes"] = pages
+        pd.testing.assert_frame_equal(group, expected_group, check_exact=False)
+        pd.testing.assert_frame_equal(merged, expected_merge)
+        records.append(record)
+    return pd.DataFrame(records)
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+# rows processed per block, bounds the temporary memory to BLOCK_ROWS x n_columns floats
+BLOCK_ROWS = 1 << 16
+
+
+class CoMoments:
+    """ Running co-moment sums for a set of numeric columns, from which the Pearson correlation matrix
+        is computed. Data is fed in chunks with update(), partial results from different workers are
+        combined with merge(), and corr() gives the same matrix as DataFrame.corr() (pairwise-complete,
+        NaNs are skipped per pair of columns).
+
+        Values are accumulated relative to a per-column shift (the mean of the first block seen) which keeps
+        the sums of products numerically stable without a second pass.
+
+        cm = CoMoments(["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm"])
+        for chunk in pd.read_csv("input/Iris.csv", chunksize=50):
+            cm.update(chunk)
+        plt.imshow(cm.corr())
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.n = np.zeros((k, k))       # rows where both column i and column j are present
+        self.s = np.zeros((k, k))       # sum of x_i over those rows
+        self.ss = np.zeros((k, k))      # sum of x_i^2 over those rows
+        self.sp = np.zeros((k, k))      # sum of x_i * x_j over those rows
+
+    def _block(self, values):
+        # values: (rows, k) float64 block, already shifted
+        valid = ~np.isnan(values)
+        if valid.all():
+            rows = values.shape[0]
+            col_sum = values.sum(axis=0)
+            col_sq = np.einsum("ij,ij->j", values, values)
+            self.n += rows
+            self.s += col_sum[:, None]
+            self.ss += col_sq[:, None]
+            self.sp += values.T @ values
+        else:
+            w = valid.astype(np.float64)
+            values = np.where(valid, values, 0.0)
+            self.n += w.T @ w
+            self.s += values.T @ w
+            self.ss += (values * values).T @ w
+            self.sp += values.T @ values
+
+    def update(self, chunk, block_rows=BLOCK_ROWS):
+        """ Adds a chunk of rows. Only the tracked columns are read, straight from the frame, so there is
+            no need to drop() the other columns first. At most block_rows rows are converted at a time.
+
+        Arguments:
+            chunk {DataFrame or numpy.ndarray} -- rows to add, arrays must have the columns in self.columns order
+            block_rows {int} -- rows per internal block
+
+        Returns
+            CoMoments -- self
+        """
+
+        if isinstance(chunk, pd.DataFrame):
+            cols = [chunk[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in self.columns]
+            n_rows = len(chunk)
+        else:
+            chunk = np.asarray(chunk)
+            if chunk.ndim != 2 or chunk.shape[1] != len(self.columns):
+                raise ValueError("expected an array of shape (rows, " + str(len(self.columns)) + ")")
+            cols = None
+            n_rows = chunk.shape[0]
+
+        buf = np.empty((min(block_rows, n_rows), len(self.columns)))
+        for start in range(0, n_rows, block_rows):
+            stop = min(start + block_rows, n_rows)
+            block = buf[:stop - start]
+            if cols is None:
+                block[:] = chunk[start:stop]
+            else:
+                for j, col in enumerate(cols):
+                    block[:, j] = col[start:stop]
+
+            if self.shift is None:
+                with np.errstate(invalid="ignore"):
+                    shift = np.nanmean(block, axis=0) if len(block) else np.zeros(len(self.columns))
+                self.shift = np.nan_to_num(shift)
+            block -= self.shift
+            self._block(block)
+        return self
+
+    def _reshift(self, new_shift):
+        # re-expresses the sums relative to new_shift, needed before merging partials with different shifts
+        d = self.shift - new_shift
+        di, dj = d[:, None], d[None, :]
+        self.sp = self.sp + dj * self.s + di * self.s.T + di * dj * self.n
+        self.ss = self.ss + 2 * di * self.s + di * di * self.n
+        self.s = self.s + di * self.n
+        self.shift = np.array(new_shift, dtype=np.float64)
+
+    def merge(self, other):
+        """ Adds the sums of another CoMoments over the same columns (e.g. computed by another worker)
+
+        Arguments:
+            other {CoMoments} -- partial result to merge in
+
+        Returns
+            CoMoments -- self
+        """
+
+        if other.columns != self.columns:
+            raise ValueError("can only merge CoMoments over the same columns")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        if not np.array_equal(other.shift, self.shift):
+            other = other.copy()
+            other._reshift(self.shift)
+        self.n += other.n
+        self.s += other.s
+        self.ss += other.ss
+        self.sp += other.sp
+        return self
+
+    def copy(self):
+        new = CoMoments(self.columns)
+        new.shift = None if self.shift is None else self.shift.copy()
+        new.n, new.s, new.ss, new.sp = self.n.copy(), self.s.copy(), self.ss.copy(), self.sp.copy()
+        return new
+
+    def corr(self, min_periods=1):
+        """ Pearson correlation matrix of everything seen so far
+
+        Arguments:
+            min_periods {int} -- minimum number of complete pairs for a value, fewer gives NaN (as in DataFrame.corr)
+
+        Returns
+            DataFrame -- correlation matrix indexed by the column names
+        """
+
+        n = self.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = self.sp - self.s * self.s.T / n
+            var_i = self.ss - self.s * self.s / n
+            var_j = var_i.T
+            r = cov / np.sqrt(var_i * var_j)
+        r = np.clip(r, -1.0, 1.0)
+        r[(n < max(min_periods, 2)) | ~np.isfinite(r)] = np.nan
+        # exact 1 on the diagonal like pandas, wherever the column has variance
+        diag = np.diag(r).copy()
+        np.fill_diagonal(r, np.where(np.isnan(diag), np.nan, 1.0))
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+
+def partial(chunk, columns, block_rows=BLOCK_ROWS):
+    """ CoMoments of a single chunk, meant to be mapped over chunks in a process pool and merged afterwards
+
+    Arguments:
+        chunk {DataFrame or numpy.ndarray} -- rows
+        columns {List} -- column names
+        block_rows {int} -- rows per internal block
+
+    Returns
+        CoMoments
+    """
+
+    return CoMoments(columns).update(chunk, block_rows)
+
+
+def merge_all(partials):
+    """ Merges a list of CoMoments into one
+
+    Arguments:
+        partials {iterable} -- CoMoments over the same columns
+
+    Returns
+        CoMoments
+    """
+
+    result = None
+    for p in partials:
+        result = p.copy() if result is None else result.merge(p)
+    return result
+
+
+def corr(data, columns=None, min_periods=1):
+    """ Streaming replacement for df.drop(columns=[...]).corr(). Accepts a whole DataFrame or any iterable of
+        chunks (e.g. pd.read_csv(..., chunksize=...)) and reads each chunk once.
+
+    Arguments:
+        data {DataFrame or iterable} -- frame or chunks of a frame
+        columns {List} -- columns to correlate, defaults to the numeric columns of the (first) frame
+        min_periods {int} -- see CoMoments.corr()
+
+    Returns
+        DataFrame -- correlation matrix
+    """
+
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    cm = None
+    for chunk in chunks:
+        if cm is None:
+            if columns is None:
+                columns = chunk.select_dtypes(include=["number", "bool"]).columns
+            cm = CoMoments(columns)
+        cm.update(chunk)
+    if cm is None:
+        raise ValueError("no data")
+    return cm.corr(min_periods)
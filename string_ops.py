@@ -0,0 +1,248 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
+
+def _is_arrow(values):
+    """ True for pyarrow arrays and Arrow-backed pandas columns (the default str dtype in pandas >= 3) """
+
+    if pa is None:
+        return False
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return True
+    if isinstance(values, (pd.Series, pd.Index)):
+        dtype = values.dtype
+        return isinstance(dtype, pd.ArrowDtype) or getattr(dtype, "storage", None) == "pyarrow"
+    return False
+
+
+def _to_arrow(values):
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return values
+    if isinstance(values, (pd.Series, pd.Index)):
+        # Arrow-backed columns hand over their buffers without a copy
+        return pa.array(values.array)
+    return pa.array(values, type=pa.string())
+
+
+def _to_numpy(values):
+    if isinstance(values, np.ndarray) and values.dtype.kind == "T":
+        return values
+    if isinstance(values, (pd.Series, pd.Index)):
+        values = values.to_numpy()
+    return np.asarray(values, dtype=np.dtypes.StringDType(na_object=None))
+
+
+def _objects(values):
+    # values as a numpy array, object dtype for lists and object columns so missing values stay recognizable
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.to_numpy()
+    if isinstance(values, np.ndarray):
+        return values
+    return np.asarray(values, dtype=object)
+
+
+def _numpy_apply(func, columns):
+    """ func applied to the columns as numpy string arrays (single strings are passed as they are). Rows
+        where a column is missing (None, NaN, pd.NA) are left out and get that missing value back, like
+        pandas' .str methods, so the result is an object array when there are any.
+    """
+
+    arrays = [c if isinstance(c, str) else _objects(c) for c in columns]
+    masks = [(a, pd.isna(a)) for a in arrays if not isinstance(a, str) and a.dtype == object]
+    masks = [(a, m) for a, m in masks if m.any()]
+    if not masks:
+        return func(*[a if isinstance(a, str) else _to_numpy(a) for a in arrays])
+    missing = np.logical_or.reduce([m for _, m in masks])
+    keep = ~missing
+    result = np.empty(len(missing), dtype=object)
+    result[keep] = func(*[a if isinstance(a, str) else _to_numpy(a[keep]) for a in arrays])
+    # the missing value of the first column missing on the row
+    for a, m in reversed(masks):
+        result[m] = a[m]
+    return result
+
+
+def _from_arrow(result, like):
+    # an Arrow result for a first column that is a list or numpy array: a numpy string array, or an
+    # object array with None where the result is null
+    if isinstance(like, (pd.Series, pd.Index)) or _is_arrow(like):
+        return result
+    values = result.to_numpy(zero_copy_only=False)
+    return values if result.null_count else values.astype(np.dtypes.StringDType())
+
+
+def _unwrapped(values):
+    # the bare array behind a pandas column, so concat() doesn't rewrap it with the wrong index
+    if isinstance(values, (pd.Series, pd.Index)):
+        # numpy-backed columns go through as object arrays, so their missing values stay recognizable
+        return _to_arrow(values) if _is_arrow(values) else _objects(values)
+    return values
+
+
+def _wrap(result, like):
+    # hands the result back in the same kind of container the input came in
+    if isinstance(like, (pd.Series, pd.Index)):
+        # object columns stay object, so missing values come back as they were (None stays None)
+        dtype = like.dtype if _is_arrow(like) or like.dtype == object else None
+        if isinstance(like, pd.Index):
+            return pd.Index(result, name=like.name, dtype=dtype)
+        return pd.Series(result, index=like.index, name=like.name, dtype=dtype)
+    return result
+
+
+def upper(values):
+    """ Vectorized version of map(lambda x: x.upper(), values)
+
+    Arguments:
+        values {array-like} -- strings (list, numpy array, pandas Series or pyarrow array)
+
+    Returns
+        Same kind of container as values -- uppercased strings. Lists come back as numpy string arrays
+    """
+
+    if _is_arrow(values):
+        return _wrap(pc.utf8_upper(_to_arrow(values)), values)
+    return _wrap(_numpy_apply(np.strings.upper, [values]), values)
+
+
+def lower(values):
+    """ Vectorized version of map(lambda x: x.lower(), values)
+
+    Arguments:
+        values {array-like} -- strings
+
+    Returns
+        Same kind of container as values -- lowercased strings
+    """
+
+    if _is_arrow(values):
+        return _wrap(pc.utf8_lower(_to_arrow(values)), values)
+    return _wrap(_numpy_apply(np.strings.lower, [values]), values)
+
+
+def concat(*columns, sep=""):
+    """ Joins columns of strings element-wise, e.g. concat(df["First"], df["Last"], sep=" ").
+        Single strings are repeated for every row, so concat(words, ".com") appends ".com" to each word.
+        The result takes the container type of the first column that isn't a single string.
+
+    Arguments:
+        *columns -- string arrays of equal length and/or single strings
+        sep {String} -- separator placed between the parts
+
+    Returns
+        Same kind of container as the first array column -- joined strings
+    """
+
+    arrays = [c for c in columns if not isinstance(c, str)]
+    if not arrays:
+        return sep.join(columns)
+    like = arrays[0]
+
+    if any(_is_arrow(c) for c in arrays):
+        arrow_arrays = [_to_arrow(c) for c in arrays]
+        # the join kernel needs every part in the same string type (pandas uses large_string)
+        kind = pa.large_string() if any(a.type == pa.large_string() for a in arrow_arrays) else pa.string()
+        arrow_arrays = iter([a if a.type == kind else a.cast(kind) for a in arrow_arrays])
+        parts = [pa.scalar(c, kind) if isinstance(c, str) else next(arrow_arrays) for c in columns]
+        return _wrap(_from_arrow(pc.binary_join_element_wise(*parts, pa.scalar(sep, kind)), like), like)
+
+    def join(*parts):
+        result = parts[0]
+        for part in parts[1:]:
+            if sep:
+                result = np.strings.add(result, sep)
+            result = np.strings.add(result, part)
+        return result
+
+    return _wrap(_numpy_apply(join, columns), like)
+
+
+def add_prefix(values, prefix):
+    """ Vectorized version of map(lambda x: prefix + x, values)
+
+    Arguments:
+        values {array-like} -- strings
+        prefix {String} -- text put in front of every value
+
+    Returns
+        Same kind of container as values
+    """
+
+    return concat(prefix, values)
+
+
+def add_suffix(values, suffix):
+    """ Vectorized version of map(lambda w: w + suffix, values), e.g. add_suffix(words, ".com")
+
+    Arguments:
+        values {array-like} -- strings
+        suffix {String} -- text put after every value
+
+    Returns
+        Same kind of container as values
+    """
+
+    return concat(values, suffix)
+
+
+def numbers(n, start=0, arrow=None):
+    """ The integers start .. start + n - 1 as strings, the vectorized str(num) over a range
+
+    Arguments:
+        n {int} -- how many numbers
+        start {int} -- first number
+        arrow {bool} -- return a pyarrow array (True) or numpy string array (False), defaults to Arrow when installed
+
+    Returns
+        pyarrow.Array or numpy.ndarray
+    """
+
+    ints = np.arange(start, start + n)
+    if arrow is None:
+        arrow = pa is not None
+    if arrow:
+        return pc.cast(pa.array(ints), pa.string())
+    return ints.astype(np.dtypes.StringDType())
+
+
+def number(values, start=1, sep=". "):
+    """ Numbers each value by its position, the vectorized form of the notebook's
+        map(add_com, words, range(1, 6)) numbering: number(add_suffix(words, ".com")) -> "1. twitter.com", ...
+        When several parts are added at once, concat(numbers(len(words), 1), ". ", words, ".com") does it in one pass.
+
+    Arguments:
+        values {array-like} -- strings
+        start {int} -- number of the first value
+        sep {String} -- text between the number and the value
+
+    Returns
+        Same kind of container as values
+    """
+
+    nums = numbers(len(values), start, arrow=_is_arrow(values))
+    return _wrap(concat(nums, _unwrapped(values), sep=sep), values)
+
+
+def labels(prefix, n, start=0, arrow=None):
+    """ Generated names such as "Buyer 0", "Buyer 1", ..., the vectorized form of
+        list(map(lambda n: "Buyer " + str(n), np.arange(25))): labels("Buyer ", 25)
+
+    Arguments:
+        prefix {String} -- text in front of each number
+        n {int} -- how many labels
+        start {int} -- first number
+        arrow {bool} -- see numbers()
+
+    Returns
+        pyarrow.Array or numpy.ndarray
+    """
+
+    return concat(prefix, numbers(n, start, arrow))
+
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import image
+
+import batch_render
+
+
+def plain(fig, ax, key, data):
+    ax.plot(data["x"], data["y"])
+    ax.set_title(str(key))
+
+
+class Decorated:
+    # draws a colorbar and figure text on some keys only, picklable for the worker pool
+    def __call__(self, fig, ax, key, data):
+        if key == "busy":
+            mappable = ax.scatter(data["x"], data["y"], c=data["y"])
+            fig.colorbar(mappable, ax=ax)
+            fig.text(0.5, 0.02, "footnote")
+            fig.legend(["points"])
+        else:
+            plain(fig, ax, key, data)
+
+
+def frame(seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"x": np.arange(20), "y": rng.random(20)})
+
+
+def test_file_name():
+    assert batch_render.file_name(("Makati", "2024-01")) == "Makati_2024-01"
+    assert batch_render.file_name("a/b c") == "a_b_c"
+    assert batch_render.file_name("///") == "figure"
+
+
+def test_colliding_names_get_suffixes(tmp_path):
+    spec = batch_render.FigureSpec(plain, figsize=(2, 2), dpi=20)
+    groups = [("c/d", frame(0)), ("c_d", frame(1)), ("c d", frame(2))]
+    paths = batch_render.render_batch(spec, groups, str(tmp_path), workers=1)
+    assert [os.path.basename(p) for p in paths] == ["c_d.png", "c_d_2.png", "c_d_3.png"]
+    assert all(os.path.exists(p) for p in paths)
+
+
+def test_reused_figure_matches_a_fresh_one(tmp_path):
+    spec = batch_render.FigureSpec(Decorated(), figsize=(3, 2), dpi=40)
+    data = frame(3)
+    reused = batch_render.render_batch(spec, [("busy", frame(4)), ("calm", data)], str(tmp_path / "a"), workers=1)
+    fresh = batch_render.render_batch(spec, [("calm", data)], str(tmp_path / "b"), workers=1)
+    assert np.array_equal(image.imread(reused[1]), image.imread(fresh[0]))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pool_writes_every_group(tmp_path, workers):
+    spec = batch_render.FigureSpec(plain, figsize=(2, 2), dpi=20)
+    groups = {i: frame(i) for i in range(5)}
+    paths = batch_render.render_batch(spec, groups, str(tmp_path), workers=workers)
+    assert [os.path.basename(p) for p in paths] == [str(i) + ".png" for i in range(5)]
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from booking_sim import BookingSimulator
+from functions import Room
+
+
+def reference(rooms, events, steps):
+    # the same schedule applied one Room at a time with close_room()/open_room()
+    rooms = [Room(r.price, r.room_open) for r in rooms]
+    until = [0] * len(rooms)
+    releases = {}
+    revenue = [0.0] * len(rooms)
+    for t in range(steps):
+        for room, end in releases.pop(t, []) + [(r, -1) for at, kind, r, _ in events if at == t and kind == "release"]:
+            if end < 0 or until[room] == end:
+                rooms[room].open_room()
+                until[room] = t
+        for at, kind, room, price in events:
+            if at == t and kind == "price":
+                rooms[room].price = price
+        for at, kind, room, stay in events:
+            if at == t and kind == "book" and rooms[room].room_open:
+                rooms[room].close_room()
+                until[room] = t + max(stay, 1)
+                revenue[room] += rooms[room].price * max(stay, 1)
+                releases.setdefault(t + max(stay, 1), []).append((room, t + max(stay, 1)))
+    return rooms, revenue
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scheduled_events_match_room_by_room(seed):
+    rng = np.random.default_rng(seed)
+    rooms = [Room(int(p), bool(o)) for p, o in zip(rng.integers(50, 500, 40), rng.random(40) < 0.8)]
+    events = []
+    for _ in range(300):
+        at, room = int(rng.integers(0, 30)), int(rng.integers(0, 40))
+        kind = rng.choice(["book", "book", "release", "price"])
+        value = int(rng.integers(1, 6)) if kind == "book" else float(rng.integers(50, 500)) if kind == "price" else None
+        events.append((at, str(kind), room, value))
+    events.sort(key=lambda e: e[0])
+    sim = BookingSimulator.from_rooms(rooms, seed=seed)
+    for at, kind, room, value in events:
+        sim.schedule(at, kind, [room], value)
+    series = sim.run(30)
+    expected, revenue = reference(rooms, events, 30)
+    assert [(r.price, r.room_open) for r in sim.to_rooms()] == [(r.price, r.room_open) for r in expected]
+    assert np.allclose(sim.revenue, revenue)
+    assert (series["events"] == series["releases"] + series["price_changes"] + series["bookings"]).all()
+    assert (series["bookings"] <= series["requests"]).all()
+
+
+def test_int_prices_come_back_as_ints():
+    sim = BookingSimulator.from_rooms([Room(3400, True), Room(np.int64(120), False)])
+    assert [(type(r.price), r.price) for r in sim.to_rooms()] == [(int, 3400), (int, 120)]
+    sim.schedule(0, "price", [1], 119.5)
+    sim.run(1)
+    assert [r.price for r in sim.to_rooms()] == [3400, 119.5]
+    assert not BookingSimulator([1.0, 2.0]).int_prices
+    assert BookingSimulator(np.array([1, 2])).int_prices
+
+
+@pytest.mark.parametrize("price", [None, "3400", True])
+def test_non_numeric_prices_are_rejected(price):
+    with pytest.raises(TypeError):
+        BookingSimulator.from_rooms([Room(100, True), Room(price, True)])
+
+
+def test_same_seed_same_run():
+    runs = [BookingSimulator(np.linspace(50, 500, 1000), seed=3).run(20, arrivals=300, price_changes=50)
+            for _ in range(2)]
+    assert runs[0].equals(runs[1])
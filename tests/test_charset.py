@@ -0,0 +1,60 @@
+import re
+from functools import reduce
+
+import numpy as np
+import pytest
+
+import charset
+
+ALPHABET = list("abcdefghijklmnopqrstuvwxyzAEIOUXYZ.,'-! éèçÉñß") + ["\U0001F600", "中"]
+
+
+def remove_vowels(word):
+    return re.sub("[aeiouAEIOU]", "", word)
+
+
+def reference_consonants(w1, w2):
+    # the Functions notebook's version
+    word = remove_vowels(w1) + remove_vowels(w2)
+    return "".join(sorted(set(word)))
+
+
+def random_words(seed, n):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(0, 12, n)
+    return ["".join(rng.choice(ALPHABET, length)) for length in lengths]
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("chunk_size", [1, 7, charset.CHUNK_SIZE])
+def test_matches_notebook_reduce(seed, chunk_size):
+    words = random_words(seed, 500)
+    assert charset.get_consonants(words, chunk_size=chunk_size) == reduce(reference_consonants, words)
+
+
+def test_process_pool_matches_serial():
+    words = random_words(3, 2000)
+    assert charset.get_consonants(words, workers=2, chunk_size=300) == reduce(reference_consonants, words)
+
+
+def test_reduce_edge_cases():
+    assert charset.get_consonants(["Aardvark"]) == "Aardvark"
+    assert charset.get_consonants(iter(["banana", "kiwi"])) == reduce(reference_consonants, ["banana", "kiwi"])
+    with pytest.raises(TypeError):
+        charset.get_consonants([])
+
+
+def test_unique_chars_with_other_exclude():
+    words = random_words(4, 300)
+    expected = "".join(sorted(set("".join(words)) - set("xyz ")))
+    assert charset.unique_chars(iter(words), exclude="xyz ", chunk_size=11) == expected
+    assert charset.unique_chars([]) == ""
+
+
+def test_masks_combine_with_or():
+    first, second = random_words(5, 50), random_words(6, 50)
+    mask = charset.char_mask(first) | charset.char_mask(second)
+    assert mask == charset.char_mask(first + second)
+    assert charset.mask_to_string(mask) == "".join(sorted(set(remove_vowels("".join(first + second)))))
+    assert charset.char_mask("hello", exclude="") == sum(1 << ord(c) for c in "helo")
+    assert charset.mask_to_string(0) == ""
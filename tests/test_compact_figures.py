@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import compact_figures
+from plotting import go
+
+
+@pytest.mark.parametrize("values, dtype", [([0, 100, -5], np.int8), ([0, 200], np.uint8), ([-1, 30000], np.int16),
+                                           ([0, 60000], np.uint16), ([-1, 2 ** 31 - 1], np.int32),
+                                           ([0, 2 ** 32 - 1], np.uint32), ([0, 2 ** 40], np.int64)])
+def test_compact_array_is_exact_and_narrowest(values, dtype):
+    arr = compact_figures.compact_array(values)
+    assert arr.dtype == dtype
+    assert arr.tolist() == values
+
+
+def test_compact_array_leaves_other_values_alone():
+    assert compact_figures.compact_array(["a", "b"]) == ["a", "b"]
+    assert compact_figures.compact_array(None) is None
+    assert compact_figures.compact_array([1.5, 2.5]).dtype == np.float64
+    assert compact_figures.compact_array([1.5, 2.5], float32=True).dtype == np.float32
+    assert compact_figures.compact_array(pd.Series([True, False])).dtype == bool
+
+
+def test_scatter_switches_to_webgl():
+    assert isinstance(compact_figures.scatter(list(range(10)), list(range(10))), go.Scatter)
+    trace = compact_figures.scatter(np.arange(5000), np.random.default_rng(0).random(5000), mode="markers")
+    assert isinstance(trace, go.Scattergl)
+    assert isinstance(compact_figures.scatter(np.arange(5000), np.arange(5000), gl_threshold=None), go.Scatter)
+
+
+def test_dedupe_text_round_trips():
+    rng = np.random.default_rng(0)
+    text = list(rng.choice(["Harvard", "MIT", "Stanford", None], 2000))
+    fig = go.Figure([compact_figures.scatter(np.arange(2000), rng.random(2000), text=text, mode="markers"),
+                     go.Scatter(x=[1, 2], y=[1, 2], text=["a", "b"])])
+    small = compact_figures.dedupe_text(fig)
+    trace = small.data[0]
+    labels, codes = trace.meta["hover_labels"], np.asarray(trace.customdata)
+    assert [labels[c] for c in codes] == text
+    assert trace.text is None
+    # unique text is left as it is, and the original figure is untouched
+    assert list(small.data[1].text) == ["a", "b"]
+    assert list(fig.data[0].text) == text
+    assert compact_figures.payload_size(small) < compact_figures.payload_size(fig)
+
+
+def test_exports_share_plotly_js(tmp_path):
+    figs = [go.Figure(go.Scatter(x=[1, 2], y=[3, 4], text=["x", "x"])) for _ in range(3)]
+    paths = compact_figures.export_batch(figs, str(tmp_path / "batch"), names=["a", "b", "c"])
+    assert [os.path.basename(p) for p in paths] == ["a.html", "b.html", "c.html"]
+    assert sorted(os.listdir(tmp_path / "batch")) == ["a.html", "b.html", "c.html", "plotly.min.js"]
+    page = compact_figures.export_page(figs, str(tmp_path / "page.html"))
+    with open(page, encoding="utf-8") as f:
+        html = f.read()
+    # plotly.js once, three plots
+    assert html.count("Plotly.newPlot") >= 3
+    assert os.path.getsize(page) < 2 * os.path.getsize(tmp_path / "batch" / "plotly.min.js")
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import csvcache
+
+
+@pytest.fixture
+def csv(tmp_path):
+    csvcache.invalidate()
+    csvcache.reset_stats()
+    path = tmp_path / "sample.csv"
+    pd.DataFrame({"a": [1, 2, 3], "b": [1.5, None, 3.5], "c": ["x", "y", None]}).to_csv(path, index=False)
+    yield str(path)
+    csvcache.invalidate()
+
+
+def test_hits_match_pandas(csv):
+    expected = pd.read_csv(csv)
+    pd.testing.assert_frame_equal(csvcache.read_csv(csv), expected)
+    pd.testing.assert_frame_equal(csvcache.read_csv(csv), expected)
+    assert csvcache.cache_info()["hits"] == 1 and csvcache.cache_info()["misses"] == 1
+
+
+def test_changes_to_a_result_never_reach_the_cache(csv):
+    first = csvcache.read_csv(csv)
+    first["a"] = 0
+    first.loc[0, "b"] = -1.0
+    first["new"] = 1
+    pd.testing.assert_frame_equal(csvcache.read_csv(csv), pd.read_csv(csv))
+
+
+@pytest.mark.parametrize("options", [{"dtype": np.dtype("float32"), "usecols": ["a", "b"]}, {"dtype": {"a": np.dtype("int32")}},
+                                     {"usecols": ["a", "c"]}, {"dtype": "float64", "usecols": ["a", "b"]}])
+def test_options_are_part_of_the_key(csv, options):
+    expected = pd.read_csv(csv, **options)
+    for _ in range(2):
+        pd.testing.assert_frame_equal(csvcache.read_csv(csv, **options), expected)
+    assert csvcache.cache_info()["hits"] == 1
+    assert csvcache.cache_info()["uncached"] == 0
+
+
+def test_rewritten_file_is_read_again(csv):
+    csvcache.read_csv(csv)
+    with open(csv, "a") as f:
+        f.write("4,4.5,z\n")
+    assert len(csvcache.read_csv(csv)) == 4
+    assert csvcache.cache_info()["frames"] == 1
+
+
+def test_uncached_calls(csv):
+    assert len(csvcache.read_csv("file://" + os.path.abspath(csv))) == 3
+    assert len(csvcache.read_csv(csv, converters={"a": lambda v: int(v) * 2})) == 3
+    assert csvcache._key("s3://bucket/key.csv", {}) is None
+    with pytest.raises(FileNotFoundError):
+        csvcache.read_csv(csv + ".missing")
+    assert csvcache.cache_info()["uncached"] == 3 and csvcache.cache_info()["frames"] == 0
+
+
+def test_budget_evicts(csv):
+    csvcache.read_csv(csv)
+    try:
+        csvcache.set_budget(0)
+        assert csvcache.cache_info()["frames"] == 0 and csvcache.cache_info()["evictions"] == 1
+    finally:
+        csvcache.set_budget(1 << 30)
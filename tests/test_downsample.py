@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import downsample
+
+
+def reference_lttb(x, y, n_out):
+    # Steinarsson's LTTB, one point at a time
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    keep = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start, end = int(math.floor(i * every)) + 1, int(math.floor((i + 1) * every)) + 1
+        next_start, next_end = end, min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+@pytest.mark.parametrize("n, n_out", [(100, 3), (100, 10), (1000, 37), (5000, 500)])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n + n_out)
+    x = np.sort(rng.random(n))
+    y = rng.standard_normal(n).cumsum()
+    keep = reference_lttb(x.tolist(), y.tolist(), n_out)
+    dx, dy = downsample.lttb(x, y, n_out)
+    assert dx.tolist() == x[keep].tolist()
+    assert dy.tolist() == y[keep].tolist()
+
+
+@pytest.mark.parametrize("n_out", [2, 3, 4, 5, 10, 101])
+def test_minmax_at_most_n_out_and_keeps_extremes(n_out):
+    rng = np.random.default_rng(n_out)
+    y = rng.standard_normal(1000)
+    dx, dy = downsample.minmax(None, y, n_out)
+    assert len(dx) <= n_out
+    assert dx[0] == 0 and dx[-1] == 999
+    if n_out >= 4:
+        assert dy.max() == y.max() and dy.min() == y.min()
+
+
+def test_too_few_points_raise():
+    y = np.arange(100.0)
+    with pytest.raises(ValueError):
+        downsample.lttb(None, y, 2)
+    with pytest.raises(ValueError):
+        downsample.minmax(None, y, 1)
+
+
+def test_short_series_passes_through():
+    dx, dy = downsample.lttb(None, [1.0, 2.0, 3.0], 10)
+    assert dy.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_datetime_x_keeps_dtype():
+    x = np.arange("2024-01-01", "2024-04-10", dtype="datetime64[D]").astype("datetime64[ns]")
+    y = np.sin(np.arange(len(x)))
+    dx, dy = downsample.downsample(x, y, n_out=20)
+    assert dx.dtype == x.dtype and len(dx) == 20
+    assert set(dx.tolist()) <= set(x.tolist())
+
+
+def test_tz_aware_x():
+    x = pd.date_range("2024-01-01", periods=500, freq="h", tz="Europe/Berlin")
+    y = np.cos(np.arange(500) / 7.0)
+    dx, dy = downsample.downsample(x, y, n_out=50)
+    assert isinstance(dx, pd.DatetimeIndex) and str(dx.tz) == "Europe/Berlin"
+    keep = reference_lttb(x.asi8.astype(float).tolist(), y.tolist(), 50)
+    assert dx.equals(x[keep])
+    dx, _ = downsample.downsample(pd.Series(x), y, n_out=50, method="minmax")
+    assert dx.tz is not None and len(dx) <= 50
+
+
+def test_cached_results_are_read_only():
+    downsample.clear_cache()
+    y = np.random.default_rng(0).random(1000)
+    dx, dy = downsample.downsample(None, y, n_out=50)
+    assert downsample.downsample(None, y, n_out=50)[1] is dy
+    with pytest.raises(ValueError):
+        dy[0] = 1.0
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import filter_expr
+from filter_expr import col
+
+
+@pytest.fixture(scope="module")
+def df():
+    rng = np.random.default_rng(0)
+    n = 5000
+    frame = pd.DataFrame({"Permit Type": rng.integers(1, 9, n),
+                          "Estimated Cost": np.where(rng.random(n) < 0.1, np.nan, rng.uniform(0, 10000, n)),
+                          "Street Name": rng.choice(["Ellis", "Market", "Mission", None], n),
+                          "kind": rng.choice(["demolitions", "otc", "new"], n)})
+    frame["objects"] = frame["Street Name"].astype(object)
+    return frame
+
+
+CASES = [
+    ('(df["Permit Type"] == 4) | (df["kind"] == "demolitions")',
+     lambda d: (d["Permit Type"] == 4) | (d["kind"] == "demolitions")),
+    ('`Permit Type` in [1, 4] and not `Street Name`.isna()',
+     lambda d: d["Permit Type"].isin([1, 4]) & ~d["Street Name"].isna()),
+    ('1000 <= `Estimated Cost` < 5000', lambda d: (d["Estimated Cost"] >= 1000) & (d["Estimated Cost"] < 5000)),
+    ('`Estimated Cost`.between(10, 20) | ~(`Permit Type` != 2)',
+     lambda d: d["Estimated Cost"].between(10, 20) | (d["Permit Type"] == 2)),
+    ('objects.isin(["Ellis"]) or `Estimated Cost`.isna()', lambda d: d["objects"].isin(["Ellis"]) | d["Estimated Cost"].isna()),
+    ('`Street Name` not in ["Market"]', lambda d: ~d["Street Name"].isin(["Market"])),
+]
+
+
+@pytest.mark.parametrize("text, mask", CASES)
+@pytest.mark.parametrize("workers, block_rows", [(1, 1 << 16), (4, 700)])
+def test_select_matches_boolean_masks(df, text, mask, workers, block_rows):
+    expected = df.loc[mask(df)]
+    pd.testing.assert_frame_equal(filter_expr.select(df, text, workers=workers, block_rows=block_rows), expected)
+
+
+def test_built_expressions(df):
+    expr = (col("Permit Type") == 4) & col("Street Name").isin(["Ellis", "Market"]) | col("Estimated Cost").isna()
+    expected = df.loc[((df["Permit Type"] == 4) & df["Street Name"].isin(["Ellis", "Market"])) | df["Estimated Cost"].isna()]
+    pd.testing.assert_frame_equal(filter_expr.select(df, expr), expected)
+    assert expr.columns() == {"Permit Type", "Street Name", "Estimated Cost"}
+
+
+def test_node_types():
+    a, b = col("a") == 1, col("b") == 2
+    assert not isinstance(a | b, filter_expr._And)
+    assert not isinstance(a & b, filter_expr._Or)
+    assert repr(a | b) == "(('a' == 1) | ('b' == 2))"
+    with pytest.raises(TypeError):
+        filter_expr.Expr()
+    with pytest.raises(TypeError):
+        filter_expr.compile_filter(42)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from frame_index import FrameIndex, Rows
+
+COLUMNS = ["type", "street", "score"]
+STREETS = ["Ellis", "Market", "Mission", None]
+
+
+def permits(seed, n=2000):
+    rng = np.random.default_rng(seed)
+    score = rng.integers(0, 50, n).astype(float)
+    score[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({"type": rng.integers(1, 9, n), "street": rng.choice(np.array(STREETS, dtype=object), n),
+                         "score": score, "other": rng.random(n)})
+
+
+def assert_rows(ix, rows, mask):
+    pd.testing.assert_frame_equal(ix.select(rows), ix.df.loc[mask])
+
+
+@pytest.fixture(params=["hash", "sorted"])
+def kind(request):
+    return request.param
+
+
+@pytest.mark.parametrize("value", [4, 4.0, 9, "4", np.nan, True])
+def test_eq_on_ints_matches_mask(kind, value):
+    df = permits(0)
+    ix = FrameIndex(df, COLUMNS, kind)
+    assert_rows(ix, ix.eq("type", value), df["type"] == value)
+
+
+@pytest.mark.parametrize("value", ["Ellis", "Nowhere", 4, None, np.nan])
+def test_eq_on_strings_matches_mask(kind, value):
+    df = permits(1)
+    ix = FrameIndex(df, COLUMNS, kind)
+    assert_rows(ix, ix.eq("street", value), df["street"] == value)
+
+
+@pytest.mark.parametrize("value", [True, False, 1, 0.0, 2, np.True_])
+def test_booleans_and_numbers_match_like_masks(kind, value):
+    df = pd.DataFrame({"flag": np.arange(20) % 3 == 0, "n": np.arange(20) % 3})
+    ix = FrameIndex(df, ["flag", "n"], kind)
+    assert_rows(ix, ix.eq("flag", value), df["flag"] == value)
+    assert_rows(ix, ix.eq("n", value), df["n"] == value)
+    assert_rows(ix, ix.isin("flag", [value]), df["flag"].isin([value]))
+    assert_rows(ix, ix.isin("n", [value]), df["n"].isin([value]))
+
+
+@pytest.mark.parametrize("values", [[1, 4], [], [4, "4"], [np.nan, 3.0], [9], [True]])
+def test_isin_matches_series_isin(kind, values):
+    df = permits(2)
+    ix = FrameIndex(df, COLUMNS, kind)
+    assert_rows(ix, ix.isin("score", values), df["score"].isin(values))
+    assert_rows(ix, ix.isin("type", values), df["type"].isin(values))
+    assert_rows(ix, ix.isin("street", ["Ellis", None]), df["street"].isin(["Ellis", None]))
+
+
+def test_combinations_match_masks(kind):
+    df = permits(3)
+    ix = FrameIndex(df, COLUMNS, kind)
+    type4, ellis = df["type"] == 4, df["street"] == "Ellis"
+    assert_rows(ix, ix.eq("type", 4) & ix.eq("street", "Ellis"), type4 & ellis)
+    assert_rows(ix, ix.eq("type", 4) | ix.eq("street", "Ellis"), type4 | ellis)
+    assert_rows(ix, ix.isin("type", range(1, 8)) | ix.eq("street", "Ellis"), df["type"].isin(range(1, 8)) | ellis)
+    assert_rows(ix, ~ix.eq("type", 4), ~type4)
+    assert_rows(ix, ix.where({"type": 4, "street": ("Ellis", "Market")}), type4 & df["street"].isin(["Ellis", "Market"]))
+    assert_rows(ix, ix.where({}), df["type"] == df["type"])
+    assert len(ix.eq("type", 4)) == type4.sum()
+    assert repr(ix.eq("type", 4)) == "Rows(" + str(type4.sum()) + " of " + str(len(df)) + ")"
+
+
+@pytest.mark.parametrize("low, high", [(10, 20), (None, 5), (45, None), (30, 10), (None, None), (2.5, 7.5)])
+def test_between_matches_series_between(low, high):
+    df = permits(4)
+    ix = FrameIndex(df, COLUMNS, "sorted")
+    lo = -np.inf if low is None else low
+    hi = np.inf if high is None else high
+    assert_rows(ix, ix.between("score", low, high), df["score"].between(lo, hi))
+    assert_rows(ix, ix.between("type", low, high), df["type"].between(lo, hi))
+
+
+def test_between_errors():
+    df = permits(5)
+    ix = FrameIndex(df, COLUMNS, {"type": "hash", "score": "sorted"})
+    assert ix.kinds == {"type": "hash", "street": "hash", "score": "sorted"}
+    with pytest.raises(TypeError):
+        ix.between("type", 1, 3)
+    with pytest.raises(TypeError):
+        ix.between("score", "a", "b")
+    with pytest.raises(KeyError):
+        ix.eq("other", 1)
+    with pytest.raises(ValueError):
+        FrameIndex(df, COLUMNS, "btree")
+
+
+def test_follows_writes_to_the_frame(kind):
+    df = permits(6)
+    ix = FrameIndex(df, COLUMNS, kind)
+    rng = np.random.default_rng(6)
+    for step in range(40):
+        row = int(rng.integers(len(df)))
+        if step % 3 == 0:
+            df.loc[row, "type"] = int(rng.integers(1, 9))
+        elif step % 3 == 1:
+            df.loc[df["type"] == step % 8, "street"] = "Ellis"
+        else:
+            # a write to a column that isn't indexed
+            df.loc[row, "other"] = -1.0
+        assert_rows(ix, ix.eq("type", 4) & ix.eq("street", "Ellis"), (df["type"] == 4) & (df["street"] == "Ellis"))
+    df.sort_values("other", inplace=True)
+    assert_rows(ix, ix.eq("type", 2), df["type"] == 2)
+
+
+def test_unchanged_columns_are_not_rebuilt():
+    df = permits(7)
+    ix = FrameIndex(df, COLUMNS)
+    assert ix.builds == 3
+    ix.eq("type", 1)
+    df.loc[0, "other"] = 5.0
+    ix.eq("type", 1)
+    ix.eq("street", "Ellis")
+    assert ix.builds == 3
+    df.loc[0, "type"] = 99
+    assert len(ix.eq("type", 99)) == 1
+    assert ix.builds == 4
+
+
+def test_rows_set_operations():
+    a, b = Rows(np.array([1, 3, 5]), 8), Rows(np.array([0, 3, 4, 5, 7]), 8)
+    assert (a & b).positions.tolist() == [3, 5]
+    assert (a | b).positions.tolist() == [0, 1, 3, 4, 5, 7]
+    assert (~a).positions.tolist() == [0, 2, 4, 6, 7]
+    assert (a & Rows(np.array([], dtype=np.intp), 8)).positions.tolist() == []
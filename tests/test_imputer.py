@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from imputer import Imputer
+
+POLICY = {"stories": "mean",
+          "units": "median",
+          "zipcode": "mode",
+          "suffix": ("constant", "None"),
+          "cost": ("group_mean", "permit"),
+          "fee": ("group_mean", "permit"),
+          "area": ("group_mean", "street")}
+
+
+def permits(seed, n=3000):
+    rng = np.random.default_rng(seed)
+
+    def holes(values, share):
+        values = pd.Series(values)
+        return values.mask(rng.random(n) < share)
+
+    permit = holes(rng.integers(1, 9, n).astype(float), 0.05)
+    cost = holes(rng.gamma(2, 1000, n) * permit.fillna(1), 0.3)
+    # permit type 8 never has a fee, so its group has no mean
+    fee = holes(rng.normal(100, 10, n), 0.2).mask(permit == 8)
+    return pd.DataFrame({"stories": holes(rng.integers(1, 40, n), 0.2),
+                         "units": holes(rng.integers(0, 300, n), 0.25),
+                         "zipcode": holes(rng.choice([94102, 94103, 94110, 94133], n), 0.1),
+                         "suffix": holes(rng.choice(["A", "B"], n).astype(object), 0.9),
+                         "permit": permit,
+                         "street": holes(rng.choice(["Ellis", "Market", "Mission"], n), 0.1),
+                         "cost": cost,
+                         "fee": fee,
+                         "area": holes(rng.random(n) * 100, 0.4),
+                         "full": rng.random(n)})
+
+
+def reference(df, decimals=None):
+    # the per-column pandas calls
+    decimals = decimals or {}
+    out = df.copy()
+    mean = df["stories"].mean()
+    out["stories"] = df["stories"].fillna(round(mean, decimals["stories"]) if "stories" in decimals else mean)
+    out["units"] = df["units"].fillna(df["units"].median())
+    out["zipcode"] = df["zipcode"].fillna(df["zipcode"].mode()[0])
+    out["suffix"] = df["suffix"].fillna("None")
+    for column, key in [("cost", "permit"), ("fee", "permit"), ("area", "street")]:
+        group = df.groupby(key)[column].transform("mean")
+        out[column] = df[column].fillna(group).fillna(df[column].mean())
+    return out
+
+
+def check(result, expected):
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-12)
+
+
+def test_whole_frame_matches_pandas():
+    df = permits(0)
+    check(Imputer(POLICY).fit_transform(df), reference(df))
+
+
+@pytest.mark.parametrize("chunksize", [200, 317, 5000])
+def test_chunked_fit_matches_pandas(chunksize):
+    df = permits(1)
+    chunks = [df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize)]
+    imp = Imputer(POLICY).fit(iter(chunks))
+    assert imp.rows == len(df)
+    check(imp.transform(df), reference(df))
+    check(pd.concat(imp.transform(chunks)), reference(df))
+
+
+def test_merged_fits_match_pandas():
+    df = permits(2)
+    imp = Imputer(POLICY).fit(df.iloc[:1000])
+    imp.merge(Imputer(POLICY).fit(df.iloc[1000:2500])).merge(Imputer(POLICY).fit(df.iloc[2500:]))
+    check(imp.transform(df), reference(df))
+    with pytest.raises(ValueError):
+        imp.merge(Imputer({"stories": "median"}))
+
+
+def test_saved_statistics_fill_new_batches(tmp_path):
+    df = permits(3)
+    fitted = Imputer(POLICY, decimals={"stories": 0}).fit(df)
+    path = str(tmp_path / "imputer.json")
+    fitted.save(path)
+    loaded = Imputer.load(path)
+    check(loaded.transform(df), reference(df, {"stories": 0}))
+    # a reloaded imputer keeps fitting where it stopped
+    more = permits(4)
+    loaded.partial_fit(more)
+    fitted.partial_fit(more)
+    both = pd.concat([df, more], ignore_index=True)
+    check(loaded.transform(both), fitted.transform(both))
+    check(loaded.transform(both), reference(both, {"stories": 0}))
+
+
+def test_decimals_round_means():
+    df = pd.DataFrame({"a": [1.0, 2.0, np.nan, 2.0], "b": [1.0, 1.0, 2.0, np.nan], "k": [1, 1, 1, 1]})
+    imp = Imputer({"a": "mean", "b": ("group_mean", "k")}, decimals={"a": 0, "b": 2}).fit(df)
+    assert imp.statistics()["a"] == 2
+    key, means, overall = imp.statistics()["b"]
+    assert key == "k" and means.tolist() == [1.33] and overall == 1.33
+
+
+def test_mode_is_smallest_most_frequent_value():
+    df = pd.DataFrame({"a": [3, 1, 3, 1, np.nan, 2], "s": ["y", "x", "y", "x", None, "z"]})
+    imp = Imputer({"a": "mode", "s": "mode"}).fit(df)
+    assert imp.statistics() == {"a": df["a"].mode()[0], "s": df["s"].mode()[0]}
+
+
+def test_untouched_columns_are_shared():
+    df = permits(5)
+    result = Imputer({"full": "mean", "stories": "mean"}).fit_transform(df)
+    assert np.shares_memory(result["full"].to_numpy(), df["full"].to_numpy())
+    no_gaps = df.dropna(subset=["stories"])
+    assert Imputer({"stories": "mean"}).fit_transform(no_gaps) is no_gaps
+
+
+def test_nothing_to_compute_from_leaves_gaps():
+    df = pd.DataFrame({"a": [np.nan, np.nan], "b": [np.nan, np.nan], "k": [1, 2]})
+    imp = Imputer({"a": "median", "b": ("group_mean", "k")})
+    result = imp.fit_transform(df)
+    assert result.isna().sum().tolist() == [2, 2, 0]
+
+
+def test_invalid_policies():
+    with pytest.raises(ValueError):
+        Imputer({"a": "max"})
+    with pytest.raises(ValueError):
+        Imputer({"a": ("mean", 3)})
@@ -0,0 +1,54 @@
+import io
+import itertools
+
+import numpy as np
+import pytest
+
+from matrix import Matrix
+
+NESTED = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]]
+SLICES = [slice(None), slice(1, None), slice(None, None, -1), slice(None, 1, -1), slice(0, 3, 2), slice(-2, None)]
+
+
+def test_item_access_matches_lists():
+    m = Matrix.from_lists(NESTED)
+    for i, j in itertools.product(range(-3, 3), range(-4, 4)):
+        assert m[i, j] == NESTED[i][j]
+        assert m[np.int64(i), np.int32(j)] == NESTED[i][j]
+    with pytest.raises(IndexError):
+        m[3, 0]
+    with pytest.raises(TypeError):
+        m[1.0, 0]
+
+
+@pytest.mark.parametrize("rows, cols", list(itertools.product(SLICES, SLICES)))
+def test_views_rows_and_columns_match_numpy(rows, cols):
+    expected = np.array(NESTED)[rows, cols]
+    view = Matrix.from_lists(NESTED)[rows, cols]
+    assert view.tolist() == expected.tolist()
+    for i in range(view.rows):
+        assert list(view.row(i)) == expected[i].tolist()
+        assert list(view.row(np.int64(i))) == expected[i].tolist()
+    for j in range(view.cols):
+        assert list(view.col(j)) == expected[:, j].tolist()
+
+
+def test_views_share_the_buffer():
+    m = Matrix.from_lists(NESTED)
+    m[np.int64(1), ::-1][0, 0] = 80
+    m[:, 0] = [0, 0, 0]
+    assert m.tolist() == [[0, 2, 3, 4], [0, 6, 7, 80], [0, 10, 11, 12]]
+
+
+def test_from_lists_and_numpy():
+    assert Matrix.from_lists([[np.int64(1), 2]]).typecode == "q"
+    assert Matrix.from_lists([[1.5, 2]]).typecode == "d"
+    arr = np.arange(12.0).reshape(3, 4)[::2, 1:]
+    assert Matrix.from_numpy(arr).tolist() == arr.tolist()
+
+
+def test_write_matches_str_join():
+    m = Matrix.from_lists(NESTED)
+    out = io.StringIO()
+    m.write(out)
+    assert out.getvalue().rstrip("\n") == "\n".join(" ".join(str(v) for v in r) for r in NESTED)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import multireplace
+
+
+def reference(text, mapping):
+    # leftmost match, longest pattern first among matches at the same position, no rescanning
+    out, i = [], 0
+    patterns = sorted(mapping, key=len, reverse=True)
+    while i < len(text):
+        hit = next((p for p in patterns if text.startswith(p, i)), None)
+        if hit is None:
+            out.append(text[i])
+            i += 1
+        else:
+            out.append(mapping[hit])
+            i += len(hit)
+    return "".join(out)
+
+
+@pytest.mark.parametrize("mapping", [{"or": "XX", " ": "..."}, {"a": "b", "b": "a"}, {"ab": "1", "abc": "2", "c": "3"},
+                                     {"\x00": "nul", "x": "\x00"}])
+def test_substring_replace_matches_reference(mapping):
+    rng = np.random.default_rng(len(mapping))
+    texts = ["".join(rng.choice(list("abcor x\x00"), rng.integers(0, 30))) for _ in range(200)]
+    expected = [reference(t, mapping) for t in texts]
+    assert multireplace.replace(texts, mapping) == expected
+    assert [multireplace.replace(t, mapping) for t in texts] == expected
+    assert multireplace.replace(pd.Series(texts, dtype=object), mapping).tolist() == expected
+
+
+@pytest.mark.parametrize("values, mapping", [
+    ([1, 2, 3, 1], {1: 10}),
+    ([1, 2, 3, 1], {1: 1.5}),
+    ([1.5, None, 2.0], {1.5: 2}),
+    (["asia", "europe", None, "asia"], {"asia": "Asia"}),
+    (["asia", "europe"], {"asia": 1}),
+])
+def test_whole_replace_matches_series_replace(values, mapping):
+    s = pd.Series(values, name="c")
+    pd.testing.assert_series_equal(multireplace.replace(s, mapping, whole=True), s.replace(mapping))
+
+
+def test_whole_replace_keeps_numpy_dtypes():
+    assert multireplace.replace(np.array([1, 2, 1]), {1: 10}, whole=True).dtype == np.int64
+    assert multireplace.replace(np.array([1.5, 2.0]), {1.5: 3.0}, whole=True).dtype == np.float64
+    assert multireplace.replace(np.array(["ab", "cd"]), {"ab": "abcdef"}, whole=True).tolist() == ["abcdef", "cd"]
+    assert multireplace.replace(pd.Index([1, 2]), {1: 10}, whole=True).equals(pd.Index([10, 2]))
+
+
+def test_whole_replace_on_categoricals():
+    s = pd.Series(["a", "b", None, "a"], dtype="category")
+    result = multireplace.replace(s, {"a": "A"}, whole=True)
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    # pandas 3 refuses new categories in Series.replace, the values are compared with the object column's
+    assert result.astype(object).tolist() == s.astype(object).replace({"a": "A"}).tolist()
+    merged = multireplace.replace(s, {"a": "b"}, whole=True)
+    assert merged.cat.categories.tolist() == ["b"] and merged.isna().tolist() == [False, False, True, False]
+
+
+def test_cache_reuses_compiled_replacers():
+    multireplace.clear_cache()
+    assert multireplace.replacer({"a": "b"}) is multireplace.replacer({"a": "b"})
@@ -0,0 +1,80 @@
+import operator
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
+import pytest
+
+import parallel
+
+
+def add_com(word, n):
+    return str(n) + ". " + word + ".com"
+
+
+def is_even(n):
+    return n % 2 == 0
+
+
+@pytest.fixture
+def always_parallel(monkeypatch):
+    # the timing probe would keep these tiny jobs serial
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_SECONDS", 0)
+
+
+@pytest.mark.parametrize("executor", ["process", "thread", "auto"])
+def test_pmap_matches_map(always_parallel, executor):
+    words = ["w" + str(i) for i in range(1000)]
+    expected = list(map(add_com, words, range(1, 801)))
+    assert parallel.pmap(add_com, words, range(1, 801), workers=2, executor=executor, threshold=0) == expected
+
+
+def test_lambdas_fall_back_to_threads(always_parallel):
+    result = parallel.pmap(lambda x: x * x, range(500), workers=2, threshold=0, chunk_size=33)
+    assert result == [x * x for x in range(500)]
+    with pytest.raises(ValueError):
+        parallel.pmap(lambda x: x, range(500), workers=2, executor="fork", threshold=0)
+
+
+def test_reuses_given_executor(always_parallel):
+    with ThreadPoolExecutor(2) as pool:
+        assert parallel.pmap(str, range(300), executor=pool, workers=2, threshold=0, chunk_size=10) == \
+            list(map(str, range(300)))
+        # still usable afterwards
+        assert pool.submit(len, "abc").result() == 3
+
+
+@pytest.mark.parametrize("func", [is_even, None])
+def test_pfilter_matches_filter(always_parallel, func):
+    items = [i % 7 for i in range(2000)]
+    assert parallel.pfilter(func, items, workers=2, threshold=0) == list(filter(func, items))
+
+
+def test_serial_paths_match_builtins():
+    items = list(range(20000))
+    assert parallel.pmap(is_even, items) == list(map(is_even, items))
+    assert parallel.pfilter(is_even, iter(items), workers=1) == list(filter(is_even, items))
+    assert parallel.preduce(operator.add, items) == sum(items)
+    assert parallel.pfilter(is_even, []) == []
+    assert parallel.pmap(is_even, []) == []
+
+
+@pytest.mark.parametrize("n", [1, 5, parallel.PROBE_SIZE, parallel.PROBE_SIZE + 1, 3000])
+def test_preduce_keeps_order(always_parallel, n):
+    words = ["w" + str(i) for i in range(n)]
+    expected = reduce(lambda a, b: a + " " + b, words)
+    assert parallel.preduce(lambda a, b: a + " " + b, words, workers=2, threshold=0, chunk_size=50) == expected
+
+
+@pytest.mark.parametrize("n", [parallel.PROBE_SIZE - 1, parallel.PROBE_SIZE, 500])
+def test_preduce_with_small_threshold(n):
+    items = list(range(n))
+    assert parallel.preduce(operator.add, items, workers=2, threshold=0) == sum(items)
+
+
+def test_preduce_initial_and_empty():
+    assert parallel.preduce(operator.add, [], initial=5) == 5
+    assert parallel.preduce(operator.add, range(10), initial=100) == reduce(operator.add, range(10), 100)
+    with pytest.raises(TypeError):
+        parallel.preduce(operator.add, [])
+    with pytest.raises(TypeError):
+        parallel.pmap(str)
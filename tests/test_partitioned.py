@@ -0,0 +1,136 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import partitioned
+from partitioned import PartitionedStore
+
+TIMES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "input", "timesData.csv")
+
+CONDITIONS = [
+    ([("teaching", ">", 90)], lambda df: df["teaching"] > 90),
+    ([("teaching", ">=", 99.7), ("year", "<", 2014)], lambda df: (df["teaching"] >= 99.7) & (df["year"] < 2014)),
+    ([("country", "==", "Germany")], lambda df: df["country"] == "Germany"),
+    ([("country", "in", ["Japan", "China", None])], lambda df: df["country"].isin(["Japan", "China"])),
+    ([("student_staff_ratio", "between", (5, 10))], lambda df: df["student_staff_ratio"].between(5, 10)),
+    ([("student_staff_ratio", "<=", 3)], lambda df: df["student_staff_ratio"] <= 3),
+    ([("research", "<", -1)], lambda df: df["research"] < -1),
+    ([("female_male_ratio", "==", "50 : 50")], lambda df: df["female_male_ratio"] == "50 : 50"),
+]
+
+
+@pytest.fixture(scope="module")
+def times():
+    return pd.read_csv(TIMES)
+
+
+@pytest.fixture
+def store(tmp_path, times):
+    store = PartitionedStore(str(tmp_path / "times"), partition="year")
+    store.append(times)
+    return store
+
+
+def test_read_partitions_matches_filter(store, times):
+    assert store.partitions() == sorted(times["year"].unique().tolist())
+    pd.testing.assert_frame_equal(store.read(2014), times[times.year == 2014])
+    pd.testing.assert_frame_equal(store.read([2012, 2011]), times[times.year.isin([2011, 2012])])
+    pd.testing.assert_frame_equal(store.read(), times)
+    pd.testing.assert_series_equal(store.read(2011, columns=["student_staff_ratio"])["student_staff_ratio"],
+                                   times.student_staff_ratio[times.year == 2011])
+
+
+@pytest.mark.parametrize("where, mask", CONDITIONS)
+def test_where_matches_filter(store, times, where, mask):
+    expected = times[mask(times)]
+    result = store.read(where=where)
+    # a filter that happens to keep rows 0..n-1 gives a RangeIndex, the store an Index of the same labels
+    pd.testing.assert_frame_equal(result, expected, check_index_type=False)
+    # every partition that was skipped really has no matching row
+    kept = {entry["value"] for entry in store.prune(where=where)}
+    assert set(expected["year"]) <= kept
+
+
+def test_pruning_skips_partitions_on_statistics(store, times):
+    best = times.groupby("year")["teaching"].max()
+    kept = [entry["value"] for entry in store.prune(where=[("teaching", ">", 95)])]
+    assert kept == best[best > 95].index.tolist()
+    assert store.prune(2014, where=[("research", "<", -1)]) == []
+    stats = store.stats()
+    assert stats.loc[(2012, "teaching"), "max"] == best[2012]
+    assert stats.loc[(2012, "teaching"), "rows"] == (times.year == 2012).sum()
+    assert stats.loc[(2012, "female_male_ratio"), "nulls"] == times.female_male_ratio[times.year == 2012].isna().sum()
+
+
+def test_empty_read_keeps_columns_and_dtypes(store, times):
+    result = store.read(1999)
+    pd.testing.assert_frame_equal(result, times.iloc[:0], check_index_type=False)
+    assert list(store.read(1999, columns=["teaching"]).columns) == ["teaching"]
+
+
+def test_append_new_years_leaves_old_files(store, times):
+    before = {entry["value"]: list(entry["files"]) for entry in store.manifest["partitions"].values()}
+    extra = times[times.year == 2016].assign(year=2017)
+    extra.index = extra.index + len(times)
+    assert store.append(extra) == [2017]
+    for value, files in before.items():
+        assert store.manifest["partitions"][str(value)]["files"] == files
+    reopened = PartitionedStore(store.root, "year")
+    pd.testing.assert_frame_equal(reopened.read(2017), extra)
+    pd.testing.assert_frame_equal(reopened.read(), pd.concat([times, extra]))
+
+
+def test_append_modes(store, times):
+    rows = times[times.year == 2011]
+    store.append(rows)
+    pd.testing.assert_frame_equal(store.read(2011), pd.concat([rows, rows]))
+    store.append(rows.iloc[:5], mode="replace")
+    pd.testing.assert_frame_equal(store.read(2011), rows.iloc[:5])
+    with pytest.raises(ValueError):
+        store.append(rows, mode="error")
+    with pytest.raises(ValueError):
+        store.append(rows, mode="upsert")
+    with pytest.raises(ValueError):
+        store.append(rows.drop(columns="country"))
+    with pytest.raises(KeyError):
+        PartitionedStore(store.root + "2", "year").append(rows.drop(columns="year"))
+    with pytest.raises(ValueError):
+        PartitionedStore(store.root, "country")
+
+
+@pytest.mark.parametrize("chunksize", [None, 300])
+def test_from_csv_matches_whole_frame(tmp_path, times, chunksize):
+    # a chunk can't guess that world_rank ("1", ..., "201-225") is text, so the dtypes are given
+    dtypes = {c: "str" for c in times.columns if times[c].dtype == "str"}
+    store = partitioned.from_csv(TIMES, str(tmp_path / "store"), chunksize=chunksize, dtype=dtypes)
+    pd.testing.assert_frame_equal(store.read(), times)
+    pd.testing.assert_frame_equal(store.read(where=[("teaching", ">", 90)]), times[times.teaching > 90])
+
+
+def test_missing_partition_values_rejected(tmp_path):
+    df = pd.DataFrame({"year": [2011.0, np.nan], "x": [1, 2]})
+    with pytest.raises(ValueError):
+        PartitionedStore(str(tmp_path / "s")).append(df)
+
+
+def test_unsupported_operator(store):
+    with pytest.raises(ValueError):
+        store.read(where=[("teaching", "!=", 3)])
+    with pytest.raises(ValueError):
+        store.prune(where=[("teaching", "like", 3)])
+
+
+def test_later_appends_get_the_first_dtypes(tmp_path):
+    store = PartitionedStore(str(tmp_path / "s"))
+    store.append(pd.DataFrame({"year": [2011, 2011], "ratio": ["37 : 63", None]}))
+    # what read_csv gives for a chunk where the text column is empty
+    store.append(pd.DataFrame({"year": [2012], "ratio": [np.nan]}, index=[2]))
+    result = store.read()
+    assert result["ratio"].dtype == "str"
+    assert result["ratio"].isna().tolist() == [False, True, True]
+    with pytest.raises(ValueError):
+        store.append(pd.DataFrame({"year": ["x"], "ratio": ["1 : 1"]}))
@@ -0,0 +1,90 @@
+import itertools
+import operator
+from functools import reduce
+
+import pytest
+
+from pipeline import Pipeline
+
+NUMBERS = ["1", "2", "3", "4", "5", "6", "0", "12"]
+
+
+def is_even(n):
+    return n % 2 == 0
+
+
+def test_matches_eager_builtins():
+    expected = list(filter(is_even, list(map(lambda n: int(n), NUMBERS))))
+    assert Pipeline(NUMBERS).map(int).filter(is_even).to_list() == expected
+
+    chain = Pipeline(range(1000)).map(lambda x: x * 3).filter(is_even).map(str).filter(lambda s: "1" in s)
+    eager = list(filter(lambda s: "1" in s, map(str, filter(is_even, map(lambda x: x * 3, range(1000))))))
+    assert chain.to_list() == eager
+    assert chain.count() == len(eager)
+    assert chain.reduce(operator.add) == reduce(operator.add, eager)
+    assert chain.reduce(operator.add, "x") == reduce(operator.add, eager, "x")
+    assert Pipeline(range(100)).filter(is_even).sum() == sum(range(0, 100, 2))
+    assert Pipeline(range(10)).sum(5) == 50
+
+
+def test_single_stage_and_no_stage():
+    assert Pipeline(NUMBERS).map(int).to_list() == list(map(int, NUMBERS))
+    assert Pipeline([0, 1, "", "a", None, 2]).filter().to_list() == [1, "a", 2]
+    assert Pipeline(NUMBERS).to_list() == NUMBERS
+
+
+def test_nothing_runs_before_a_terminal_operation():
+    calls = []
+    chain = Pipeline(range(5)).map(lambda x: calls.append(x) or x)
+    assert calls == []
+    chain.first()
+    assert calls == [0]
+
+
+def test_items_pass_through_every_stage_one_at_a_time():
+    log = []
+    chain = Pipeline(range(3)).map(lambda x: log.append(("a", x)) or x).filter(lambda x: log.append(("f", x)) or True) \
+        .map(lambda x: log.append(("b", x)) or x)
+    chain.to_list()
+    assert log == [(s, x) for x in range(3) for s in "afb"]
+
+
+def test_works_on_infinite_sources():
+    squares = Pipeline(itertools.count()).map(lambda x: x * x).filter(lambda x: x > 50)
+    assert squares.first() == 64
+
+
+def test_first_default_and_empty():
+    assert Pipeline([1, 3]).filter(is_even).first(None) is None
+    with pytest.raises(ValueError):
+        Pipeline([]).first()
+    with pytest.raises(TypeError):
+        Pipeline([]).reduce(operator.add)
+
+
+def test_chaining_leaves_the_original_unchanged():
+    base = Pipeline(range(10)).map(lambda x: x + 1)
+    evens = base.filter(is_even)
+    assert base.to_list() == list(range(1, 11))
+    assert evens.to_list() == [2, 4, 6, 8, 10]
+
+
+def test_iterator_source_is_consumed_once():
+    chain = Pipeline(iter(range(4))).map(str)
+    assert chain.to_list() == ["0", "1", "2", "3"]
+    assert chain.to_list() == []
+
+
+def test_batch():
+    batches = Pipeline(range(10)).filter(is_even).batch(2).map(sum).to_list()
+    assert batches == [2, 10, 8]
+    assert Pipeline(range(7)).batch(3).to_list() == [[0, 1, 2], [3, 4, 5], [6]]
+    assert Pipeline(range(7)).batch(3).batch(2).to_list() == [[[0, 1, 2], [3, 4, 5]], [[6]]]
+    with pytest.raises(ValueError):
+        Pipeline(range(3)).batch(0)
+
+
+def test_for_each():
+    seen = []
+    assert Pipeline("abc").map(str.upper).for_each(seen.append) is None
+    assert seen == ["A", "B", "C"]
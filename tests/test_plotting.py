@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import plotting
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_MODULES = ["matplotlib", "plotly"]
+
+
+def fresh(code):
+    # runs code in a new interpreter and returns what it printed as JSON
+    script = "import json, sys; sys.path.insert(0, " + repr(ROOT) + ")\n" + code
+    env = dict(os.environ, MPLBACKEND="Agg")
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True, env=env).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def test_importing_the_facade_loads_no_backend():
+    loaded = fresh("import plotting\n"
+                   "print(json.dumps([m for m in " + repr(BACKEND_MODULES) + " if m in sys.modules]))")
+    assert loaded == []
+
+
+@pytest.mark.parametrize("module", ["compact_figures", "batch_render"])
+def test_modules_using_the_facade_load_no_backend(module):
+    loaded = fresh("import " + module + "\n"
+                   "print(json.dumps([m for m in " + repr(BACKEND_MODULES) + " if m in sys.modules]))")
+    assert loaded == []
+
+
+def test_first_use_imports_the_module():
+    result = fresh("from plotting import plt, px, is_loaded, import_report\n"
+                   "before = [is_loaded('plt'), is_loaded(px)]\n"
+                   "fig = plt.figure()\n"
+                   "print(json.dumps([before, is_loaded('plt'), is_loaded('px'), list(import_report()),"
+                   " type(fig).__name__, repr(plt)]))")
+    before, plt_loaded, px_loaded, report, figure, text = result
+    assert before == [False, False]
+    assert plt_loaded and not px_loaded
+    assert report == ["matplotlib.pyplot"]
+    assert figure == "Figure"
+    assert text == "<lazy module 'matplotlib.pyplot' (loaded)>"
+
+
+def test_proxy_forwards_to_the_module():
+    json_module = plotting.lazy("json")
+    assert repr(json_module).endswith("(not loaded)>")
+    assert json_module.dumps([1]) == "[1]"
+    assert json_module.loads is json.loads
+    assert "dumps" in dir(json_module)
+    # modules already imported elsewhere cost nothing
+    assert plotting.import_report()["json"] == 0.0
+    assert plotting.is_loaded(json_module) and plotting.is_loaded("json")
+
+    target = plotting.lazy("plotting")
+    target.SOME_FLAG = 1
+    try:
+        assert plotting.SOME_FLAG == 1
+    finally:
+        del plotting.SOME_FLAG
+
+
+def test_missing_module_fails_on_first_use_only():
+    missing = plotting.lazy("no_such_module_here")
+    with pytest.raises(ImportError):
+        missing.anything
+    assert "no_such_module_here" not in plotting.import_report()
+
+
+def test_startup_report_times_fresh_imports():
+    report = plotting.startup_report(modules=("plotting", "json"), repeat=1)
+    assert list(report) == ["plotting", "json"]
+    assert all(0 <= seconds < 10 for seconds in report.values())
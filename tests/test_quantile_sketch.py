@@ -0,0 +1,107 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import cbook
+
+import quantile_sketch
+
+QS = np.linspace(0.001, 0.999, 999)
+
+
+def rank_error(sk, data):
+    # worst distance between the asked quantile and the share of the data at or below the answer
+    ordered = np.sort(data)
+    ranks = np.searchsorted(ordered, sk.quantile(QS), side="right") / len(ordered)
+    return np.abs(ranks - QS).max()
+
+
+@pytest.mark.parametrize("k, bound", [(200, 0.013), (400, 0.007)])
+def test_rank_error_within_documented_bound(k, bound):
+    data = np.random.default_rng(0).standard_normal(10 ** 6)
+    sk = quantile_sketch.sketch(np.array_split(data, 10), k=k, seed=1)
+    assert not sk.is_exact()
+    assert sk.n == len(data)
+    assert rank_error(sk, data) <= bound
+
+
+def test_merged_sketches_stay_accurate():
+    rng = np.random.default_rng(2)
+    parts = [rng.standard_normal(200000) + shift for shift in (0, 1, 3)]
+    merged = quantile_sketch.sketch(parts[0], seed=0)
+    for i, part in enumerate(parts[1:]):
+        merged.merge(quantile_sketch.sketch(part, seed=i + 1))
+    data = np.concatenate(parts)
+    assert merged.n == len(data)
+    assert merged.total == pytest.approx(data.sum())
+    assert (merged.min, merged.max) == (data.min(), data.max())
+    np.testing.assert_array_equal(merged.low, np.sort(data)[:merged.tail])
+    np.testing.assert_array_equal(merged.high, np.sort(data)[-merged.tail:])
+    assert rank_error(merged, data) <= 0.013
+
+
+def test_weights_add_up_to_count():
+    sk = quantile_sketch.sketch(np.random.default_rng(3).random(123457), seed=0)
+    values, weights = sk.items()
+    assert weights.sum() == sk.n
+    assert (np.diff(values) >= 0).all()
+
+
+def test_small_input_is_exact():
+    data = np.random.default_rng(4).standard_normal(150)
+    sk = quantile_sketch.sketch(list(data))
+    assert sk.is_exact()
+    np.testing.assert_array_equal(sk.quantile(QS), np.percentile(data, QS * 100))
+    assert sk.quantile(0.5) == np.median(data)
+
+
+def test_nan_ignored_and_chunks_accepted():
+    sk = quantile_sketch.sketch([pd.Series([1.0, np.nan, 3.0]), np.array([2.0, np.nan])])
+    assert sk.n == 3
+    assert sk.quantile(0.5) == 2.0
+
+
+def test_empty_sketch_and_small_k():
+    with pytest.raises(ValueError):
+        quantile_sketch.KLLSketch().quantile(0.5)
+    with pytest.raises(ValueError):
+        quantile_sketch.KLLSketch(k=4)
+
+
+@pytest.mark.parametrize("whis", [1.5, 0.5, (5, 95)])
+def test_boxplot_stats_match_matplotlib_on_exact_data(whis):
+    rng = np.random.default_rng(5)
+    data = np.concatenate((rng.standard_normal(150), [8.0, 9.5, -7.0]))
+    expected = cbook.boxplot_stats(data, whis=whis, labels=["x"])[0]
+    result = quantile_sketch.boxplot_stats(quantile_sketch.sketch(data), whis=whis, label="x")
+    assert set(result) == set(expected)
+    for key in ["mean", "iqr", "cilo", "cihi", "whishi", "whislo", "q1", "med", "q3"]:
+        assert result[key] == pytest.approx(expected[key], rel=1e-12), key
+    np.testing.assert_array_equal(result["fliers"], np.sort(expected["fliers"]))
+    assert result["label"] == "x"
+
+
+def test_boxplot_stats_on_large_data_close_to_matplotlib():
+    rng = np.random.default_rng(6)
+    data = rng.standard_normal(500000)
+    expected = cbook.boxplot_stats(data)[0]
+    result = quantile_sketch.boxplot_stats(quantile_sketch.sketch(data, seed=0), max_fliers=50)
+    for key in ["q1", "med", "q3", "whishi", "whislo"]:
+        assert result[key] == pytest.approx(expected[key], abs=0.05), key
+    assert result["mean"] == pytest.approx(expected["mean"])
+    assert len(result["fliers"]) == 50
+    assert data.min() in result["fliers"] and data.max() in result["fliers"]
+
+
+def test_boxplot_draws_one_box_per_entry():
+    rng = np.random.default_rng(7)
+    fig, ax = plt.subplots()
+    try:
+        artists = quantile_sketch.boxplot(ax, [rng.standard_normal(1000), quantile_sketch.sketch(rng.random(50))],
+                                          labels=["a", "b"])
+        assert len(artists["boxes"]) == 2
+        assert [t.get_text() for t in ax.get_xticklabels()] == ["a", "b"]
+    finally:
+        plt.close(fig)
@@ -0,0 +1,119 @@
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import room_store
+from booking_sim import BookingSimulator
+from functions import Room
+from room_store import RoomFile, load_rooms, save_rooms
+
+
+def as_tuples(rooms):
+    # price type included, an int price has to come back as an int
+    return [(type(r.price), r.price, r.room_open) for r in rooms]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "rooms.bin")
+
+
+@pytest.mark.parametrize("prices", [[3400, 120, 0, -5, 2 ** 53], [99.5, 0.1, -0.0, 1e300], [3400, 99.5, 7, 0.25],
+                                    [np.int64(10), np.float32(2.5), np.uint8(3), 4.0], []])
+def test_round_trip_keeps_prices_and_types(path, prices):
+    rooms = [Room(p, i % 3 != 0) for i, p in enumerate(prices)]
+    assert save_rooms(path, rooms) == len(rooms)
+    expected = [(int if isinstance(p, (int, np.integer)) else float, p, r.room_open) for p, r in zip(prices, rooms)]
+    assert as_tuples(load_rooms(path)) == expected
+    assert all(isinstance(r, Room) for r in load_rooms(path))
+
+
+def test_file_size(path):
+    save_rooms(path, [Room(1, True)] * 1000)
+    with open(path, "rb") as f:
+        assert len(f.read()) == 24 + 9 * 1000
+
+
+@pytest.mark.parametrize("price", [None, "3400", True, np.True_, 1 + 2j])
+def test_rejects_non_numbers(path, price):
+    with pytest.raises(TypeError):
+        save_rooms(path, [Room(100, True), Room(price, True)])
+
+
+@pytest.mark.parametrize("price", [2 ** 53 + 2, -2 ** 60])
+def test_rejects_ints_too_big_to_store_exactly(path, price):
+    with pytest.raises(ValueError):
+        save_rooms(path, [Room(price, True), Room(1.5, True)])
+
+
+def test_room_file_views_and_slicing(path):
+    prices = [100, 250.5, 300, 75.25, 80, 90.0]
+    save_rooms(path, [Room(p, p > 90) for p in prices])
+    with RoomFile(path) as rooms:
+        assert len(rooms) == 6
+        assert rooms.prices.dtype == np.float64 and not rooms.prices.flags.writeable
+        assert rooms.prices.tolist() == [float(p) for p in prices]
+        assert rooms.room_open.tolist() == [p > 90 for p in prices]
+        assert rooms.int_prices.tolist() == [isinstance(p, int) for p in prices]
+        assert rooms.prices[rooms.room_open].sum() == pytest.approx(650.5)
+        assert as_tuples([rooms[0], rooms[-1]]) == [(int, 100, True), (float, 90.0, False)]
+        assert as_tuples(rooms[1:5:2]) == [(float, 250.5, True), (float, 75.25, False)]
+        assert as_tuples(rooms[::-1]) == as_tuples(load_rooms(path))[::-1]
+        assert as_tuples(rooms) == as_tuples(load_rooms(path))
+        with pytest.raises(IndexError):
+            rooms[6]
+
+
+def test_close_with_live_views(path):
+    save_rooms(path, [Room(5, True), Room(6, False)])
+    rooms = RoomFile(path)
+    prices = rooms.prices
+    rooms.close()
+    # the view keeps the mapping alive
+    assert prices.tolist() == [5.0, 6.0]
+
+
+def test_header_checks(path):
+    save_rooms(path, [Room(5, True), Room(6, False)])
+    with open(path, "rb") as f:
+        data = f.read()
+    for broken in [data[:10], b"NOTROOMS" + data[8:], data[:8] + struct.pack("<H", 1) + data[10:], data[:-1]]:
+        with open(path, "wb") as f:
+            f.write(broken)
+        with pytest.raises(ValueError):
+            RoomFile(path)
+
+
+def test_version_is_checked_before_the_records(path):
+    save_rooms(path, [Room(5, True)])
+    with open(path, "r+b") as f:
+        f.seek(8)
+        f.write(struct.pack("<H", room_store.VERSION + 1))
+    with pytest.raises(ValueError, match="version"):
+        load_rooms(path)
+
+
+def test_saves_array_inventories(path):
+    sim = BookingSimulator.from_rooms([Room(3400, True), Room(120, False), Room(80, True)])
+    save_rooms(path, sim)
+    assert as_tuples(load_rooms(path)) == [(int, 3400, True), (int, 120, False), (int, 80, True)]
+    # a price change that isn't whole comes back as a float
+    sim.price[1] = 99.5
+    save_rooms(path, sim)
+    assert as_tuples(load_rooms(path)) == [(int, 3400, True), (float, 99.5, False), (int, 80, True)]
+
+    arrays = SimpleNamespace(price=np.array([1, 2], dtype=np.int32), room_open=[True, False])
+    save_rooms(path, arrays)
+    assert as_tuples(load_rooms(path)) == [(int, 1, True), (int, 2, False)]
+    with pytest.raises(TypeError):
+        save_rooms(path, SimpleNamespace(price=np.array([1, None], dtype=object), room_open=[True, True]))
+    with pytest.raises(ValueError):
+        save_rooms(path, SimpleNamespace(price=np.array([1.0, 2.0]), room_open=[True]))
+
+
+def test_price_column():
+    values, ints = room_store.price_column([1, 2.5, np.int16(3)])
+    assert values.dtype == np.float64 and values.tolist() == [1.0, 2.5, 3.0]
+    assert ints.tolist() == [True, False, True]
@@ -0,0 +1,81 @@
+from array import array
+from collections import deque
+
+import numpy as np
+import pytest
+
+import sequtils
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # several blocks per call even on short inputs
+    monkeypatch.setattr(sequtils, "BLOCK", 3)
+
+
+def containers(values):
+    # the same values in every supported kind of sequence
+    return [list(values), np.array(values, dtype=np.int64), array("q", values), bytearray(v % 256 for v in values),
+            memoryview(array("i", values)), deque(values)]
+
+
+def as_list(seq):
+    return list(seq.tolist() if isinstance(seq, memoryview) else seq)
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 7, 20])
+@pytest.mark.parametrize("start, stop", [(0, None), (2, 9), (-5, None), (3, 3), (4, 2)])
+def test_reverse_matches_slice_assignment(n, start, stop):
+    for seq in containers(range(n)):
+        expected = as_list(seq)
+        expected[start:stop] = expected[start:stop][::-1]
+        assert sequtils.reverse(seq, start, stop) is seq
+        assert as_list(seq) == expected
+
+
+@pytest.mark.parametrize("n", [1, 2, 11])
+@pytest.mark.parametrize("k", [0, 1, 3, -4, 11, 25])
+def test_rotate_matches_deque_and_roll(n, k):
+    expected = deque(range(n))
+    expected.rotate(k)
+    assert list(expected) == np.roll(np.arange(n), k).tolist()
+    for seq in containers(range(n)):
+        sequtils.rotate(seq, k)
+        assert as_list(seq) == [v % 256 if isinstance(seq, bytearray) else v for v in expected]
+    assert sequtils.rotate([], 3) == []
+
+
+def test_works_on_views():
+    base = np.arange(12)
+    sequtils.reverse(base[::2])
+    assert base.tolist() == [10, 1, 8, 3, 6, 5, 4, 7, 2, 9, 0, 11]
+    data = array("d", range(8))
+    sequtils.rotate(memoryview(data)[2:], 2)
+    assert data.tolist() == [0, 1, 6, 7, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize("i, j, length", [(0, 5, 5), (7, 1, 4), (2, 2, 0), (0, 12, 8)])
+def test_swap_ranges(i, j, length):
+    for seq in containers(range(20)):
+        expected = as_list(seq)
+        expected[i:i + length], expected[j:j + length] = expected[j:j + length], expected[i:i + length]
+        sequtils.swap_ranges(seq, i, j, length)
+        assert as_list(seq) == expected
+
+
+def test_swap_ranges_errors():
+    with pytest.raises(ValueError):
+        sequtils.swap_ranges(list(range(10)), 0, 3, 4)
+    with pytest.raises(IndexError):
+        sequtils.swap_ranges(list(range(10)), 0, 8, 3)
+    with pytest.raises(IndexError):
+        sequtils.swap_ranges(list(range(10)), -1, 5, 2)
+
+
+def test_rejects_read_only_and_2d_buffers():
+    with pytest.raises(TypeError):
+        sequtils.reverse(b"abc")
+    with pytest.raises(ValueError):
+        sequtils.reverse(np.zeros((2, 3)))
+    with pytest.raises(TypeError):
+        sequtils.reverse((1, 2, 3))
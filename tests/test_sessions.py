@@ -0,0 +1,84 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+import sessions
+
+PROMPT = sessions.PROMPT.encode()
+
+
+async def talk(port, lines):
+    # sends each line and returns what came back, prompts stripped
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    replies = []
+    await reader.readexactly(len(PROMPT))
+    for line in lines:
+        writer.write(line + b"\n")
+        reply = await reader.readline()
+        replies.append(reply)
+        if not reply:
+            break
+        rest = await reader.read(len(PROMPT))
+        if rest != PROMPT:
+            break
+    writer.close()
+    await writer.wait_closed()
+    return replies
+
+
+def run_server(client):
+    async def main():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        server = await sessions.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            result = await client(port)
+        return result, errors
+    return asyncio.run(main())
+
+
+def test_echo_and_exit():
+    replies, errors = run_server(lambda port: talk(port, [b"hello", b"exit"]))
+    assert replies == [b"hello\n", b"Closing program...\n"]
+    assert not errors
+
+
+def test_bad_input_doesnt_crash_the_handler():
+    async def client(port):
+        invalid = await talk(port, [b"caf\xe9", b"exit"])
+        too_long = await talk(port, [b"x" * (100 * 1024)])
+        after = await talk(port, [b"still here", b"exit"])
+        return invalid, too_long, after
+    (invalid, too_long, after), errors = run_server(client)
+    assert invalid == ["caf�\n".encode(), b"Closing program...\n"]
+    assert too_long == [b""]
+    assert after == [b"still here\n", b"Closing program...\n"]
+    assert not errors
+
+
+def test_unix_socket_path_is_only_replaced_when_it_is_a_socket(tmp_path):
+    async def main():
+        path = str(tmp_path / "s.sock")
+        for _ in range(2):
+            server = await sessions.serve(path)
+            server.close()
+            await server.wait_closed()
+        regular = tmp_path / "file.txt"
+        regular.write_text("keep")
+        with pytest.raises(FileExistsError):
+            await sessions.serve(str(regular))
+        assert regular.read_text() == "keep"
+    asyncio.run(main())
+
+
+def test_stdio_session_leaves_stdout_open():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import asyncio, sys; sys.path.insert(0, " + repr(root) + "); import sessions; "
+            "s = asyncio.run(sessions.serve_stdio()); print('after', s.messages)")
+    out = subprocess.run([sys.executable, "-c", code], input=b"hi\nexit\n", capture_output=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.endswith(b"Closing program...\nafter 2\n")
@@ -0,0 +1,123 @@
+import gc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import shared_frame
+from shared_frame import SharedFrame, attach
+
+
+def frame(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"x": rng.random(n),
+                         "n": rng.integers(-5, 5, n).astype(np.int32),
+                         "flag": rng.random(n) < 0.5,
+                         "when": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 10 ** 6, n), unit="s"),
+                         "wait": pd.to_timedelta(rng.integers(0, 100, n), unit="min"),
+                         "z": rng.random(n) + 1j,
+                         "kind": pd.Categorical.from_codes(rng.integers(-1, 3, n), ["a", "b", "c"]),
+                         "rank": pd.Categorical(rng.integers(0, 3, n), categories=[2, 1, 0], ordered=True),
+                         "name": rng.choice(["Ellis", "Market", None], n),
+                         "maybe": pd.array(rng.integers(0, 3, n), dtype="Int64"),
+                         "tz": pd.date_range("2024-01-01", periods=n, freq="h", tz="Europe/Paris")},
+                        index=pd.RangeIndex(10, 10 + 2 * n, 2, name="row"))
+
+
+def attach_and_return(handle):
+    # runs in a worker: the frame comes back pickled so the parent can compare it
+    df = attach(handle)
+    writeable = [df[c].to_numpy().flags.writeable for c in ["x", "n", "flag"]]
+    return df.copy(), writeable
+
+
+@pytest.fixture
+def df():
+    return frame()
+
+
+def test_attach_in_process_equals_original(df):
+    with SharedFrame(df) as shared:
+        result = attach(shared.handle)
+        pd.testing.assert_frame_equal(result, df)
+        # numeric, boolean, datetime, timedelta, complex and categorical columns are shared, the rest pickled
+        assert [isinstance(e, tuple) for e in shared.handle.layout] == [True] * 8 + [False] * 3
+        assert repr(shared.handle).startswith("<FrameHandle " + shared.name + ": 8 shared, 3 pickled columns")
+        del result
+
+
+@pytest.mark.parametrize("index", [pd.Index(np.arange(50) * 3, name="id"), pd.Index(["r" + str(i) for i in range(50)]),
+                                   pd.date_range("2020-01-01", periods=50, name="day"),
+                                   pd.timedelta_range(0, periods=50, freq="30min"),
+                                   pd.MultiIndex.from_arrays([np.arange(50) % 5, np.arange(50)])])
+def test_indexes(index):
+    df = frame(50).set_axis(index)
+    with SharedFrame(df) as shared:
+        pd.testing.assert_frame_equal(attach(shared.handle), df)
+
+
+def test_duplicate_labels_and_column_selection(df):
+    dup = df[["x", "n", "name"]].set_axis(["a", "a", "b"], axis=1)
+    with SharedFrame(dup) as shared:
+        pd.testing.assert_frame_equal(attach(shared.handle), dup)
+    with SharedFrame(df, columns=["rank", "x"]) as shared:
+        pd.testing.assert_frame_equal(attach(shared.handle), df[["rank", "x"]])
+
+
+def test_empty_frames():
+    for empty in [pd.DataFrame(), pd.DataFrame({"x": np.array([], dtype=float)})]:
+        with SharedFrame(empty) as shared:
+            pd.testing.assert_frame_equal(attach(shared.handle), empty)
+
+
+def test_views_are_read_only_and_zero_copy(df):
+    with SharedFrame(df) as shared:
+        first, second = attach(shared.handle), attach(shared.handle)
+        x = first["x"].to_numpy()
+        assert not x.flags.writeable
+        assert np.shares_memory(x, second["x"].to_numpy())
+        assert np.shares_memory(first["kind"].array.codes, second["kind"].array.codes)
+        with pytest.raises(ValueError):
+            x[0] = 5.0
+        assert second["x"].iloc[0] == df["x"].iloc[0]
+        copy = first.copy()
+        copy.loc[10, "x"] = 5.0
+        assert second["x"].iloc[0] == df["x"].iloc[0]
+        del first, second, x
+
+
+def test_spawn_pool_gets_the_same_frame(df):
+    context = multiprocessing.get_context("spawn")
+    with SharedFrame(df) as shared, ProcessPoolExecutor(2, mp_context=context) as pool:
+        for result, writeable in pool.map(attach_and_return, [shared.handle] * 3):
+            pd.testing.assert_frame_equal(result, df)
+            assert writeable == [False, False, False]
+
+
+def test_close_removes_the_block(df):
+    shared = SharedFrame(df)
+    kept = attach(shared.handle)
+    assert not shared.closed
+    shared.close()
+    assert shared.closed
+    shared.close()
+    # frames attached before close stay usable, new attaches fail
+    pd.testing.assert_frame_equal(kept, df)
+    with pytest.raises(FileNotFoundError):
+        attach(shared.handle)
+    del kept
+    gc.collect()
+    shared_frame.detach()
+    assert not shared_frame._LINGERING
+
+
+def test_garbage_collection_removes_the_block(df):
+    shared = SharedFrame(df[["x"]])
+    handle = shared.handle
+    del shared
+    gc.collect()
+    assert handle.name not in shared_frame._OWNED
+    with pytest.raises(FileNotFoundError):
+        attach(handle)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sqlstore
+
+
+@pytest.fixture
+def store():
+    with sqlstore.SQLStore() as s:
+        yield s
+
+
+def frames(seed):
+    rng = np.random.default_rng(seed)
+    left = pd.DataFrame({"k": rng.integers(0, 30, 200), "k2": rng.integers(0, 3, 200), "a": rng.random(200),
+                         "v": rng.integers(0, 9, 200), "flag": rng.random(200) < 0.5})
+    right = pd.DataFrame({"k": rng.integers(10, 50, 150), "k2": rng.integers(0, 3, 150), "b": rng.random(150),
+                          "v": rng.integers(0, 9, 150), "ok": rng.random(150) < 0.5})
+    return left, right
+
+
+def check_merge(store, left, right, native, **kwargs):
+    store.load_frames("L", [left])
+    store.load_frames("R", [right])
+    sqlstore.NATIVE_OUTER_JOIN = native
+    expected = pd.merge(left, right, **kwargs).reset_index(drop=True)
+    pd.testing.assert_frame_equal(store.merge("L", "R", **kwargs), expected)
+    store.merge("L", "R", into="M", **kwargs)
+    pd.testing.assert_frame_equal(store.read("M"), expected)
+
+
+@pytest.fixture(params=[True, False], ids=["native", "emulated"])
+def native(request):
+    saved = sqlstore.NATIVE_OUTER_JOIN
+    yield request.param
+    sqlstore.NATIVE_OUTER_JOIN = saved
+
+
+@pytest.mark.parametrize("how", ["inner", "left", "right", "outer"])
+@pytest.mark.parametrize("on", [["k"], ["k", "k2"]])
+def test_merge_matches_pandas(store, native, how, on):
+    left, right = frames(len(on))
+    check_merge(store, left, right, native, on=on, how=how)
+
+
+@pytest.mark.parametrize("how", ["inner", "left", "right", "outer"])
+def test_merge_with_missing_keys_matches_pandas(store, native, how):
+    left = pd.DataFrame({"k": [1.0, np.nan, 3.0, np.nan], "a": [1, 2, 3, 4]})
+    right = pd.DataFrame({"k": [np.nan, 3.0, 5.0], "b": [10, 20, 30]})
+    check_merge(store, left, right, native, on="k", how=how)
+
+
+def test_outer_merge_with_missing_keys_sorts_them_last(store):
+    left = pd.DataFrame({"k": [1.0, np.nan, 3.0], "a": [1, 2, 3]})
+    right = pd.DataFrame({"k": [np.nan, 3.0, 5.0], "b": [10, 20, 30]})
+    store.load_frames("L", [left])
+    store.load_frames("R", [right])
+    assert store.merge("L", "R", on="k", how="outer")["k"].tolist()[:3] == [1.0, 3.0, 5.0]
+
+
+def test_merge_left_on_right_on_and_suffixes(store, native):
+    left, right = frames(5)
+    right = right.rename(columns={"k": "key"})
+    check_merge(store, left, right, native, left_on="k", right_on="key", how="outer", suffixes=("_l", "_r"))
+
+
+@pytest.mark.parametrize("agg", [{"a": "sum"}, {"a": "mean", "v": "max"}, {"a": ["min", "max", "count"]}])
+@pytest.mark.parametrize("by", ["k2", ["k2", "v"]])
+def test_groupby_matches_pandas(store, agg, by):
+    left, _ = frames(7)
+    left.loc[::13, "k2"] = np.nan
+    store.load_frames("L", [left])
+    expected = left.groupby(by).agg(agg)
+    pd.testing.assert_frame_equal(store.groupby("L", by, agg), expected, check_index_type=False)
+    pd.testing.assert_frame_equal(store.groupby("L", by, agg, as_index=False),
+                                  left.groupby(by, as_index=False).agg(agg), check_index_type=False)
+
+
+def test_load_and_read_round_trip(store):
+    left, _ = frames(9)
+    left["when"] = pd.date_range("2024-01-01", periods=len(left), freq="h")
+    left["name"] = pd.Series(["x", None] * 100, dtype="str")
+    store.load_frames("L", [left.iloc[:120], left.iloc[120:]])
+    pd.testing.assert_frame_equal(store.read("L"), left)
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import streaming_corr
+
+IRIS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "input", "Iris.csv")
+COLUMNS = ["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm"]
+
+
+def random_frame(seed, n=5000, nan_share=0.1):
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal(n)
+    df = pd.DataFrame({"a": base + rng.standard_normal(n) * 0.5, "b": -base + rng.standard_normal(n),
+                       "c": rng.standard_normal(n), "d": 1e6 + base * 10, "flag": rng.random(n) < 0.5})
+    for c in "abc":
+        df.loc[rng.random(n) < nan_share, c] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("chunksize", [7, 50, 1000])
+def test_iris_chunks_match_pandas(chunksize):
+    expected = pd.read_csv(IRIS).drop(columns=["Id", "Species"]).corr()
+    result = streaming_corr.corr(pd.read_csv(IRIS, chunksize=chunksize, usecols=COLUMNS))
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("min_periods", [1, 4600])
+def test_missing_values_and_min_periods_match_pandas(seed, min_periods):
+    df = random_frame(seed)
+    expected = df.corr(min_periods=min_periods)
+    result = streaming_corr.corr(df, min_periods=min_periods)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-7, atol=1e-9)
+
+
+def test_merged_partials_match_one_pass():
+    df = random_frame(5)
+    partials = [streaming_corr.partial(df.iloc[lo:lo + 700], list(df.columns), block_rows=128)
+                for lo in range(0, len(df), 700)]
+    merged = streaming_corr.merge_all(partials)
+    pd.testing.assert_frame_equal(merged.corr(), df.corr(), rtol=1e-7, atol=1e-9)
+
+
+def test_arrays_and_constant_columns():
+    rng = np.random.default_rng(1)
+    values = np.column_stack((rng.random(100), np.full(100, 3.0), rng.random(100)))
+    result = streaming_corr.CoMoments(["x", "const", "y"]).update(values, block_rows=16).corr()
+    expected = pd.DataFrame(values, columns=["x", "const", "y"]).corr()
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-10, atol=1e-12)
+    with pytest.raises(ValueError):
+        streaming_corr.CoMoments(["x"]).update(values)
+    with pytest.raises(ValueError):
+        streaming_corr.corr([])
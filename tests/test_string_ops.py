@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import string_ops
+
+WORDS = ["twitter", "Facebook", "", "Ünïcode", "a b"]
+MISSING = ["twitter", None, "Facebook", np.nan, "x"]
+
+
+def as_list(values):
+    return [None if v is None or (isinstance(v, float) and np.isnan(v)) else v for v in list(values)]
+
+
+@pytest.mark.parametrize("make", [list, np.array, lambda v: pd.Series(v, dtype=object), pd.Series, pd.Index])
+def test_upper_lower_match_str_methods(make):
+    values = make(WORDS)
+    assert list(string_ops.upper(values)) == [w.upper() for w in WORDS]
+    assert list(string_ops.lower(values)) == [w.lower() for w in WORDS]
+
+
+@pytest.mark.parametrize("dtype", [object, "str"])
+def test_missing_values_match_pandas(dtype):
+    s = pd.Series(MISSING, dtype=dtype, name="w", index=list("abcde"))
+    pd.testing.assert_series_equal(string_ops.upper(s), s.str.upper())
+    # pandas' + and str.cat turn None into NaN in object columns, concat() keeps the value it found
+    for result, expected in ((string_ops.concat(s, ".com"), s + ".com"),
+                             (string_ops.concat(s, s, sep="-"), s.str.cat(s, sep="-"))):
+        assert result.index.equals(s.index) and result.name == "w"
+        assert result.isna().tolist() == expected.isna().tolist()
+        assert result.dropna().tolist() == expected.dropna().tolist()
+
+
+def test_missing_values_in_lists():
+    assert as_list(string_ops.upper(MISSING)) == [None if v is None or v != v else v.upper() for v in MISSING]
+    # the first column's missing value wins on a row
+    assert as_list(string_ops.concat(["a", None, "c"], ["x", "y", None])) == ["ax", None, None]
+
+
+@pytest.mark.parametrize("make", [list, lambda v: pd.Series(v, dtype=object), pd.Series])
+def test_number_keeps_missing_values(make):
+    values = make(["a", None, "b"])
+    assert as_list(string_ops.number(values)) == ["1. a", None, "3. b"]
+
+
+def test_concat_matches_python():
+    first, last = ["Ann", "Bob"], ["Lee", "Ray"]
+    assert list(string_ops.concat(first, last, sep=" ")) == [f + " " + l for f, l in zip(first, last)]
+    assert list(string_ops.add_prefix(WORDS, "@")) == ["@" + w for w in WORDS]
+    assert list(string_ops.add_suffix(WORDS, ".com")) == [w + ".com" for w in WORDS]
+    assert string_ops.concat("a", "b", sep="+") == "a+b"
+
+
+def test_concat_container_follows_first_column():
+    s = pd.Series(["a", "b"], index=[10, 11])
+    assert isinstance(string_ops.concat(["x", "y"], s), np.ndarray)
+    result = string_ops.concat(s, ["x", "y"])
+    assert isinstance(result, pd.Series) and result.index.tolist() == [10, 11]
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_numbers_and_labels(arrow):
+    assert [str(v) for v in string_ops.numbers(4, 7, arrow=arrow).tolist()] == ["7", "8", "9", "10"]
+    assert [str(v) for v in string_ops.labels("Buyer ", 3, arrow=arrow).tolist()] == \
+        list(map(lambda n: "Buyer " + str(n), range(3)))
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import textmap
+from textmap import TextMap
+
+PIECES = ["word", "a", "éte", "中文", "\U0001F600", " ", "  ", "\t", "\n", "\r\n", "\x0b\x0c", ", ", ",", "aa", "aaa"]
+
+
+def random_text(seed, n=3000):
+    rng = np.random.default_rng(seed)
+    return "".join(rng.choice(PIECES, n)).encode()
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # many units, chunks and index steps even on small files
+    monkeypatch.setattr(textmap, "BLOCK", 64)
+    monkeypatch.setattr(textmap, "INDEX_STEP", 16)
+
+
+def write(tmp_path, data):
+    path = tmp_path / "text.txt"
+    path.write_bytes(data)
+    return str(path)
+
+
+def tokens_of(text, sep, workers):
+    starts, ends = text.offsets(sep, workers)
+    return [bytes(text.data[s:e]) for s, e in zip(starts.tolist(), ends.tolist())]
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("sep", [None, b" ", b"\n", b", ", b"aa", "\r\n"])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_tokens_match_bytes_split(tmp_path, small_blocks, seed, sep, workers):
+    data = random_text(seed)
+    expected = data.split(sep.encode() if isinstance(sep, str) else sep)
+    with TextMap(write(tmp_path, data)) as text:
+        assert tokens_of(text, sep, workers) == expected
+        assert [bytes(t) for t in text.tokens(sep, workers)] == expected
+        assert text.count(sep, workers) == len(expected)
+        assert sum(len(s) for s, _ in text.iter_offsets(sep, workers)) == len(expected)
+
+
+@pytest.mark.parametrize("sep", [None, b" ", b"a "])
+def test_default_block_size(tmp_path, sep):
+    data = random_text(7, 20000)
+    with TextMap(write(tmp_path, data)) as text:
+        assert tokens_of(text, sep, 1) == data.split(sep)
+        assert text.count(sep) == len(data.split(sep))
+
+
+@pytest.mark.parametrize("data", [b"", b" ", b"x", b"  x  ", b"\n\n", b"x\n"])
+@pytest.mark.parametrize("sep", [None, b"\n"])
+def test_edge_cases(tmp_path, small_blocks, data, sep):
+    with TextMap(write(tmp_path, data)) as text:
+        assert len(text) == len(data)
+        assert tokens_of(text, sep, 1) == data.split(sep)
+        assert text.count(sep, 1) == len(data.split(sep))
+
+
+def test_long_token_spanning_blocks(tmp_path, small_blocks):
+    data = b"x" * 1000 + b" y " + b"z" * 500
+    with TextMap(write(tmp_path, data)) as text:
+        assert tokens_of(text, None, 2) == data.split()
+        assert tokens_of(text, b" ", 2) == data.split(b" ")
+
+
+def test_empty_separator(tmp_path):
+    with TextMap(write(tmp_path, b"a b")) as text:
+        with pytest.raises(ValueError):
+            text.offsets(b"")
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_char_slice_matches_string_slicing(tmp_path, small_blocks, seed):
+    data = random_text(seed, 500)
+    contents = data.decode()
+    rng = np.random.default_rng(seed)
+    with TextMap(write(tmp_path, data)) as text:
+        assert text.char_count == len(contents)
+        bounds = rng.integers(-len(contents) - 10, len(contents) + 10, (200, 2)).tolist()
+        for start, stop in bounds + [[None, None], [None, 5], [-3, None], [0, len(contents)]]:
+            assert str(text.char_slice(start, stop), "utf-8") == contents[start:stop]
+
+
+def test_char_slice_empty_file(tmp_path):
+    with TextMap(write(tmp_path, b"")) as text:
+        assert text.char_count == 0
+        assert bytes(text.char_slice(0, 10)) == b""
+
+
+def test_throughput_reports_token_count(tmp_path):
+    data = random_text(3)
+    record = textmap.throughput(write(tmp_path, data), repeat=1)
+    assert record["bytes"] == len(data)
+    assert record["tokens"] == len(data.split())
+    record = textmap.throughput(write(tmp_path, data), sep=b",", offsets=True, repeat=1)
+    assert record["tokens"] == len(data.split(b","))
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import topk
+
+
+@pytest.fixture(scope="module")
+def df():
+    rng = np.random.default_rng(0)
+    n = 3000
+    frame = pd.DataFrame({"a": rng.integers(0, 20, n), "b": np.round(rng.standard_normal(n), 1),
+                          "t": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 50, n), unit="D"),
+                          "flag": rng.random(n) < 0.3, "s": rng.choice(["x", "y", "z"], n),
+                          "g": rng.choice(["north", "south", "east", None], n)})
+    frame.loc[::17, "b"] = np.nan
+    frame.loc[::23, "t"] = pd.NaT
+    return frame
+
+
+@pytest.mark.parametrize("by", ["a", "b", "t", "flag", "s", ["a", "b"], ["b", "t"], ["s", "a"]])
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("k", [0, 1, 10, 150, 5000])
+def test_top_k_matches_sort_head(df, by, ascending, k):
+    expected = df.sort_values(by, ascending=ascending, kind="stable").head(k)
+    pd.testing.assert_frame_equal(topk.top_k(df, k, by=by, ascending=ascending), expected)
+
+
+@pytest.mark.parametrize("k", [0, 5, 100])
+def test_top_k_series_and_chunks(df, k):
+    s = df["b"]
+    expected = s.sort_values(ascending=False, kind="stable").head(k)
+    pd.testing.assert_series_equal(topk.top_k(s, k), expected)
+    positions = topk.top_k_positions(s, k, workers=3, chunk_rows=128)
+    assert positions.tolist() == expected.index.tolist()
+
+
+def test_top_k_on_empty_input(df):
+    empty = df.iloc[:0]
+    pd.testing.assert_frame_equal(topk.top_k(empty, 5, by=["a", "b"]), empty)
+    pd.testing.assert_frame_equal(topk.top_k(df, -1, by="a"), df.iloc[:0])
+
+
+@pytest.mark.parametrize("group", ["a", "g", ["flag", "g"]])
+@pytest.mark.parametrize("k", [0, 1, 3, 1000])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_group_top_k_matches_sort_groupby_head(df, group, k, ascending):
+    expected = (df.sort_values("b", ascending=ascending, kind="stable").groupby(group).head(k)
+                .sort_values(group, kind="stable"))
+    assert topk.group_top_k(df, group, "b", k, ascending).index.tolist() == expected.index.tolist()
@@ -0,0 +1,331 @@
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# bytes per unit of work handed to a thread, and per chunk scanned at once (bounds the work buffers)
+BLOCK = 1 << 24
+# a character count is kept every INDEX_STEP bytes so char_slice() only decodes one step
+INDEX_STEP = 1 << 16
+
+_local = threading.local()
+
+
+def _scratch(n):
+    # per-thread work buffers reused from unit to unit, allocating fresh ones costs more in page faults
+    # than the scan itself
+    bufs = getattr(_local, "bufs", None)
+    if bufs is None or len(bufs[0]) < n:
+        bufs = (np.empty(n, dtype=np.uint8), np.empty(n, dtype=bool), np.empty(n, dtype=bool))
+        _local.bufs = bufs
+    return bufs[0][:n], bufs[1][:n], bufs[2][:n]
+
+
+def _is_space(b):
+    # the whitespace bytes.split() uses: space and \t \n \v \f \r (9..13), the uint8 subtraction wraps
+    # everything below 9 past 5. The mask is a scratch buffer, valid until the next call in this thread.
+    tmp, space, eq = _scratch(len(b))
+    np.subtract(b, np.uint8(9), out=tmp)
+    np.less(tmp, 5, out=space)
+    np.equal(b, 32, out=eq)
+    np.bitwise_or(space, eq, out=space)
+    return space
+
+
+def _self_overlapping(sep):
+    # separators like b"aa" can overlap themselves, so units can't be cut at any occurrence
+    return any(sep[:k] == sep[-k:] for k in range(1, len(sep)))
+
+
+class TextMap:
+    """ A text file memory-mapped read-only. Tokens come back as (start, end) byte offsets or as memoryview
+        slices of the mapping, so no bytes are copied and no Python string is made per token. Large files
+        are cut into units at separator positions and the units are scanned in parallel.
+
+        with TextMap("export.txt") as text:
+            starts, ends = text.offsets(b" ")      # same tokens as contents.split(" ")
+            for token in text.tokens():           # same tokens as contents.split()
+                ...
+            text.char_slice(100, 200)             # same text as contents[100:200]
+
+        Memoryviews returned by tokens() and char_slice() point into the mapping and must be released
+        (or go out of scope) before close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap can't map an empty file
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.data = memoryview(self._mmap) if size else memoryview(b"")
+        self._bytes = np.frombuffer(self.data, dtype=np.uint8)
+        self._char_index = None
+
+    def close(self):
+        self._bytes = None
+        self.data.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.data)
+
+    # tokenizing
+
+    def _find(self, sep, pos):
+        # position of the next separator at or after pos, or -1
+        if sep is not None and len(sep) == 1:
+            # memchr speed, mmap.find is much slower for longer patterns
+            return self._mmap.find(sep, pos) if self._mmap is not None else -1
+        n = len(self.data)
+        window = 4096
+        while pos < n:
+            if sep is None:
+                hits = np.flatnonzero(_is_space(self._bytes[pos:pos + window]))
+            else:
+                w = self._bytes[pos:pos + window + len(sep) - 1]
+                hits = np.flatnonzero(w[:len(w) - len(sep) + 1] == sep[0])
+                for k in range(1, len(sep)):
+                    hits = hits[w[hits + k] == sep[k]]
+            if len(hits):
+                return pos + int(hits[0])
+            pos += window
+            window = min(window * 2, BLOCK)
+        return -1
+
+    def _units(self, sep):
+        # (lo, hi) byte ranges that each end right after a separator (except the last), so no token
+        # crosses two units and the units can be tokenized independently
+        n = len(self.data)
+        if sep is not None and _self_overlapping(sep):
+            return [(0, n)]
+        width = len(sep) if sep is not None else 1
+        units = []
+        lo = 0
+        while n - lo > BLOCK:
+            found = self._find(sep, lo + BLOCK)
+            if found < 0:
+                break
+            units.append((lo, found + width))
+            lo = found + width
+        units.append((lo, n))
+        return units
+
+    def _scan(self, lo, hi, sep, last, count):
+        # tokens of one unit as (starts, ends), or only how many there are when count is True. The unit is
+        # read in BLOCK-sized chunks so a unit with one huge token doesn't need huge work buffers.
+        b = self._bytes[lo:hi]
+        n = len(b)
+        if sep is None:
+            # str.split(): runs of non-whitespace, found where the space/non-space state flips
+            total = 0
+            parts = []
+            prev = True
+            for c0 in range(0, n, BLOCK):
+                space = _is_space(b[c0:c0 + BLOCK])
+                k = len(space)
+                # the uint8 scratch buffer is free again once the mask is built
+                edge = _scratch(k)[0][:k - 1].view(bool)
+                if count:
+                    total += int(prev and not space[0])
+                    total += int(np.count_nonzero(np.greater(space[:-1], space[1:], out=edge)))
+                else:
+                    if prev != space[0]:
+                        parts.append(np.array([c0]))
+                    parts.append(np.flatnonzero(np.not_equal(space[1:], space[:-1], out=edge)) + (c0 + 1))
+                prev = bool(space[-1])
+            if count:
+                return total
+            if not prev:
+                parts.append(np.array([n]))
+            flips = np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+            return flips[0::2] + lo, flips[1::2] + lo
+
+        # str.split(sep): everything between separators, empty tokens included
+        m = len(sep)
+        total = 0
+        parts = []
+        for c0 in range(0, n - m + 1, BLOCK):
+            chunk = b[c0:min(c0 + BLOCK, n - m + 1)]
+            eq = _scratch(len(chunk))[1]
+            np.equal(chunk, sep[0], out=eq)
+            if m == 1 and count:
+                total += int(np.count_nonzero(eq))
+            else:
+                parts.append(np.flatnonzero(eq) + c0)
+        if m == 1 and count:
+            return total + last
+        hits = np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+        for k in range(1, m):
+            hits = hits[b[hits + k] == sep[k]]
+        if m > 1 and _self_overlapping(sep) and len(hits):
+            kept = []
+            free = 0
+            for h in hits.tolist():
+                if h >= free:
+                    kept.append(h)
+                    free = h + m
+            hits = np.array(kept, dtype=np.intp)
+        if count:
+            return len(hits) + last
+        starts = np.concatenate(([0], hits + m)) + lo
+        ends = np.concatenate((hits, [n])) + lo
+        if not last:
+            # a unit ends with a separator, the empty "token" after it belongs to the next unit
+            starts, ends = starts[:-1], ends[:-1]
+        return starts, ends
+
+    def _run(self, sep, workers, count):
+        if isinstance(sep, str):
+            sep = sep.encode()
+        if sep is not None and not sep:
+            raise ValueError("empty separator")
+        units = self._units(sep)
+        last = len(units) - 1
+        jobs = [(lo, hi, sep, i == last, count) for i, (lo, hi) in enumerate(units)]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(jobs) == 1:
+            try:
+                for job in jobs:
+                    yield self._scan(*job)
+            finally:
+                _local.bufs = None
+            return
+        # numpy releases the GIL while it compares and searches, so threads scan units side by side
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(lambda job: self._scan(*job), jobs)
+
+    def iter_offsets(self, sep=None, workers=None):
+        """ Same as offsets(), one (starts, ends) pair of arrays per unit of the file, so memory use stays
+            bounded by the unit size however many tokens the file has
+        """
+
+        return self._run(sep, workers, False)
+
+    def offsets(self, sep=None, workers=None):
+        """ Finds every token of the file, without copying the text
+
+        Arguments:
+            sep {bytes} -- separator, split on it like str.split(sep). None splits on runs of whitespace like str.split()
+            workers {int} -- threads scanning units of the file, defaults to the CPU count
+
+        Returns
+            Tuple -- (starts, ends) int arrays of byte offsets, token i is data[starts[i]:ends[i]]
+        """
+
+        pairs = list(self.iter_offsets(sep, workers))
+        if len(pairs) == 1:
+            return pairs[0]
+        return np.concatenate([p[0] for p in pairs]), np.concatenate([p[1] for p in pairs])
+
+    def tokens(self, sep=None, workers=None):
+        """ Yields every token as a memoryview slice of the mapping (bytes(token) or str(token, "utf-8") when
+            a copy is needed)
+
+        Arguments:
+            sep {bytes} -- see offsets()
+            workers {int} -- see offsets()
+
+        Returns
+            Generator of memoryview
+        """
+
+        data = self.data
+        for starts, ends in self.iter_offsets(sep, workers):
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                yield data[start:end]
+
+    def count(self, sep=None, workers=None):
+        """ Number of tokens, counted without building their offsets """
+
+        return sum(self._run(sep, workers, True))
+
+    # character ranges
+
+    def _build_char_index(self):
+        # number of characters before each INDEX_STEP boundary, counted as the bytes that aren't UTF-8
+        # continuation bytes (0x80..0xBF, which are the int8 values below -64)
+        n = len(self.data)
+        counts = np.zeros(n // INDEX_STEP + 2, dtype=np.int64)
+        full = n // INDEX_STEP * INDEX_STEP
+        block = max(1, BLOCK // INDEX_STEP) * INDEX_STEP
+        for lo in range(0, full, block):
+            steps = self._bytes[lo:min(lo + block, full)].view(np.int8).reshape(-1, INDEX_STEP)
+            counts[lo // INDEX_STEP + 1:lo // INDEX_STEP + 1 + len(steps)] = \
+                INDEX_STEP - np.count_nonzero(steps < -64, axis=1)
+        tail = self._bytes[full:].view(np.int8)
+        counts[full // INDEX_STEP + 1] = len(tail) - np.count_nonzero(tail < -64)
+        self._char_index = np.cumsum(counts)
+
+    @property
+    def char_count(self):
+        """ Number of characters in the file (UTF-8) """
+
+        if self._char_index is None:
+            self._build_char_index()
+        return int(self._char_index[-1])
+
+    def _char_to_byte(self, c):
+        index = self._char_index
+        if c >= index[-1]:
+            return len(self.data)
+        step = int(np.searchsorted(index, c, side="right")) - 1
+        lo = step * INDEX_STEP
+        lead = np.flatnonzero(self._bytes[lo:lo + INDEX_STEP].view(np.int8) >= -64)
+        return lo + int(lead[c - index[step]])
+
+    def char_slice(self, start=None, stop=None):
+        """ The bytes of characters start..stop-1, the same text as contents[start:stop] on the decoded
+            string. Negative indices count from the end. Only one INDEX_STEP of the file is scanned per end,
+            after a one-off pass that counts the characters.
+
+        Arguments:
+            start {int} -- first character
+            stop {int} -- end character (exclusive)
+
+        Returns
+            memoryview -- slice of the mapping, decode it with str(view, "utf-8") for a string
+        """
+
+        start, stop, _ = slice(start, stop).indices(self.char_count)
+        if stop <= start:
+            return self.data[0:0]
+        return self.data[self._char_to_byte(start):self._char_to_byte(stop)]
+
+
+def throughput(path, sep=None, workers=None, offsets=False, repeat=3):
+    """ Times tokenizing a whole file
+
+    Arguments:
+        path {String} -- text file
+        sep {bytes} -- see TextMap.offsets()
+        workers {int} -- see TextMap.offsets()
+        offsets {bool} -- time building every token's offsets (TextMap.iter_offsets) instead of counting them
+        repeat {int} -- runs, the fastest is reported
+
+    Returns
+        Dictionary -- bytes, tokens, seconds and gb_per_second
+    """
+
+    with TextMap(path) as text:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if offsets:
+                tokens = sum(len(starts) for starts, _ in text.iter_offsets(sep, workers))
+            else:
+                tokens = text.count(sep, workers)
+            best = min(best, time.perf_counter() - start)
+        size = len(text)
+    return {"bytes": size, "tokens": tokens, "seconds": best, "gb_per_second": size / best / 1e9}
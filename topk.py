@@ -0,0 +1,288 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# rows per unit of work, each one is partitioned on its own so the scratch memory stays at one chunk
+CHUNK_ROWS = 1 << 20
+
+
+def _missing(values):
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    if values.dtype.kind in "mM":
+        return np.isnat(values)
+    return None
+
+
+def _select(v, k, ascending):
+    """ Positions in v of its k leading values, in position order. np.partition finds the k-th value t in
+        O(len(v)); everything strictly better than t is in, and of the values equal to t only the first
+        ones are, which is how a stable sort breaks the tie.
+    """
+
+    if len(v) <= k:
+        return np.arange(len(v))
+    if ascending:
+        t = np.partition(v, k - 1)[k - 1]
+        better = np.flatnonzero(v < t)
+    else:
+        t = np.partition(v, len(v) - k)[len(v) - k]
+        better = np.flatnonzero(v > t)
+    ties = np.flatnonzero(v == t)[:k - len(better)]
+    return np.sort(np.concatenate((better, ties)))
+
+
+def _candidates(values, lo, hi, k, ascending):
+    # positions of the k leading present values of values[lo:hi]
+    v = values[lo:hi]
+    missing = _missing(v)
+    if missing is not None and missing.any():
+        present = np.flatnonzero(~missing)
+        return present[_select(v[present], k, ascending)] + lo
+    return _select(v, k, ascending) + lo
+
+
+def _stable_order(v, ascending):
+    # argsort of v, ties in position order in both directions
+    if ascending:
+        return np.argsort(v, kind="stable")
+    return len(v) - 1 - np.argsort(v[::-1], kind="stable")[::-1]
+
+
+def _sort_key(v, ascending):
+    # values turned into a key that sorts ascending in the wanted order, missing values last
+    if v.dtype.kind == "f":
+        # NaN sorts last either way
+        return v if ascending else -v
+    rank = np.unique(v, return_inverse=True)[1].reshape(-1)
+    key = rank if ascending else -rank
+    missing = _missing(v)
+    if missing is not None and missing.any():
+        key[missing] = len(v)
+    return key
+
+
+def _bucket_order(codes):
+    """ Stable argsort of non-negative integer codes. numpy only radix sorts 16-bit integers, so wider
+        codes are sorted by their low 16 bits and then, stably, by their high bits.
+    """
+
+    top = int(codes.max()) if len(codes) else 0
+    if top < 1 << 16:
+        return np.argsort(codes.astype(np.uint16), kind="stable")
+    order = np.argsort((codes & 0xFFFF).astype(np.uint16), kind="stable")
+    high = codes[order] >> 16
+    if top < 1 << 32:
+        return order[np.argsort(high.astype(np.uint16), kind="stable")]
+    return order[np.argsort(high, kind="stable")]
+
+
+def _key(values):
+    if isinstance(values, (pd.Series, pd.Index)):
+        if values.dtype.kind not in "iufbmM":
+            return None
+        return values.to_numpy()
+    values = np.asarray(values)
+    return values if values.dtype.kind in "iufbmM" else None
+
+
+def top_k_positions(values, k, ascending=False, workers=None, chunk_rows=CHUNK_ROWS):
+    """ Positions of the k largest (or smallest) values, in order, the same positions as the first k of a
+        stable sort with missing values last, without sorting the whole array. Each chunk of rows gives its
+        own k leading values by partial selection and only those are sorted.
+
+    Arguments:
+        values {array-like} -- numbers, booleans or datetimes
+        k {int} -- number of positions
+        ascending {bool} -- smallest values first instead of largest
+        workers {int} -- threads working on chunks, defaults to the CPU count
+        chunk_rows {int} -- rows per chunk
+
+    Returns
+        numpy.ndarray -- up to k int positions
+    """
+
+    values = _key(values)
+    if values is None:
+        raise TypeError("top_k_positions needs numbers, booleans or datetimes")
+    if values.dtype.kind == "b":
+        values = values.view(np.uint8)
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    bounds = [(lo, min(lo + chunk_rows, n)) for lo in range(0, n, chunk_rows)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(bounds) == 1:
+        parts = [_candidates(values, lo, hi, k, ascending) for lo, hi in bounds]
+    else:
+        # np.partition releases the GIL, so chunks are selected side by side
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(lambda b: _candidates(values, b[0], b[1], k, ascending), bounds))
+    candidates = np.concatenate(parts)
+    result = candidates[_stable_order(values[candidates], ascending)[:k]]
+    if len(result) < k:
+        # fewer than k present values, missing ones follow in position order like na_position="last"
+        missing = np.flatnonzero(_missing(values))
+        result = np.concatenate((result, missing[:k - len(result)]))
+    return result
+
+
+def top_k(data, k, by=None, ascending=False):
+    """ The first k rows of a sort, without the full sort:
+
+        top_k(df, 100, by="y")          # df.sort_values(by="y", ascending=False, kind="stable").head(100)
+        top_k(times_df, 100, by="total_score", ascending=True)
+
+        Ties keep their original order, like a stable sort, and missing values come last. With several
+        columns in by, the candidates are chosen on the first one (keeping every tie at the cut) and only
+        they are sorted by all of them. Columns that aren't numbers, booleans or datetimes fall back to
+        a full stable sort.
+
+    Arguments:
+        data {DataFrame or Series} -- rows to select from
+        k {int} -- number of rows
+        by {String or List} -- sort column(s) of a DataFrame
+        ascending {bool or List} -- sort direction, one per column of by
+
+    Returns
+        DataFrame or Series -- k rows (fewer if there are fewer), in sorted order
+    """
+
+    if k <= 0 or len(data) == 0:
+        return data.iloc[:0]
+    if isinstance(data, pd.Series):
+        first = data
+        keys, directions = None, [ascending]
+    else:
+        keys = [by] if isinstance(by, str) else list(by)
+        directions = list(ascending) if isinstance(ascending, (list, tuple)) else [ascending] * len(keys)
+        first = data[keys[0]]
+    if _key(first) is None:
+        if keys is None:
+            return data.sort_values(ascending=ascending, kind="stable").head(k)
+        return data.sort_values(keys, ascending=directions, kind="stable").head(k)
+
+    if keys is None or len(keys) == 1:
+        return data.iloc[top_k_positions(first, k, directions[0])]
+    # every row tied with the k-th value on the first key may still win on the next keys
+    positions = top_k_positions(first, k, directions[0])
+    values = first.to_numpy()
+    edge = values[positions[-1]]
+    if pd.isna(edge):
+        tied = np.flatnonzero(pd.isna(values))
+    else:
+        tied = np.flatnonzero(values == edge)
+    candidates = np.union1d(positions, tied)
+    return data.iloc[candidates].sort_values(keys, ascending=directions, kind="stable").head(k)
+
+
+def group_top_k(df, group, by, k, ascending=False):
+    """ The first k rows of every group, groups in key order and rows in sorted order inside them:
+
+        group_top_k(df, "country", "total_score", 3)
+        # == df.sort_values("total_score", ascending=False, kind="stable").groupby("country").head(3)
+        #      .sort_values("country", kind="stable")
+
+        The rows are bucketed by group with a linear-time stable sort on the integer group codes, then each
+        group larger than k gets the same partial selection as top_k_positions(), so only the kept rows
+        are sorted. Rows with a missing group key are left out, like groupby.
+
+    Arguments:
+        df {DataFrame} -- rows
+        group {String or List} -- group key column(s)
+        by {String} -- column to rank on (numbers, booleans or datetimes)
+        k {int} -- rows per group
+        ascending {bool} -- smallest values first instead of largest
+
+    Returns
+        DataFrame
+    """
+
+    values = _key(df[by])
+    if values is None:
+        raise TypeError("group_top_k needs a column of numbers, booleans or datetimes, " + repr(by) + " is " + str(df[by].dtype))
+    if values.dtype.kind == "b":
+        values = values.view(np.uint8)
+    if k <= 0:
+        return df.iloc[:0]
+    if isinstance(group, str):
+        codes, uniques = pd.factorize(df[group], sort=True)
+    else:
+        grouped = df.groupby(list(group), sort=True)
+        # rows dropped for a missing key are numbered NaN
+        codes = grouped.ngroup().fillna(-1).to_numpy().astype(np.int64)
+        uniques = np.arange(grouped.ngroups)
+    codes = np.asarray(codes, dtype=np.int64)
+    # missing keys (-1) bucket first and are skipped
+    order = _bucket_order(codes + 1)
+    sizes = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    start = len(codes) - int(sizes.sum())
+    bounds = start + np.concatenate(([0], np.cumsum(sizes)))
+
+    # groups of at most k rows are kept whole, larger ones keep the rows partial selection picks
+    keep = np.ones(len(codes) - start, dtype=bool)
+    for g in np.flatnonzero(sizes > k):
+        lo, hi = bounds[g], bounds[g + 1]
+        v = values[order[lo:hi]]
+        missing = _missing(v)
+        if missing is not None and missing.any():
+            present = np.flatnonzero(~missing)
+            picked = present[_select(v[present], k, ascending)]
+            # missing values make up the rest, in position order
+            picked = np.concatenate((picked, np.flatnonzero(missing)[:k - len(picked)]))
+        else:
+            picked = _select(v, k, ascending)
+        segment = keep[lo - start:hi - start]
+        segment[:] = False
+        segment[picked] = True
+    rows = order[start:][keep]
+    # rows are grouped and in position order inside each group: a stable sort on the values, then a
+    # stable bucketing back into groups, leaves ties in position order (cheaper than np.lexsort)
+    rows = rows[np.argsort(_sort_key(values[rows], ascending), kind="stable")]
+    return df.iloc[rows[_bucket_order(codes[rows])]]
+
+
+def benchmark(n=10 ** 8, k=100, groups=1000, seed=0, repeat=1):
+    """ Times top_k_positions and group_top_k against full stable sorts on random floats
+
+    Arguments:
+        n {int} -- rows
+        k {int} -- rows to select (per group for the grouped case)
+        groups {int} -- number of groups for the grouped case, 0 skips it
+        seed {int} -- random seed
+        repeat {int} -- runs per path, the fastest is reported
+
+    Returns
+        Dictionary -- seconds for each path
+    """
+
+    rng = np.random.default_rng(seed)
+    # rounded so there are plenty of ties to break
+    values = np.round(rng.standard_normal(n), 3)
+
+    def best(func):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    record = {"rows": n, "k": k}
+    record["top_k_s"], fast = best(lambda: top_k_positions(values, k))
+    record["full_sort_s"], full = best(lambda: _stable_order(values, False)[:k])
+    if not np.array_equal(fast, full):
+        raise AssertionError("top_k_positions and the stable sort disagree")
+    del full
+    if groups:
+        df = pd.DataFrame({"g": rng.integers(0, groups, n), "y": values})
+        record["group_top_k_s"], fast = best(lambda: group_top_k(df, "g", "y", k))
+        record["group_sort_head_s"], full = best(
+            lambda: df.sort_values("y", ascending=False, kind="stable").groupby("g").head(k).sort_values("g", kind="stable"))
+        if not fast.index.equals(full.index):
+            raise AssertionError("group_top_k and sort + groupby.head disagree")
+    return record